@@ -1,18 +1,25 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from scipy import sparse
 import sqlite3
 import json
-import hashlib
 import uuid
 import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 from dataclasses import dataclass
 import random
+import os
 import time
 import logging
 
+from bjj_batch import iter_unique_results
+from bjj_cache import LRUCache, SQLiteAnalysisCache, fold_query, get_shared_resource, lexicon_fingerprint, normalize_query
+from bjj_db_pool import shared_pool
+from bjj_lexicon import SEARCH_LEXICON_PATH, LexiconWatcher, load_lexicon_source, source_checksum
+from bjj_text_index import IncrementalScanner, KeywordAutomaton, KeywordHits, SuffixStemmer
+
 # =============================================================================
 # 최적화된 기술 데이터베이스 (60가지 + 고성능 매칭)
 # =============================================================================
@@ -37,7 +44,7 @@ class OptimizedTechniqueDB:
     
     def __init__(self):
         self.techniques = self._build_technique_index()
-        self.keyword_index = self._build_keyword_index()
+        self.keyword_vocabulary, self.keyword_matrix = self._build_keyword_index()
         self.category_index = self._build_category_index()
     
     def _build_technique_index(self) -> Dict[str, Technique]:
@@ -160,25 +167,33 @@ class OptimizedTechniqueDB:
         
         return techniques
     
-    def _build_keyword_index(self) -> Dict[str, List[str]]:
-        """키워드 역인덱스 구축 - O(1) 검색"""
-        index = {}
-        for tech_name, tech in self.techniques.items():
+    def _build_keyword_index(self) -> Tuple[Dict[str, int], sparse.csr_matrix]:
+        """키워드 역인덱스 구축 - 어휘 해시맵 + (어휘 × 기술) 희소 출현 행렬
+        
+        값은 기술 키워드 목록에 나온 횟수, 설명에만 나오는 어절은 1 (열 순서는 techniques 순서)
+        """
+        vocabulary: Dict[str, int] = {}
+        counts: Dict[Tuple[int, int], int] = {}
+        for column, tech in enumerate(self.techniques.values()):
+            # 질의와 같은 정규화(normalize_query)를 거친 형태로 등록 - 'X자로'도 'x자로' 질의에 맞도록
             for keyword in tech.keywords:
-                if keyword not in index:
-                    index[keyword] = []
-                index[keyword].append(tech_name)
+                cell = (vocabulary.setdefault(normalize_query(keyword), len(vocabulary)), column)
+                counts[cell] = counts.get(cell, 0) + 1
             
             # 자연어 설명에서도 키워드 추출
             for desc in tech.descriptions:
-                words = desc.split()
+                words = normalize_query(desc).split()
                 for word in words:
                     if len(word) >= 2:  # 2글자 이상만
-                        if word not in index:
-                            index[word] = []
-                        if tech_name not in index[word]:
-                            index[word].append(tech_name)
-        return index
+                        counts.setdefault((vocabulary.setdefault(word, len(vocabulary)), column), 1)
+        
+        rows = [row for row, _ in counts]
+        columns = [column for _, column in counts]
+        matrix = sparse.csr_matrix(
+            (np.fromiter(counts.values(), dtype=np.int64, count=len(counts)), (rows, columns)),
+            shape=(len(vocabulary), len(self.techniques))
+        )
+        return vocabulary, matrix
     
     def _build_category_index(self) -> Dict[str, List[str]]:
         """카테고리 인덱스 구축"""
@@ -196,56 +211,147 @@ class OptimizedTechniqueDB:
 class HighPerformanceNLP:
     """고성능 자연어 처리 엔진"""
     
-    def __init__(self):
-        self.db = OptimizedTechniqueDB()
-        self.pattern_cache = {}  # 패턴 캐시
-        self.body_parts = {
-            "다리": ["다리", "발", "무릎", "허벅지", "발목", "종아리"],
-            "목": ["목", "목구멍", "목덜미", "경동맥"],
-            "팔": ["팔", "팔꿈치", "손목", "어깨", "겨드랑이"],
-            "몸통": ["몸통", "허리", "가슴", "등", "엉덩이", "배"]
-        }
-        self.actions = {
-            "꺾기": ["꺾기", "꺾는", "비트는", "관절기", "꺽는"],
-            "조르기": ["조르기", "조르는", "목조르기", "초크", "죄기"],
-            "넘기기": ["넘어뜨리기", "넘기기", "뒤집기", "던지기", "메치기"],
-            "잡기": ["잡기", "붙잡기", "고정하기", "컨트롤", "홀드"],
-            "밀기": ["밀기", "밀어내기", "밀어서", "누르기"],
-            "걸기": ["걸기", "거는", "걸어서", "후크"]
-        }
-        self.difficulty_words = {
-            "easy": ["기본", "쉬운", "간단한", "처음", "초보", "초급"],
-            "hard": ["어려운", "복잡한", "고급", "마스터", "상급", "고수"]
+    CACHE_FORMAT = 3  # 분석 로직/결과 형식이 바뀌면 올려서 영속 캐시 무효화
+    FEATURE_WEIGHTS = {"keyword": 3, "name": 10}  # 특징별 점수 (조합 점수는 조합 텐서에 포함)
+    
+    def __init__(self, cache_size: int = 1000, cache_ttl: float = 3600.0,
+                 technique_db: Optional[OptimizedTechniqueDB] = None,
+                 persistent_cache_path: Optional[str] = None,
+                 lexicon_path: str = SEARCH_LEXICON_PATH,
+                 analysis_cache: Optional[LRUCache] = None):
+        self.db = technique_db or get_shared_technique_db()
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.persistent_cache_path = persistent_cache_path
+        self.lexicon_path = lexicon_path
+        # 패턴 캐시 (LRU + TTL) - 사전 재로드 후에도 같은 캐시를 이어 쓸 수 있도록 외부 주입 허용
+        self.pattern_cache = analysis_cache or LRUCache(max_size=cache_size, ttl_seconds=cache_ttl)
+        
+        # 신체 부위/동작/난이도/의도/감정 사전 (data/search_lexicons.json)
+        lexicons = load_lexicon_source(lexicon_path)
+        self.lexicon_checksum = source_checksum(lexicon_path)
+        self.body_parts = lexicons["body_parts"]
+        self.actions = lexicons["actions"]
+        self.difficulty_words = lexicons["difficulty_words"]
+        self.intent_words = lexicons["intent_words"]
+        self.emotion_words = lexicons["emotion_words"]
+        self.intensity_words = lexicons["intensity_words"]
+        self.takedown_words = lexicons["takedown_words"]
+        self.beginner_words = lexicons["beginner_words"]
+        self.keyword_matcher = self._build_keyword_matcher()
+        # 조사/어미가 붙은 어절('하프가드에서', '스윕을')도 키워드 인덱스에 바로 맞도록 정규화.
+        # 신체 부위/동작 단어('다리를', '꺾는')는 제외 - 이미 오토마톤이 잡아 부위+동작 조합으로 점수를
+        # 매기므로, 여기서 '다리'/'꺾기' 키워드로 바꾸면 그 키워드를 가진 모든 기술(가드 전체, 레그락 등)이
+        # 함께 올라와 관련도가 떨어진다
+        combo_words = {
+            normalize_query(keyword)
+            for lexicon in (self.body_parts, self.actions)
+            for keywords in lexicon.values()
+            for keyword in keywords
         }
+        self.tokenizer = SuffixStemmer(
+            [word for word in self.db.keyword_vocabulary if word not in combo_words],
+            lexicons["particles"], lexicons["verb_endings"]
+        )
+        self._lexicon_version = self.lexicon_version()
+        
+        # 기술 매칭용 인덱스 - 모든 특징 점수를 구축 시 한 번만 계산 (질의마다 설명 문자열을 훑지 않음)
+        self._technique_names = list(self.db.techniques)
+        self._technique_index = {name: i for i, name in enumerate(self._technique_names)}
+        self._body_part_names = list(self.body_parts)
+        self._body_part_index = {name: i for i, name in enumerate(self._body_part_names)}
+        self._action_names = list(self.actions)
+        self._action_index = {name: i for i, name in enumerate(self._action_names)}
+        self._name_offset = len(self.db.keyword_vocabulary)
+        self._combo_offset = self._name_offset + len(self._technique_names)
+        self._scoring_matrix = self._build_scoring_matrix()
+        
+        # 선택적 디스크 캐시 (여러 워커 프로세스 공유)
+        self.persistent_cache = None
+        if persistent_cache_path:
+            self.persistent_cache = SQLiteAnalysisCache(
+                persistent_cache_path, 'high_performance_nlp', self._lexicon_version
+            )
+    
+    def _build_keyword_matcher(self) -> KeywordAutomaton:
+        """모든 사전 + 기술명을 하나의 오토마톤으로 컴파일 (분석은 텍스트 한 번 순회)
+        
+        분석은 normalize_query로 접은 텍스트를 스캔하므로 키워드도 같은 방식으로 접어 등록한다
+        ('50/50 가드' -> '50 50 가드'). 라벨은 원래 이름 그대로 유지.
+        """
+        matcher = KeywordAutomaton()
+        lexicons = [
+            ('body_part', self.body_parts),
+            ('action', self.actions),
+            ('difficulty', self.difficulty_words),
+            ('intent', self.intent_words),
+            ('emotion', self.emotion_words),
+            ('intensity', self.intensity_words),
+            ('takedown', {'takedown': self.takedown_words}),
+            ('beginner', {'beginner': self.beginner_words}),
+            ('technique', {tech_name: [tech_name] for tech_name in self.db.techniques})
+        ]
+        for category, lexicon in lexicons:
+            for label, keywords in lexicon.items():
+                for keyword in keywords:
+                    matcher.add(normalize_query(keyword), category, label)
+        return matcher.compile()
+    
+    def lexicon_version(self) -> str:
+        """사전 + 기술 DB 버전 해시 (캐시 키에 포함)"""
+        return lexicon_fingerprint(
+            self.CACHE_FORMAT, self.lexicon_checksum,
+            [vars(tech) for tech in self.db.techniques.values()]
+        )
     
     def analyze_query(self, text: str) -> Dict:
-        """쿼리 분석 - 캐시 활용"""
-        text_hash = hashlib.md5(text.encode()).hexdigest()
-        if text_hash in self.pattern_cache:
-            return self.pattern_cache[text_hash]
-        
-        text_lower = text.lower()
+        """쿼리 분석 - 캐시 활용 (메모리 LRU → 디스크 캐시 순)"""
+        normalized = normalize_query(text)
+        # 사전 버전을 키에 포함 - 재로드 전 항목은 조회되지 않고 LRU/TTL로 자연히 밀려남
+        cache_key = (self._lexicon_version, normalized)
+        cached = self.pattern_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        if self.persistent_cache is not None:
+            cached = self.persistent_cache.get(normalized)
+            if cached is not None:
+                self.pattern_cache.put(cache_key, cached)
+                return cached
+        
+        # 캐시 키와 같은 정규화 텍스트로 분석 - 구두점만 다른 질의가 같은 결과를 갖도록
         start_time = time.time()
+        hits = self.keyword_matcher.scan(normalized)
+        result = self._analyze_hits(hits, self._word_ids(normalized.split()), start_time)
+        
+        # 캐시 저장 (가득 차면 LRU 제거)
+        self.pattern_cache.put(cache_key, result)
+        if self.persistent_cache is not None:
+            self.persistent_cache.put(normalized, result)
         
+        return result
+    
+    def _analyze_hits(self, hits: KeywordHits, word_ids: List[int], start_time: float) -> Dict:
+        """스캔 결과로 분석 결과 구성 (전체 분석과 입력 중 분석이 같은 경로 사용)"""
         # 병렬 분석
-        body_parts = self._extract_body_parts(text_lower)
-        actions = self._extract_actions(text_lower)
-        difficulty = self._extract_difficulty(text_lower)
-        intent = self._extract_intent(text_lower)
+        body_parts = self._extract_body_parts(hits)
+        actions = self._extract_actions(hits)
+        difficulty = self._extract_difficulty(hits)
+        intent = self._extract_intent(hits)
         
         # 고속 기술 매칭
-        main_techs, similar_techs = self._match_techniques_fast(text_lower, body_parts, actions)
+        main_techs, similar_techs, confidence = self._match_techniques_fast(hits, word_ids)
         
         # 테이크다운 체크
-        takedowns = self._check_takedowns(text_lower)
+        takedowns = self._check_takedowns(hits)
         
         # 감정/강도 분석
-        emotion = self._analyze_emotion_fast(text_lower)
-        intensity = self._analyze_intensity_fast(text_lower)
+        emotion = self._analyze_emotion_fast(hits)
+        intensity = self._analyze_intensity_fast(hits)
         
-        result = {
+        return {
             "processing_time": time.time() - start_time,
-            "confidence": self._calculate_confidence(main_techs, similar_techs),
+            "confidence": confidence,
             "analysis": {
                 "body_parts": body_parts,
                 "actions": actions,
@@ -253,119 +359,201 @@ class HighPerformanceNLP:
                 "intent": intent,
                 "emotion": emotion,
                 "intensity": intensity,
-                "is_beginner": any(word in text_lower for word in ["초보", "처음", "모르", "기본"])
+                "is_beginner": hits.has('beginner')
             },
-            "main_techniques": main_techs[:8],  # 상위 8개
-            "similar_techniques": similar_techs[:12],  # 상위 12개
+            "main_techniques": main_techs,  # 상위 8개
+            "similar_techniques": similar_techs,  # 상위 12개
             "takedown_techniques": takedowns
         }
-        
-        # 캐시 저장 (최대 100개)
-        if len(self.pattern_cache) < 100:
-            self.pattern_cache[text_hash] = result
-        
-        return result
     
-    def _extract_body_parts(self, text: str) -> List[str]:
+    def start_session(self) -> 'IncrementalAnalysisSession':
+        """입력 중 분석 세션 (덧붙은 부분만 처리)"""
+        return IncrementalAnalysisSession(self)
+    
+    def analyze_many(self, texts: Iterable[str], max_workers: Optional[int] = None,
+                     chunk_size: int = 32) -> Iterator[Dict]:
+        """일괄 분석 - 중복 제거 후 입력 순서대로 결과 생성 (max_workers > 1이면 프로세스 풀)"""
+        results = iter_unique_results(
+            texts,
+            key=normalize_query,
+            compute=self.analyze_query,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            worker_factory=HighPerformanceNLP,
+            worker_kwargs={
+                'cache_size': self.cache_size,
+                'cache_ttl': self.cache_ttl,
+                'persistent_cache_path': self.persistent_cache_path,
+                'lexicon_path': self.lexicon_path
+            },
+            worker_method='analyze_query'
+        )
+        for _, result in results:
+            yield result
+    
+    def get_cache_stats(self) -> Dict:
+        """분석 캐시 통계 (적중/미스/제거 횟수)"""
+        stats = self.pattern_cache.stats()
+        if self.persistent_cache is not None:
+            stats['persistent'] = self.persistent_cache.stats()
+        return stats
+    
+    def _extract_body_parts(self, hits: KeywordHits) -> List[str]:
         """신체 부위 추출 - 최적화"""
-        found = []
-        for part, synonyms in self.body_parts.items():
-            if any(syn in text for syn in synonyms):
-                found.append(part)
-        return found
+        return hits.labels('body_part')
     
-    def _extract_actions(self, text: str) -> List[str]:
+    def _extract_actions(self, hits: KeywordHits) -> List[str]:
         """동작 추출 - 최적화"""
-        found = []
-        for action, synonyms in self.actions.items():
-            if any(syn in text for syn in synonyms):
-                found.append(action)
-        return found
+        return hits.labels('action')
     
-    def _extract_difficulty(self, text: str) -> str:
+    def _extract_difficulty(self, hits: KeywordHits) -> str:
         """난이도 추출"""
-        for level, words in self.difficulty_words.items():
-            if any(word in text for word in words):
-                return level
-        return "normal"
-    
-    def _extract_intent(self, text: str) -> str:
-        """의도 추출"""
-        if any(word in text for word in ["배우고", "배워", "알려", "가르쳐", "배우자"]):
-            return "learn"
-        elif any(word in text for word in ["약해", "당해", "못해", "어려워", "힘들어"]):
-            return "improve_weakness"
-        elif any(word in text for word in ["강화", "늘리고", "향상", "발전"]):
-            return "strengthen"
-        elif any(word in text for word in ["경기", "시합", "대회"]):
-            return "compete"
-        return "practice"
-    
-    def _match_techniques_fast(self, text: str, body_parts: List, actions: List) -> Tuple[List, List]:
-        """고속 기술 매칭 - 인덱스 활용"""
-        scores = {}
-        
-        # 1. 키워드 인덱스 활용한 고속 매칭
-        words = text.split()
-        for word in words:
-            if word in self.db.keyword_index:
-                for tech_name in self.db.keyword_index[word]:
-                    scores[tech_name] = scores.get(tech_name, 0) + 3
-        
-        # 2. 기술명 직접 매칭
-        for tech_name in self.db.techniques:
-            if tech_name.lower() in text:
-                scores[tech_name] = scores.get(tech_name, 0) + 10
-        
-        # 3. 신체부위 + 동작 조합 보너스
-        for tech_name, tech in self.db.techniques.items():
-            combo_score = 0
-            for desc in tech.descriptions:
-                desc_lower = desc.lower()
-                for bp in body_parts:
-                    if bp in desc_lower:
-                        combo_score += 2
-                for action in actions:
-                    if action in desc_lower:
-                        combo_score += 2
-                
-                # 조합 보너스
-                if body_parts and actions:
-                    for bp in body_parts:
-                        for action in actions:
-                            if bp in desc_lower and action in desc_lower:
-                                combo_score += 4
-            
-            if combo_score > 0:
-                scores[tech_name] = scores.get(tech_name, 0) + combo_score
-        
-        # 4. 결과 정렬 및 분류
-        sorted_techs = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        
-        main_techs = []
-        similar_techs = []
-        
-        for tech_name, score in sorted_techs:
+        return hits.first_label('difficulty') or "normal"
+    
+    def _extract_intent(self, hits: KeywordHits) -> str:
+        """의도 추출 (사전 순서가 우선순위)"""
+        return hits.first_label('intent') or "practice"
+    
+    def _word_ids(self, words: Iterable[str]) -> List[int]:
+        """어절 → 키워드 어휘 번호 (조사/어미 제거 후, 어휘에 없는 어절은 제외)"""
+        vocabulary = self.db.keyword_vocabulary
+        stems = map(self.tokenizer.stem, words)
+        return [vocabulary[stem] for stem in stems if stem in vocabulary]
+    
+    def _build_combo_tensor(self) -> np.ndarray:
+        """신체부위 × 동작 조합 점수 텐서 [기술, 신체부위 + 1, 동작 + 1]
+        
+        마지막 칸은 '단독' 슬롯 - [t, p, 단독]은 부위 p 단독 점수(설명당 2점),
+        [t, 단독, a]는 동작 a 단독 점수, [t, p, a]는 부위+동작 동시 등장 보너스(설명당 4점).
+        질의 점수는 감지된 부위/동작 칸과 단독 칸만 골라 더하면 된다.
+        """
+        tensor = np.zeros((len(self._technique_names), len(self._body_part_names) + 1,
+                           len(self._action_names) + 1), dtype=np.int64)
+        for t, tech_name in enumerate(self._technique_names):
+            for desc in self.db.techniques[tech_name].descriptions:
+                desc_lower = normalize_query(desc)
+                part_in = [bp in desc_lower for bp in self._body_part_names]
+                action_in = [action in desc_lower for action in self._action_names]
+                for p, found_part in enumerate(part_in):
+                    if found_part:
+                        tensor[t, p, -1] += 2
+                        for a, found_action in enumerate(action_in):
+                            if found_action:
+                                tensor[t, p, a] += 4
+                for a, found_action in enumerate(action_in):
+                    if found_action:
+                        tensor[t, -1, a] += 2
+        return tensor
+    
+    def _build_scoring_matrix(self) -> sparse.csr_matrix:
+        """특징 × 기술 가중치 행렬 (CSR)
+        
+        특징 = [키워드 어휘 | 기술명 | 조합 슬롯 (부위 + 1) × (동작 + 1)] 순으로 이어 붙이고,
+        키워드/기술명 행에는 FEATURE_WEIGHTS를 곱해 둔다 (조합 슬롯은 텐서에 가중치 포함).
+        """
+        technique_count = len(self._technique_names)
+        combo = self._build_combo_tensor().reshape(technique_count, -1).T
+        return sparse.vstack([
+            self.db.keyword_matrix * self.FEATURE_WEIGHTS["keyword"],
+            sparse.identity(technique_count, dtype=np.int64, format='csr') * self.FEATURE_WEIGHTS["name"],
+            sparse.csr_matrix(combo)
+        ], format='csr')
+    
+    def _query_features(self, hits: KeywordHits, word_ids: List[int]) -> np.ndarray:
+        """질의 특징 번호 목록 - 값은 모두 1이고 같은 번호가 반복되면 합산 (키워드 등장 횟수)"""
+        named = np.array([self._technique_index[name] for name in hits.labels('technique')], dtype=np.int64)
+        # 감지된 부위/동작 + 단독 슬롯(마지막 칸)의 모든 조합
+        parts = [self._body_part_index[bp] for bp in hits.labels('body_part')] + [len(self._body_part_names)]
+        actions = [self._action_index[action] for action in hits.labels('action')] + [len(self._action_names)]
+        slots = np.add.outer(np.array(parts, dtype=np.int64) * (len(self._action_names) + 1), actions).ravel()
+        
+        return np.concatenate((np.asarray(word_ids, dtype=np.int64), named + self._name_offset,
+                               slots + self._combo_offset))
+    
+    @staticmethod
+    def _csr_row_entries(matrix: sparse.csr_matrix, row_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """CSR 행들의 0이 아닌 항목 (row_ids 내 순번, 열, 값)
+        
+        질의 한 건처럼 작은 곱은 scipy 인덱싱 객체를 만드는 비용이 계산보다 커서 배열 연산으로 직접 모은다.
+        """
+        starts = matrix.indptr[row_ids]
+        lengths = matrix.indptr[row_ids + 1] - starts
+        row_numbers = np.repeat(np.arange(len(row_ids)), lengths)
+        positions = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return row_numbers, matrix.indices[positions], matrix.data[positions]
+    
+    def score_techniques_batch(self, texts: Iterable[str]) -> sparse.csr_matrix:
+        """오프라인 평가용 일괄 점수 - (질의 수 × 기술 수) 희소 행렬, 열은 db.techniques 순서
+        
+        질의별 특징 벡터를 행으로 쌓아 희소 행렬 곱 한 번으로 계산한다 (캐시 미사용).
+        """
+        rows, columns = [], []
+        for row, text in enumerate(texts):
+            normalized = normalize_query(text)
+            feature_ids = self._query_features(self.keyword_matcher.scan(normalized), self._word_ids(normalized.split()))
+            rows.append(np.full(len(feature_ids), row, dtype=np.int64))
+            columns.append(feature_ids)
+        
+        if not rows:
+            return sparse.csr_matrix((0, len(self._technique_names)), dtype=np.int64)
+        columns = np.concatenate(columns)
+        # 같은 (행, 특징) 항목은 합산되므로 반복 어절은 등장 횟수가 된다
+        features = sparse.csr_matrix(
+            (np.ones(len(columns), dtype=np.int64), (np.concatenate(rows), columns)),
+            shape=(len(rows), self._scoring_matrix.shape[0])
+        )
+        return features @ self._scoring_matrix
+    
+    def _top_techniques(self, candidates: np.ndarray, ranking_keys: np.ndarray, scores: np.ndarray,
+                        limit: int) -> List[Dict]:
+        """후보 중 상위 limit개 - argpartition으로 고른 뒤 그 안에서만 정렬"""
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-ranking_keys[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-ranking_keys[candidates])]
+        
+        top = []
+        for index in candidates:
+            tech_name = self._technique_names[index]
             tech = self.db.techniques[tech_name]
-            tech_info = {
+            top.append({
                 "name": tech_name,
                 "category": tech.category,
                 "difficulty": tech.difficulty,
                 "type": tech.type,
-                "score": score
-            }
-            
-            if score >= 5:
-                main_techs.append(tech_info)
-            elif score >= 2:
-                similar_techs.append(tech_info)
-        
-        return main_techs, similar_techs
-    
-    def _check_takedowns(self, text: str) -> List:
+                "score": int(scores[index])
+            })
+        return top
+    
+    def _match_techniques_fast(self, hits: KeywordHits, word_ids: List[int], main_limit: int = 8,
+                               similar_limit: int = 12) -> Tuple[List, List, float]:
+        """고속 기술 매칭 - (주요 기술 상위 main_limit개, 유사 기술 상위 similar_limit개, 신뢰도)"""
+        # 1~3. 키워드(+3) / 기술명(+10) / 신체부위 + 동작 조합 점수를 희소 벡터-행렬 곱 한 번으로
+        technique_count = len(self._technique_names)
+        feature_ids = self._query_features(hits, word_ids)
+        _, columns, weights = self._csr_row_entries(self._scoring_matrix, feature_ids)
+        scores = np.bincount(columns, weights=weights, minlength=technique_count).astype(np.int64)
+        
+        # 4. 순위 키 = 점수 우선, 동점이면 처음 점수를 받은 순서
+        #    (키워드: 어절 등장 순 → 기술 순, 그다음 기술명 매칭, 마지막으로 조합 점수만 받은 기술)
+        first_words = np.fromiter(dict.fromkeys(word_ids), dtype=np.int64)
+        word_ranks, keyword_columns, _ = self._csr_row_entries(self.db.keyword_matrix, first_words)
+        keyword_span = len(first_words) * technique_count
+        first_seen = np.arange(technique_count, dtype=np.int64) + keyword_span + technique_count
+        named = feature_ids[(feature_ids >= self._name_offset) & (feature_ids < self._combo_offset)] - self._name_offset
+        first_seen[named] = named + keyword_span
+        np.minimum.at(first_seen, keyword_columns, word_ranks * technique_count + keyword_columns)
+        ranking_keys = scores * (keyword_span + 2 * technique_count) - first_seen
+        
+        main_candidates = np.flatnonzero(scores >= 5)
+        similar_candidates = np.flatnonzero((scores >= 2) & (scores < 5))
+        main_techs = self._top_techniques(main_candidates, ranking_keys, scores, main_limit)
+        similar_techs = self._top_techniques(similar_candidates, ranking_keys, scores, similar_limit)
+        matched = scores[scores >= 2]
+        return main_techs, similar_techs, self._calculate_confidence(matched)
+    
+    def _check_takedowns(self, hits: KeywordHits) -> List:
         """테이크다운 확인"""
-        takedown_keywords = ["테이크다운", "넘어뜨리기", "던지기", "메치기", "태클", "서서", "스탠딩"]
-        if any(word in text for word in takedown_keywords):
+        if hits.has('takedown'):
             return [
                 {"name": name, "category": "테이크다운", "difficulty": tech.difficulty}
                 for name, tech in self.db.techniques.items()
@@ -373,35 +561,66 @@ class HighPerformanceNLP:
             ][:8]
         return []
     
-    def _analyze_emotion_fast(self, text: str) -> List[str]:
+    def _analyze_emotion_fast(self, hits: KeywordHits) -> List[str]:
         """빠른 감정 분석"""
-        emotions = []
-        if any(word in text for word in ["답답", "짜증", "힘들", "어려워"]):
-            emotions.append("frustration")
-        if any(word in text for word in ["재밌", "좋아", "즐거", "신나"]):
-            emotions.append("positive")
-        if any(word in text for word in ["무서", "걱정", "불안"]):
-            emotions.append("anxiety")
-        return emotions
-    
-    def _analyze_intensity_fast(self, text: str) -> str:
+        return hits.labels('emotion')
+    
+    def _analyze_intensity_fast(self, hits: KeywordHits) -> str:
         """빠른 강도 분석"""
-        if any(word in text for word in ["집중적", "강하게", "빡세게", "열심히", "완전히"]):
-            return "high"
-        elif any(word in text for word in ["가볍게", "천천히", "쉽게", "부드럽게"]):
-            return "low"
-        return "medium"
-    
-    def _calculate_confidence(self, main_techs: List, similar_techs: List) -> float:
-        """신뢰도 계산"""
-        if not main_techs and not similar_techs:
+        return hits.first_label('intensity') or "medium"
+    
+    def _calculate_confidence(self, matched_scores: np.ndarray) -> float:
+        """신뢰도 계산 (주요 + 유사 기술 전체 점수 기준)"""
+        if not len(matched_scores):
             return 0.0
         
-        total_score = sum(t.get("score", 0) for t in main_techs + similar_techs)
-        max_possible = len(main_techs + similar_techs) * 10
+        total_score = int(matched_scores.sum())
+        max_possible = len(matched_scores) * 10
         
         return min(total_score / max_possible, 1.0) if max_possible > 0 else 0.0
 
+class IncrementalAnalysisSession:
+    """입력 중(as-you-type) 분석 세션 - 이전 호출의 오토마톤 상태와 부분 결과를 유지
+    
+    텍스트 끝에 글자가 덧붙으면 그 부분만 스캔하고, 완성된 어절의 키워드 번호는 누적해 둔다.
+    중간을 고치거나 지우면 처음부터 다시 처리한다. 결과는 analyze_query와 같은 형식이며
+    캐시는 사용하지 않는다 (입력 중인 텍스트는 재사용될 일이 거의 없으므로).
+    """
+    
+    def __init__(self, nlp: HighPerformanceNLP):
+        self.nlp = nlp
+        self.scanner = IncrementalScanner(nlp.keyword_matcher)
+        self._reset_words()
+    
+    def _reset_words(self):
+        self._completed_ids: List[int] = []  # 공백으로 끝난(완성된) 어절의 키워드 어휘 번호
+        self._pending_word = ''  # 아직 입력 중인 마지막 어절
+    
+    def update(self, text: str) -> Dict:
+        """현재 입력 텍스트 기준 분석 결과"""
+        start_time = time.time()
+        # analyze_query와 같은 정규화 - 끝 공백은 남겨 마지막 어절이 끝났는지 구분
+        folded = fold_query(text)
+        scanned = self.scanner.update(folded)
+        if len(scanned) == len(folded):
+            self._reset_words()  # 처음부터 다시 스캔한 경우
+        
+        # 덧붙은 부분의 어절 경계 처리 - str.split()과 같은 공백 기준
+        pending = self._pending_word
+        completed = []
+        for char in scanned:
+            if char.isspace():
+                if pending:
+                    completed.append(pending)
+                    pending = ''
+            else:
+                pending += char
+        self._pending_word = pending
+        self._completed_ids.extend(self.nlp._word_ids(completed))
+        word_ids = self._completed_ids + self.nlp._word_ids([pending] if pending else [])
+        
+        return self.nlp._analyze_hits(self.scanner.result(), word_ids, start_time)
+
 # =============================================================================
 # 최적화된 DB 관리
 # =============================================================================
@@ -409,18 +628,20 @@ class HighPerformanceNLP:
 class OptimizedDB:
     """최적화된 데이터베이스"""
     
-    def __init__(self, db_name="bjj_optimized.db"):
+    def __init__(self, db_name="bjj_optimized.db", pool_size: int = 5):
         self.db_name = db_name
-        self.connection_pool = []
+        # 성능 PRAGMA는 연결 단위 설정이라 풀에서 연결을 만들 때마다 적용
+        self.connection_pool = shared_pool(
+            db_name,
+            size=pool_size,
+            pragmas=("journal_mode=WAL", "synchronous=NORMAL", "cache_size=10000"),
+            name=f"OptimizedDBPool({os.path.basename(db_name)})"
+        )
         self.init_db()
     
     def init_db(self):
         """DB 초기화 - 인덱스 최적화"""
-        with sqlite3.connect(self.db_name) as conn:
-            conn.execute("PRAGMA journal_mode=WAL")  # 성능 최적화
-            conn.execute("PRAGMA synchronous=NORMAL")
-            conn.execute("PRAGMA cache_size=10000")
-            
+        with self.connection_pool.transaction() as conn:
             cursor = conn.cursor()
             
             # 사용자 테이블
@@ -484,7 +705,7 @@ class OptimizedDB:
         """사용자 저장 - 최적화"""
         user_id = str(uuid.uuid4())
         try:
-            with sqlite3.connect(self.db_name) as conn:
+            with self.connection_pool.transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     "INSERT INTO users (id, username, belt) VALUES (?, ?, ?)",
@@ -496,7 +717,7 @@ class OptimizedDB:
     
     def get_user(self, username: str) -> Optional[Dict]:
         """사용자 조회 - 캐시 활용"""
-        with sqlite3.connect(self.db_name) as conn:
+        with self.connection_pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id, username, belt, skill_level FROM users WHERE username = ?", (username,))
             row = cursor.fetchone()
@@ -512,7 +733,7 @@ class OptimizedDB:
     def save_session(self, user_id: str, session_data: Dict) -> str:
         """세션 저장 - 배치 처리"""
         session_id = str(uuid.uuid4())
-        with sqlite3.connect(self.db_name) as conn:
+        with self.connection_pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO training_sessions 
@@ -530,7 +751,7 @@ class OptimizedDB:
     
     def update_mastery(self, user_id: str, technique: str, improvement: float = 0.1):
         """기술 숙련도 업데이트"""
-        with sqlite3.connect(self.db_name) as conn:
+        with self.connection_pool.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT OR REPLACE INTO technique_mastery 
@@ -552,9 +773,9 @@ class OptimizedDB:
 class AdvancedTrainingGenerator:
     """고성능 훈련 생성기"""
     
-    def __init__(self, db: OptimizedDB):
+    def __init__(self, db: OptimizedDB, technique_db: Optional[OptimizedTechniqueDB] = None):
         self.db = db
-        self.tech_db = OptimizedTechniqueDB()
+        self.tech_db = technique_db or get_shared_technique_db()
     
     def generate_optimized_program(self, selected_techniques: List[str], 
                                  user_data: Dict, duration: int = 60, 
@@ -877,6 +1098,39 @@ class AdvancedTrainingGenerator:
         
         return (diversity_score + balance_score) / 2.0
 
+# =============================================================================
+# 프로세스 공용 리소스 (모든 세션이 공유)
+# =============================================================================
+
+def get_shared_technique_db() -> OptimizedTechniqueDB:
+    """읽기 전용 기술 인덱스 - 프로세스당 한 번만 구축"""
+    return get_shared_resource('technique_db', OptimizedTechniqueDB)
+
+def _create_nlp_watcher() -> LexiconWatcher:
+    """사전 파일이 바뀌면 백그라운드에서 새 엔진을 만들어 교체 (분석 캐시는 버전 태그로 공유)"""
+    analysis_cache = LRUCache(
+        max_size=PERFORMANCE_METRICS["max_cache_size"],
+        ttl_seconds=PERFORMANCE_METRICS["cache_ttl_seconds"]
+    )
+    return LexiconWatcher(
+        [SEARCH_LEXICON_PATH],
+        lambda: HighPerformanceNLP(
+            cache_size=PERFORMANCE_METRICS["max_cache_size"],
+            cache_ttl=PERFORMANCE_METRICS["cache_ttl_seconds"],
+            persistent_cache_path=PERFORMANCE_METRICS["analysis_cache_path"],
+            analysis_cache=analysis_cache
+        ),
+        interval=PERFORMANCE_METRICS["lexicon_reload_interval"]
+    ).start()
+
+def get_shared_nlp() -> HighPerformanceNLP:
+    """공용 NLP 엔진 (현재 사전 버전) - 분석 캐시도 모든 세션이 함께 사용"""
+    return get_shared_resource('high_performance_nlp_watcher', _create_nlp_watcher).current
+
+def get_shared_db() -> OptimizedDB:
+    """공용 DB 핸들 (연결은 메서드 호출마다 열림)"""
+    return get_shared_resource('optimized_db', OptimizedDB)
+
 # =============================================================================
 # 최적화된 Streamlit UI
 # =============================================================================
@@ -888,11 +1142,12 @@ def main():
         initial_sidebar_state="collapsed"
     )
     
-    # 성능 최적화: 세션 상태 초기화
+    # 성능 최적화: 엔진/인덱스/캐시는 프로세스 공용, 세션에는 참조와 사용자 데이터만 보관
     if 'initialized' not in st.session_state:
-        st.session_state.db = OptimizedDB()
-        st.session_state.nlp = HighPerformanceNLP()
+        st.session_state.db = get_shared_db()
         st.session_state.initialized = True
+    # 실행(rerun)마다 현재 엔진을 다시 참조 - 사전이 재로드되면 다음 실행부터 새 버전 사용
+    st.session_state.nlp = get_shared_nlp()
     
     st.title("🥋 주짓수 고성능 AI 훈련 시스템")
     st.caption("⚡ 60가지 기술 스펙트럼 | 🧠 고성능 자연어 처리 | 🎯 맞춤형 훈련 생성")
@@ -995,6 +1250,16 @@ def create_optimized_interface():
         help="기술 이름을 몰라도 괜찮습니다. '다리 꺾는 거', '목 조르는 기술' 등으로 설명해주세요!"
     )
     
+    # 입력 중 실시간 추천 - 세션이 이전 입력의 분석 상태를 유지 (사전이 재로드되면 새 세션)
+    if query.strip():
+        session = st.session_state.get('query_session')
+        if session is None or session.nlp is not st.session_state.nlp:
+            session = st.session_state.query_session = st.session_state.nlp.start_session()
+        live = session.update(query)
+        suggestions = [tech["name"] for tech in live["main_techniques"][:5]]
+        if suggestions:
+            st.caption("💡 추천 기술: " + ", ".join(suggestions))
+    
     col1, col2 = st.columns([3, 1])
     with col1:
         analyze_btn = st.button("🚀 AI 분석 시작", type="primary", use_container_width=True)
@@ -1402,7 +1667,10 @@ BJJ_BELTS = {
 # 성능 모니터링
 PERFORMANCE_METRICS = {
     "target_analysis_time": 0.1,  # 100ms 목표
-    "max_cache_size": 100,
+    "max_cache_size": 1000,
+    "cache_ttl_seconds": 3600,
+    "analysis_cache_path": os.environ.get("BJJ_ANALYSIS_CACHE_PATH"),  # 설정 시 워커 간 디스크 캐시 공유
+    "lexicon_reload_interval": 2.0,  # 사전 파일 변경 확인 주기 (초)
     "db_connection_timeout": 30,
     "ui_refresh_rate": 60
 }
@@ -1425,4 +1693,11 @@ if __name__ == "__main__":
     if st.sidebar.button("🔧 개발자 정보"):
         runtime = time.time() - start_time
         st.sidebar.metric("페이지 로드 시간", f"{runtime:.2f}초")
+        if 'nlp' in st.session_state:
+            cache_stats = st.session_state.nlp.get_cache_stats()
+            st.sidebar.metric("분석 캐시 적중률", f"{cache_stats['hit_rate']:.0%}")
+            st.sidebar.caption(f"적중 {cache_stats['hits']} / 미스 {cache_stats['misses']} / 제거 {cache_stats['evictions']}")
+            if 'persistent' in cache_stats:
+                disk_stats = cache_stats['persistent']
+                st.sidebar.caption(f"디스크 캐시 {disk_stats['size']}건 / 적중률 {disk_stats['hit_rate']:.0%}")
         st.sidebar.info("고성능 최적화 시스템 v2.0")# 주짓수 최적화 고성능 시스템 V2 - 성능 향상 + 코드 최적화
\ No newline at end of file
@@ -10,17 +10,37 @@ import pandas as pd
 import numpy as np
 import sqlite3
 import json
+import os
 import hashlib
 import uuid
 import re
+from collections.abc import MutableMapping
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Optional
 from dataclasses import dataclass
 import random
 import sys
+import time
+import threading
 import contextlib
 import logging
 
+from bjj_backup import BackupManager
+from bjj_batch import iter_unique_results
+from bjj_cache import LRUCache, SQLiteAnalysisCache, get_shared_resource, lexicon_fingerprint
+from bjj_db_pool import ConnectionPool, shared_pool
+from bjj_lexicon import (
+    LEXICON_ARTIFACT_PATH, LEXICON_SOURCE_PATH, LexiconWatcher, load_compiled_lexicons, load_lexicon_source,
+    source_checksum, write_artifact
+)
+from bjj_metrics import MetricsRecorder
+from bjj_migrations import ChunkedMigration, MigrationProgress, MigrationRunner
+from bjj_text_index import (
+    BKTree, JamoTypoIndex, KeywordAutomaton, KeywordHits, NormalizedText, PhraseNormalizer,
+    levenshtein_distance
+)
+from bjj_write_behind import WriteBehindQueue
+
 # =============================================================================
 # 고도화된 NLP 시스템 V2 (새로 통합)
 # =============================================================================
@@ -33,104 +53,189 @@ class IntentPattern:
     difficulty_modifier: int  # -1: 쉽게, 0: 보통, 1: 어렵게
     confidence_boost: float
 
+_PENDING = object()
+
+class LazyAnalysis(MutableMapping):
+    """지연 계산 분석 결과 - dict처럼 쓰되 필드는 처음 조회할 때 계산 후 저장
+    
+    서비스 계층에서 여러 스레드가 같은 결과를 공유하므로 지연 필드는 락 아래에서 한 번만 계산한다.
+    """
+    
+    def __init__(self, values: Optional[Dict] = None):
+        self._items: Dict[str, Any] = dict(values or {})
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        # 재진입 허용 - factory가 같은 결과의 다른 필드를 읽을 수 있도록
+        self._lock = threading.RLock()
+    
+    def set_lazy(self, key: str, factory: Callable[[], Any]):
+        """조회 시점에 factory()로 계산할 필드 등록"""
+        self._items[key] = _PENDING
+        self._factories[key] = factory
+    
+    def merge(self, other):
+        """다른 결과의 필드를 가져옴 - 아직 계산되지 않은 필드는 원본에 위임 (계산 1회 공유)"""
+        if isinstance(other, LazyAnalysis):
+            for key, value in other._items.items():
+                if value is _PENDING:
+                    self.set_lazy(key, lambda key=key: other[key])
+                else:
+                    self[key] = value
+        else:
+            self.update(other)
+    
+    def is_computed(self, key: str) -> bool:
+        return self._items.get(key, _PENDING) is not _PENDING
+    
+    def to_dict(self) -> Dict:
+        """모든 필드를 계산한 일반 dict (저장/직렬화용)"""
+        return {key: self[key] for key in self._items}
+    
+    @staticmethod
+    def json_default(obj):
+        """json.dumps(default=...)용 - LazyAnalysis를 전체 dict로 직렬화"""
+        if isinstance(obj, LazyAnalysis):
+            return obj.to_dict()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    
+    def __getitem__(self, key: str) -> Any:
+        value = self._items[key]
+        if value is _PENDING:
+            with self._lock:
+                # 기다리는 동안 다른 스레드가 계산했으면 그 값을 사용
+                value = self._items[key]
+                if value is _PENDING:
+                    value = self._factories[key]()
+                    self._items[key] = value
+                    del self._factories[key]
+        return value
+    
+    def __setitem__(self, key: str, value: Any):
+        with self._lock:
+            self._items[key] = value
+            self._factories.pop(key, None)
+    
+    def __delitem__(self, key: str):
+        with self._lock:
+            del self._items[key]
+            self._factories.pop(key, None)
+    
+    def __contains__(self, key) -> bool:
+        return key in self._items  # 존재 여부 확인만으로는 계산하지 않음
+    
+    def __iter__(self):
+        return iter(self._items)
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __reduce__(self):
+        return (LazyAnalysis, (self.to_dict(),))
+    
+    def __repr__(self) -> str:
+        shown = {key: ('<lazy>' if value is _PENDING else value) for key, value in self._items.items()}
+        return f"LazyAnalysis({shown!r})"
+
 class EnhancedNLPProcessor:
     """고도화된 NLP 처리기 V2 - 패턴 기반 + 문맥 분석 + 사용자 학습"""
     
-    def __init__(self):
-        self.intent_patterns = self._load_intent_patterns()
-        self.negation_words = ['안', '않', '없', '못', '금지', '피하', '싫', '어려워', '힘들어']
-        self.intensity_words = {
-            'high': ['집중적', '강하게', '빡세게', '열심히', '완벽', '마스터', '경기', '시합'],
-            'medium': ['보통', '적당히', '무난하게', '일반적'],
-            'low': ['가볍게', '천천히', '쉽게', '부드럽게', '조심스럽게']
-        }
-        self.time_extractors = {
-            '30분': 30, '1시간': 60, '90분': 90, '2시간': 120,
-            '짧게': 30, '길게': 90, '오래': 120
-        }
-        self.bjj_technique_map = self._build_technique_map()
-        
-        self.performance_stats = {
-            'avg_time': [],
-            'avg_confidence': [],
-            'accuracy_rate': []
-        }
-
-        # V2 새 기능들
-        self.enhanced_synonyms = {
-            # 기술명 동의어 확장
-            '하프가드': ['하프', '반가드', 'half guard', '하프 가드', '하프가듣', '하프가들'],
-            '트라이앵글': ['삼각', '트라이앵글 초크', 'triangle', '트라이앙글', '트라이엥글'],
-            '기요틴': ['기요틴 초크', '단두대', 'guillotine', '기욜틴', '길로틴'],
-            '암바': ['팔꺾기', '관절기', 'armbar', '암바르', '아무바', '엠바', '엄바'],
-            '스위프': ['뒤집기', '역전', 'sweep', '스윕', '스위프'],
-            '패스': ['뚫기', '가드패스', 'pass', '패쓰'],
-            
-            # 감정 표현 동의어
-            '어려워': ['힘들어', '복잡해', '쉽지않아', '까다로워', '난해해'],
-            '좌절': ['답답', '짜증', '스트레스', '막막', '절망'],
-            '자신감': ['확신', '자신', '믿음', '신뢰'],
-            
-            # 의도 표현 동의어  
-            '배우고': ['학습하고', '익히고', '습득하고', '마스터하고'],
-            '연습': ['훈련', '드릴', '반복', '실습'],
-            '경기': ['시합', '대회', '토너먼트', '매치']
-        }
-        
-        # 부정 표현 확장
-        self.negation_patterns = {
-            'direct': ['안', '않', '없', '못', '금지', '피하', '싫', '말고'],
-            'indirect': ['빼고', '제외하고', '하지말고', '말아야', '피해야'],
-            'preference': ['보다는', '대신', '말고']
-        }
+    CACHE_FORMAT = 2  # 분석 로직/결과 형식(또는 analysis_key)이 바뀌면 올려서 영속 캐시 무효화
+    
+    # data/nlp_lexicons.json에서 읽어 같은 이름의 속성으로 설정하는 사전 목록
+    LEXICON_ATTRIBUTES = (
+        'intent_patterns', 'negation_words', 'intensity_words', 'time_extractors',
+        'bjj_technique_map', 'enhanced_synonyms', 'negation_patterns', 'intensity_modifiers',
+        'context_clues', 'level_keywords', 'position_keywords', 'time_keywords',
+        'experience_indicators', 'duration_hints', 'difficulty_indicators', 'injury_patterns',
+        'time_constraint_words', 'emotion_keywords', 'gi_keywords', 'refined_intensity_modifiers',
+        'time_contexts', 'learning_styles', 'intent_hint_keywords', 'negation_scope_patterns'
+    )
+    
+    def __init__(self, persistent_cache_path: Optional[str] = None, stats_window: int = 1000,
+                 lexicon_path: str = LEXICON_SOURCE_PATH,
+                 lexicon_artifact_path: str = LEXICON_ARTIFACT_PATH,
+                 rebuild_lexicons: bool = False,
+                 performance_stats: Optional[MetricsRecorder] = None,
+                 user_db_path: str = "bjj_training.db",
+                 user_patterns: Optional['UserPatternStore'] = None):
+        self.persistent_cache_path = persistent_cache_path
+        self.lexicon_path = lexicon_path
+        self.lexicon_artifact_path = lexicon_artifact_path
         
-        # 감정 강도 지시어
-        self.intensity_modifiers = {
-            'very_high': ['완전', '정말', '너무너무', '아주아주', '엄청'],
-            'high': ['너무', '정말', '매우', '아주', '완전히'],
-            'medium': ['좀', '조금', '약간', '제법', '꽤'],
-            'low': ['살짝', '다소', '조금은', '약간은']
-        }
+        # 로거 설정
+        self.logger = self._setup_logger()
         
-        # 문맥 단서 확장
-        self.context_clues = {
-            'urgency': {
-                'immediate': ['지금 당장', '급하게', '빨리', '곧', '내일'],
-                'soon': ['이번주', '빠른 시일', '조만간'],
-                'later': ['나중에', '언젠가', '천천히']
-            },
-            'confidence_level': {
-                'low': ['잘 모르겠', '확실하지', '아마도', '혹시'],
-                'medium': ['생각해봐야', '고민중', '검토'],
-                'high': ['확실히', '분명히', '반드시', '꼭']
-            }
-        }
+        # 키워드 사전 + 컴파일된 인덱스 (오토마톤, 퍼지 인덱스, 치환기, 정규식)는
+        # 미리 빌드된 아티팩트에서 읽는다 - 원본이 바뀌었으면 다시 컴파일
+        compiled, self.lexicon_checksum = load_compiled_lexicons(
+            self._compile_lexicons, lexicon_path, lexicon_artifact_path, rebuild=rebuild_lexicons
+        )
+        self._apply_compiled_lexicons(compiled)
         
-        # 기존 NLP 호환성 유지
-        self.level_keywords = {
-            'beginner': ['초보', '초급', '새로운', '처음', '기초', '화이트'],
-            'intermediate': ['중급', '중간', '어느정도', '보통', '경험', '블루', '퍼플', '하프'],
-            'advanced': ['고급', '상급', '고수', '전문', '숙련', '마스터', '브라운', '블랙', '딥하프']
-        }
+        # 지표별 링 버퍼 (최근 stats_window건) - 단계별 소요 시간(ns)은 'stage:' 접두어로 기록해
+        # 느린 요청이 DB 때문인지 문자열 매칭 때문인지 구분한다 (사전 재로드 시 기존 지표를 넘겨받음)
+        self.performance_stats = performance_stats or MetricsRecorder(window=stats_window)
         
-        self.position_keywords = {
-            'guard': ['가드', '가아드', 'guard', '하체', '다리', '하프', 'half', '하프가드', '딥하프', 'z가드', 'Z가드'],
-            'mount': ['마운트', 'mount', '올라타기', '압박'],
-            'side_control': ['사이드', '사이드컨트롤', 'side', '옆'],
-            'back_control': ['백', '등', 'back', '뒤'],
-            'submission': ['서브미션', '서브', '조르기', '잠그기', '관절기'],
-            'sweep': ['스윕', '뒤집기', 'sweep', '역전'],
-            'guard_pass': ['패스', 'pass', '가드패스', '뚫기']
-        }
+        # 사용자 패턴 저장소 - 컨텍스트는 캐시에서 읽고, 패턴 업데이트는 백그라운드에서 일괄 기록
+        # (사전 재로드로 처리기가 바뀌어도 같은 저장소를 이어 쓰도록 외부 주입 허용)
+        self.user_patterns = user_patterns or UserPatternStore(user_db_path)
         
-        self.time_keywords = {
-            'short': ['짧은', '빠른', '30분', '짧게'],
-            'medium': ['중간', '1시간', '보통'],
-            'long': ['긴', '오래', '2시간', '길게']
+        # 선택적 디스크 캐시 - 사용자와 무관한 분석 부분만 저장 (여러 워커 공유)
+        self.persistent_cache = None
+        if persistent_cache_path:
+            self.persistent_cache = SQLiteAnalysisCache(
+                persistent_cache_path, 'enhanced_nlp_v2', self.lexicon_version()
+            )
+    
+    def lexicon_version(self) -> str:
+        """키워드 사전 버전 해시 (영속 캐시 키에 포함)"""
+        return lexicon_fingerprint(self.CACHE_FORMAT, self.lexicon_checksum)
+    
+    @staticmethod
+    def analysis_key(text: str) -> str:
+        """텍스트 분석 결과를 공유해도 되는 입력 키 (영속 캐시/일괄 분석/요청 병합 공용)
+
+        텍스트 분석은 소문자화 + 앞뒤 공백 제거한 텍스트에만 의존하므로 그 문자열을 그대로 키로 쓴다.
+        문장부호는 부정/문맥 분석 결과를 바꿀 수 있어 접지 않는다 ('노기 말고' vs '노기, 말고').
+        """
+        return text.lower().strip()
+    
+    def _apply_lexicon_data(self, lexicons: Dict):
+        """원본 사전을 속성으로 설정"""
+        for name in self.LEXICON_ATTRIBUTES:
+            setattr(self, name, lexicons[name])
+        self.intent_patterns = [IntentPattern(**pattern) for pattern in lexicons['intent_patterns']]
+    
+    @classmethod
+    def compile_lexicons(cls, lexicons: Dict) -> Dict:
+        """처리기를 만들지 않고 사전만 컴파일 (build-lexicons용 - 사용자 패턴 저장소/캐시를 열지 않음)"""
+        # 아래 빌더들은 사전 속성만 읽으므로 __init__ 없이 만든 빈 인스턴스로 충분하다
+        return cls.__new__(cls)._compile_lexicons(lexicons)
+    
+    # _compile_lexicons와 _build_* 빌더의 결과는 아티팩트로 저장된다 - 컴파일 로직을 바꾸면
+    # bjj_lexicon.ARTIFACT_FORMAT을 올려야 이전 로직으로 만든 아티팩트가 재빌드된다
+    # (원본 체크섬만 비교하므로 사전 파일이 그대로면 바뀐 로직이 반영되지 않음)
+    def _compile_lexicons(self, lexicons: Dict) -> Dict:
+        """원본 사전 → 컴파일 결과 (아티팩트로 저장되는 내용)"""
+        self._apply_lexicon_data(lexicons)
+        return {
+            'lexicons': lexicons,
+            'fuzzy_index': self._build_fuzzy_index(),
+            # 오타는 별도 테이블 없이 자모 인덱스로 교정 ('하프가듣', '기욜틴' 등)
+            'text_normalizer': self._build_text_normalizer(),
+            # 모든 키워드 사전을 하나의 오토마톤으로 컴파일 (요청당 텍스트 1회 순회)
+            'keyword_matcher': self._build_keyword_matcher(),
+            'negation_regexes': [
+                (re.compile(pattern), neg_type)
+                for pattern, neg_type in lexicons['negation_scope_patterns']
+            ]
         }
-        
-        # 로거 설정
-        self.logger = self._setup_logger()
+    
+    def _apply_compiled_lexicons(self, compiled: Dict):
+        self._apply_lexicon_data(compiled['lexicons'])
+        self.fuzzy_index = compiled['fuzzy_index']
+        self.text_normalizer = compiled['text_normalizer']
+        self.keyword_matcher = compiled['keyword_matcher']
+        self.negation_regexes = compiled['negation_regexes']
         
     def _setup_logger(self) -> logging.Logger:
         """로거 설정"""
@@ -144,293 +249,242 @@ class EnhancedNLPProcessor:
             logger.addHandler(handler)
             logger.setLevel(logging.INFO)
         return logger
+
+    def _build_text_normalizer(self) -> PhraseNormalizer:
+        """동의어 테이블 + 자모 오타 인덱스를 최장 일치 치환기로 컴파일"""
+        normalizer = PhraseNormalizer()
+        canonical = {}
         
-    def _load_intent_patterns(self) -> List[IntentPattern]:
-        return [
-            # 경쟁 의도를 최우선으로 (새로 추가)
-            IntentPattern(
-                intent='compete',
-                patterns=['경기', '시합', '대회', '승급', '심사', '테스트', '준비'],
-                difficulty_modifier=1,
-                confidence_boost=0.95
-            ),
-            # 강화 의도 추가 (새로 추가)
-            IntentPattern(
-                intent='strengthen',
-                patterns=['마스터', '완전히', '완벽하게', '강화', '향상', '발전'],
-                difficulty_modifier=1,
-                confidence_boost=0.9
-            ),
-            IntentPattern(
-                intent='learn',
-                patterns=['배우고', '학습', '익히고', '습득', '처음', '시작', '배워보고',
-                        '차근차근', '천천히', '단계별로', '기초부터', '새로운'],
-                difficulty_modifier=-1,
-                confidence_boost=0.8
-            ),
-            # 기존 나머지 패턴들은 그대로 유지...
-            IntentPattern(
-                intent='review',
-                patterns=['복습', '다시', '재연습', '점검', '확인', '정리'],
-                difficulty_modifier=0,
-                confidence_boost=0.7
-            ),
-            IntentPattern(
-                intent='practice',
-                patterns=['연습', '훈련', '드릴', '반복'],
-                difficulty_modifier=0,
-                confidence_boost=0.6
-            ),
-            IntentPattern(
-                intent='avoid',
-                patterns=['피하고', '제외', '빼고', '하지말고', '말고'],
-                difficulty_modifier=-1,
-                confidence_boost=0.9
-            ),
-            IntentPattern(
-                intent='improve_weakness',
-                patterns=['약해서', '취약', '당하는', '못하겠', '어려워서', '힘들어서', '자꾸 당해'],
-                difficulty_modifier=-1,
-                confidence_boost=0.8
-            )
+        for standard_term, synonyms in self.enhanced_synonyms.items():
+            # 표준어 자체도 등록해야 '하프가드' 안의 '하프'가 다시 치환되지 않는다
+            for phrase in [standard_term] + synonyms:
+                canonical.setdefault(phrase, standard_term)
+                normalizer.add(phrase, canonical[phrase])
+        
+        # 기술명/별칭은 그대로 보존 ('하프패스'가 '하프'로 잘려 치환되지 않도록)
+        technique_names = [
+            name.lower()
+            for technique, info in self.bjj_technique_map.items()
+            for name in [technique] + info['aliases']
         ]
+        for name in technique_names:
+            normalizer.add(name, name)
+        
+        # 오타 교정 대상: 기술명/별칭 + 동의어 (교정 결과는 표준어) - 동사 활용형('배으고', '어려와')도
+        # 교정하되, 마지막 음절이 다른 어미로 바뀐 정상 단어('마스터하기')는 JamoTypoIndex가 걸러낸다
+        typo_index = JamoTypoIndex()
+        for term in technique_names + list(canonical):
+            typo_index.add(term, normalizer.normalize(term).text)
+        normalizer.typo_index = typo_index
+        
+        return normalizer
     
-    def _build_technique_map(self) -> Dict[str, Dict]:
-        """BJJ 기술 매핑 테이블 (확장)"""
-        return {
-            # 가드 관련
-            '하프가드': {'category': 'guard', 'difficulty': 2, 'aliases': ['하프', '반가드', '하프 가드']},
-            '클로즈드가드': {'category': 'guard', 'difficulty': 1, 'aliases': ['클로즈드', '풀가드', '클로즈 가드']},
-            '오픈가드': {'category': 'guard', 'difficulty': 2, 'aliases': ['오픈', '오픈 가드']},
-            '딥하프가드': {'category': 'guard', 'difficulty': 4, 'aliases': ['딥하프', '딥 하프', '딥 하프 가드']},
-            '버터플라이가드': {'category': 'guard', 'difficulty': 2, 'aliases': ['버터플라이', '나비가드']},
-            '스파이더가드': {'category': 'guard', 'difficulty': 3, 'aliases': ['스파이더', '거미가드']},
-            'Z가드': {'category': 'guard', 'difficulty': 3, 'aliases': ['z가드', '지가드']},
-            
-            # 서브미션
-            '암바': {'category': 'submission', 'difficulty': 2, 'aliases': ['팔꺾기', '관절기', '암바']},
-            '초크': {'category': 'submission', 'difficulty': 2, 'aliases': ['조르기', '목조르기', '체크']},
-            '트라이앵글': {'category': 'submission', 'difficulty': 3, 'aliases': ['삼각', '트라이앵글 초크']},
-            '기요틴': {'category': 'submission', 'difficulty': 2, 'aliases': ['기요틴 초크', '단두대']},
-            '키무라': {'category': 'submission', 'difficulty': 2, 'aliases': ['키무라 락']},
-            '리어네이키드초크': {'category': 'submission', 'difficulty': 2, 'aliases': ['리어네이키드', '뒤초크', 'RNC']},
-            
-            # 스윕
-            '스윕': {'category': 'sweep', 'difficulty': 2, 'aliases': ['뒤집기', '역전', '스위프']},
-            '시저스윕': {'category': 'sweep', 'difficulty': 2, 'aliases': ['시저', '가위스윕']},
-            '힙범프스윕': {'category': 'sweep', 'difficulty': 1, 'aliases': ['힙범프', '엉덩이스윕']},
-            '플라워스윕': {'category': 'sweep', 'difficulty': 2, 'aliases': ['플라워', '꽃스윕']},
-            '하프가드스윕': {'category': 'sweep', 'difficulty': 2, 'aliases': ['하프스윕']},
-            '올드스쿨스윕': {'category': 'sweep', 'difficulty': 3, 'aliases': ['올드스쿨']},
-            
-            # 패스
-            '가드패스': {'category': 'guard_pass', 'difficulty': 2, 'aliases': ['패스', '뚫기', '가드 패스']},
-            '토리안도패스': {'category': 'guard_pass', 'difficulty': 2, 'aliases': ['토리안도', '투우사패스']},
-            '더블언더패스': {'category': 'guard_pass', 'difficulty': 2, 'aliases': ['더블언더', '더블 언더']},
-            '하프가드패스': {'category': 'guard_pass', 'difficulty': 2, 'aliases': ['하프패스']},
-            '크로스페이스패스': {'category': 'guard_pass', 'difficulty': 3, 'aliases': ['크로스페이스', '크로스 페이스']},
-            
-            # 포지션
-            '마운트': {'category': 'mount', 'difficulty': 1, 'aliases': ['마운팅', '마운트 포지션']},
-            '하이마운트': {'category': 'mount', 'difficulty': 2, 'aliases': ['하이 마운트', '높은마운트']},
-            'S마운트': {'category': 'mount', 'difficulty': 3, 'aliases': ['에스마운트', 'S-마운트']},
-            '사이드컨트롤': {'category': 'side_control', 'difficulty': 1, 'aliases': ['사이드', '옆 컨트롤', '사이드 컨트롤']},
-            '니온벨리': {'category': 'side_control', 'difficulty': 2, 'aliases': ['무릎배', '니온벨리']},
-            '백컨트롤': {'category': 'back_control', 'difficulty': 2, 'aliases': ['백', '등 컨트롤', '백 컨트롤']},
-            '바디트라이앵글': {'category': 'back_control', 'difficulty': 3, 'aliases': ['바디트라이앵글', '몸삼각']}
-        }
-    
+    def _build_keyword_matcher(self) -> KeywordAutomaton:
+        """분석기들이 사용하는 모든 키워드 사전을 오토마톤으로 컴파일"""
+        matcher = KeywordAutomaton()
+
+        for technique, info in self.bjj_technique_map.items():
+            matcher.add(technique, 'technique_name', technique)
+            matcher.add(technique, 'technique', technique)
+            for alias in info['aliases']:
+                matcher.add(alias, 'technique', technique)
+
+        for pattern in self.intent_patterns:
+            for keyword in pattern.patterns:
+                matcher.add(keyword, 'intent', pattern.intent)
+
+        for expr in self.time_extractors:
+            matcher.add(expr, 'duration', expr)
+
+        for standard, synonyms in self.enhanced_synonyms.items():
+            matcher.add_lexicon('synonym', {standard: [standard] + synonyms})
+
+        for pattern in self.injury_patterns:
+            matcher.add(pattern, 'injury', pattern)
+        matcher.add_lexicon('time_constraint', {'time': self.time_constraint_words})
+
+        matcher.add_lexicon('position', self.position_keywords)
+        matcher.add_lexicon('experience', self.experience_indicators)
+        matcher.add_lexicon('duration_hint', self.duration_hints)
+        matcher.add_lexicon('difficulty', self.difficulty_indicators)
+        matcher.add_lexicon('emotion', self.emotion_keywords)
+        matcher.add_lexicon('gi', self.gi_keywords)
+        matcher.add_lexicon('intensity', self.refined_intensity_modifiers)
+        matcher.add_lexicon('time_preference', self.time_contexts)
+        matcher.add_lexicon('learning_style', self.learning_styles)
+        matcher.add_lexicon('urgency', self.context_clues['urgency'])
+        matcher.add_lexicon('user_confidence', self.context_clues['confidence_level'])
+        matcher.add_lexicon('intent_hint', self.intent_hint_keywords)
+
+        return matcher.compile()
+
      # 기존 analyze_user_request 메서드 수정
     def analyze_user_request(self, text: str, user_id: str = None) -> Dict:
         """고도화된 사용자 요청 분석 V2 - 개선된 버전"""
-        import time
         start_time = time.time()
+        processed_text, text_analysis = self._analyze_text(text)
+        return self._finalize_analysis(text, processed_text, text_analysis, user_id, start_time)
+    
+    def analyze_many(self, texts: Iterable[str], user_ids: Optional[Iterable[str]] = None,
+                     max_workers: Optional[int] = None, chunk_size: int = 32) -> Iterator[Dict]:
+        """일괄 분석 - 입력 순서대로 결과를 생성
+        
+        analysis_key가 같은 텍스트(분석 결과가 같은 입력)는 한 번만 분석하고, max_workers > 1이면 텍스트 분석을
+        프로세스 풀에 chunk_size 단위로 나눈다. 사용자별 부분은 현재 프로세스에서 처리.
+        """
+        texts = list(texts)
+        user_ids = list(user_ids) if user_ids is not None else [None] * len(texts)
+        if len(user_ids) != len(texts):
+            raise ValueError("texts와 user_ids의 길이가 다릅니다")
+        
+        results = iter_unique_results(
+            zip(texts, user_ids),
+            key=lambda item: self.analysis_key(item[0]),
+            compute=self._analyze_text,
+            payload=lambda item: item[0],
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            worker_factory=EnhancedNLPProcessor,
+            worker_kwargs={
+                'persistent_cache_path': self.persistent_cache_path,
+                'lexicon_path': self.lexicon_path,
+                'lexicon_artifact_path': self.lexicon_artifact_path
+            },
+            worker_method='_analyze_text_eager'
+        )
+        for (text, user_id), (processed_text, text_analysis) in results:
+            yield self._finalize_analysis(text, processed_text, text_analysis, user_id, time.time())
+    
+    def _analyze_text(self, text: str) -> Tuple[str, Dict]:
+        """사용자와 무관한 텍스트 분석 (디스크 캐시 대상) - (전처리 텍스트, 분석 결과)
+        
+        기본 분석만 즉시 계산하고 V2 부가 분석은 처음 조회할 때 계산한다.
+        디스크 캐시를 쓰면 저장을 위해 전체를 계산한다.
+        """
+        cache_key = self.analysis_key(text)
+        if self.persistent_cache is not None:
+            t = time.perf_counter_ns()
+            cached = self.persistent_cache.get(cache_key)
+            self._record_stage('cache_lookup', t)
+            if cached is not None:
+                return cached['processed_text'], cached['analysis']
         
         # 1. 텍스트 전처리 강화
+        t = time.perf_counter_ns()
         processed_text = self._enhanced_preprocessing(text)
-        
-        # 2. 개선된 퍼지 매칭 적용
-        fuzzy_techniques = self._fuzzy_match_techniques(processed_text)
-        
-        # 3. 사용자 컨텍스트 로드
-        user_context = self._get_user_context(user_id) if user_id else {}
-        
-        # 4. 기존 분석 실행
-        base_analysis = self._original_analyze_user_request(processed_text)
-        
-        # 5. V2 분석 추가 (기존 코드 유지)
-        v2_enhancements = {
-            'synonym_matches': self._find_synonym_matches(processed_text),
-            'negation_analysis': self._enhanced_negation_analysis(processed_text),  # 개선된 메서드
-            'intensity_analysis': self._analyze_intensity(processed_text),
-            'context_analysis': self._enhanced_context_analysis(processed_text),  # 개선된 메서드
-            'user_context': user_context,
-            'user_pattern_match': self._match_user_patterns(processed_text, user_context),
-            'fuzzy_techniques': fuzzy_techniques  # 새로 추가
-        }
-        
-        # 6. 결과 통합
-        enhanced_result = {**base_analysis, **v2_enhancements}
-        enhanced_result['confidence_score'] = self._calculate_dynamic_confidence(enhanced_result, user_context)
+        t = self._record_stage('preprocessing', t)
+        
+        # 키워드 사전 전체를 한 번에 스캔 (이후 분석기는 히트 목록만 조회)
+        hits = self.keyword_matcher.scan(processed_text)
+        t = self._record_stage('keyword_scan', t)
+        
+        # 2. 기존 분석 실행
+        text_analysis = LazyAnalysis(self._original_analyze_user_request(processed_text, hits))
+        t = self._record_stage('base_analysis', t)
+        
+        # 3. V2 분석 추가 (조회 시 계산)
+        text_analysis.set_lazy('synonym_matches', self._timed_stage(
+            'synonym_matches', lambda: self._find_synonym_matches(hits)))
+        text_analysis.set_lazy('negation_analysis', self._timed_stage(
+            'negation_analysis', lambda: self._enhanced_negation_analysis(processed_text)))  # 개선된 메서드
+        text_analysis.set_lazy('intensity_analysis', self._timed_stage(
+            'intensity_analysis', lambda: self._analyze_intensity(hits)))
+        text_analysis.set_lazy('context_analysis', self._timed_stage(
+            'context_analysis', lambda: self._enhanced_context_analysis(hits)))  # 개선된 메서드
+        text_analysis.set_lazy('fuzzy_techniques', self._timed_stage(
+            'fuzzy_match', lambda: self._fuzzy_match_techniques(processed_text)))  # 개선된 퍼지 매칭
+        
+        if self.persistent_cache is not None:
+            text_analysis = text_analysis.to_dict()
+            t = time.perf_counter_ns()
+            self.persistent_cache.put(cache_key, {
+                'processed_text': processed_text,
+                'analysis': text_analysis
+            })
+            self._record_stage('cache_store', t)
+        return processed_text, text_analysis
+    
+    def _analyze_text_eager(self, text: str) -> Tuple[str, Dict]:
+        """전체 계산된 텍스트 분석 (프로세스 간 전달용)"""
+        processed_text, text_analysis = self._analyze_text(text)
+        return processed_text, dict(text_analysis)
+    
+    def _finalize_analysis(self, text: str, processed_text: str, text_analysis: Dict,
+                           user_id: Optional[str], start_time: float,
+                           user_context: Optional[Dict] = None) -> LazyAnalysis:
+        """사용자별 분석 추가 + 성능 추적 + 패턴 학습 (user_context를 미리 읽었으면 DB 조회 생략)"""
+        # 4. 사용자 컨텍스트 로드 (사용자별이므로 캐시하지 않음)
+        if user_context is None:
+            t = time.perf_counter_ns()
+            user_context = self._get_user_context(user_id) if user_id else {}
+            self._record_stage('user_context', t)
+        
+        # 5. 결과 통합 (텍스트 분석의 미계산 필드는 그대로 지연 유지)
+        enhanced_result = LazyAnalysis()
+        enhanced_result.merge(text_analysis)
+        enhanced_result['user_context'] = user_context
+        enhanced_result.set_lazy('user_pattern_match', self._timed_stage(
+            'user_pattern_match',
+            lambda: self._match_user_patterns(
+                processed_text, user_context, self.keyword_matcher.scan(processed_text))
+        ))
+        
+        def dynamic_confidence() -> float:
+            confidence = self._calculate_dynamic_confidence(text_analysis, user_context)
+            self.performance_stats.record('confidence', confidence)
+            return confidence
+        
+        enhanced_result.set_lazy('confidence_score', self._timed_stage('confidence', dynamic_confidence))
         enhanced_result['analysis_method'] = 'enhanced_pattern_based_v2_improved'
         
-        # 7. 성능 추적
+        # 6. 성능 추적 (지연 필드 계산 시간은 단계별 통계에만 반영)
         analysis_time = time.time() - start_time
-        self._track_analysis_performance(text, analysis_time, enhanced_result['confidence_score'])
+        self._track_analysis_performance(text, analysis_time)
         
-        # 8. 사용자 패턴 업데이트 (최적화된 버전)
+        # 7. 사용자 패턴 업데이트 (최적화된 버전)
         if user_id:
+            t = time.perf_counter_ns()
             self._optimize_user_patterns_update(user_id, processed_text, enhanced_result)
+            self._record_stage('pattern_update', t)
         
         return enhanced_result
-    def _enhanced_preprocessing(self, text: str) -> str:
-        processed = text.lower().strip()
-        
-        # 동의어 정규화
-        for standard_term, synonyms in self.enhanced_synonyms.items():
-            for synonym in synonyms:
-                processed = processed.replace(synonym, standard_term)
-        
-        # 일반적인 오타 수정
-        typo_fixes = {
-            '하프가드ㄷ': '하프가드',
-            '트라이앙글': '트라이앵글', 
-            '기욜틴': '기요틴',
-            '배으고': '배우고',
-            '어려와': '어려워'
-        }
-        
-        for typo, correct in typo_fixes.items():
-            processed = processed.replace(typo, correct)
-        
-        return processed
+    
     # 새로 추가되는 메서드들
     def _fuzzy_match_techniques(self, text: str) -> List[str]:
-        """유사도 기반 기술명 매칭"""
-        detected = []
-        words = text.split()
+        """유사도 기반 기술명 매칭 (BK-트리 인덱스 조회)"""
+        detected = set()
         
-        for technique, info in self.bjj_technique_map.items():
-            all_names = [technique] + info.get('aliases', [])
-            
-            for word in words:
-                for name in all_names:
-                    similarity = self._levenshtein_similarity(word, name)
-                    if similarity > 0.8:  # 80% 이상 유사하면 매칭
-                        detected.append(technique)
-                        break
-                if detected and technique in detected:
-                    break
-        
-        return list(set(detected))
-    def _find_synonym_matches(self, text: str) -> Dict:
-        matches = {}
-        for standard, synonyms in self.enhanced_synonyms.items():
-            if standard in text or any(syn in text for syn in synonyms):
-                matches[standard] = True
-        return matches
-
-    def _enhanced_context_analysis(self, text: str) -> Dict:
-        context = {}
+        for word in set(text.split()):
+            # 유사도 > 0.8  <=>  거리 < 0.2 * max(len) 이므로 후보 거리는 len(word) / 4 미만
+            max_distance = (len(word) - 1) // 4
+            for name, distance in self.fuzzy_index.search(word, max_distance):
+                if 1.0 - distance / max(len(word), len(name)) > 0.8:  # 80% 이상 유사하면 매칭
+                    detected.update(self.fuzzy_index.payloads(name))
         
-        # 시간적 맥락 개선
-        time_contexts = {
-            'immediate': ['지금', '당장', '오늘', '바로'],
-            'this_week': ['이번주', '주말', '곧'],
-            'gradual': ['천천히', '차근차근', '점진적으로', '서서히']
-        }
-        
-        for urgency, keywords in time_contexts.items():
-            if any(keyword in text for keyword in keywords):
-                context['time_preference'] = urgency
-                break
-        
-        # 학습 스타일 추론
-        learning_styles = {
-            'visual': ['보면서', '영상으로', '시연'],
-            'kinesthetic': ['직접', '몸으로', '체험'],
-            'analytical': ['이론', '원리', '왜', '어떻게']
-        }
-        
-        for style, keywords in learning_styles.items():
-            if any(keyword in text for keyword in keywords):
-                context['learning_style'] = style
-                break
-        
-        # 기존 컨텍스트 분석도 포함
-        original_context = self._analyze_context_clues(text)
-        context.update(original_context)
-        
-        return context
+        return list(detected)
+
+    def _build_fuzzy_index(self) -> BKTree:
+        """기술명 + 별칭 전체에 대한 퍼지 인덱스"""
+        index = BKTree()
+        for technique, info in self.bjj_technique_map.items():
+            for name in [technique] + info.get('aliases', []):
+                index.add(name, technique)
+        return index
 
-    def _enhanced_negation_analysis(self, text: str) -> Dict:
-        negations = {'has_negation': False, 'negated_concepts': [], 'scope_analysis': {}}
-        
-        # 부정어와 그 범위 분석
-        negation_patterns = [
-            (r'(\w+)은?\s*말고', 'exclusive'),
-            (r'(\w+)\s*빼고', 'exclusive'),
-            (r'(\w+)\s*제외하고', 'exclusive'),
-            (r'(\w+)보다는?\s*(\w+)', 'preference'),
-        ]
-        
-        import re
-        for pattern, neg_type in negation_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                negations['has_negation'] = True
-                for match in matches:
-                    if isinstance(match, tuple):
-                        negated_item = match[0] if neg_type == 'preference' else match[0]
-                        preferred_item = match[1] if neg_type == 'preference' and len(match) > 1 else None
-                    else:
-                        negated_item = match
-                        preferred_item = None
-                    
-                    negations['negated_concepts'].append({
-                        'negated': negated_item,
-                        'preferred': preferred_item,
-                        'type': neg_type,
-                        'confidence': 0.9
-                    })
-        
-        return negations
     def _levenshtein_similarity(self, s1: str, s2: str) -> float:
         """편집 거리 기반 유사도 계산"""
-        if len(s1) < len(s2):
-            return self._levenshtein_similarity(s2, s1)
-        
-        if len(s2) == 0:
-            return 0.0
-        
-        previous_row = list(range(len(s2) + 1))
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-        
         max_len = max(len(s1), len(s2))
-        return 1.0 - (previous_row[-1] / max_len)
+        if min(len(s1), len(s2)) == 0:
+            return 0.0
+        return 1.0 - (levenshtein_distance(s1, s2) / max_len)
     
     def _enhanced_negation_analysis(self, text: str) -> Dict:
         """개선된 부정문 분석"""
         negations = {'has_negation': False, 'negated_concepts': [], 'scope_analysis': {}}
         
-        # 부정어와 그 범위 분석
-        negation_patterns = [
-            (r'(\w+)은?\s*말고', 'exclusive'),
-            (r'(\w+)\s*빼고', 'exclusive'),
-            (r'(\w+)\s*제외하고', 'exclusive'),
-            (r'(\w+)보다는?\s*(\w+)', 'preference'),
-        ]
-        
-        import re
-        for pattern, neg_type in negation_patterns:
-            matches = re.findall(pattern, text)
+        # 부정어와 그 범위 분석 (사전 파일의 negation_scope_patterns를 미리 컴파일)
+        for pattern, neg_type in self.negation_regexes:
+            matches = pattern.findall(text)
             if matches:
                 negations['has_negation'] = True
                 for match in matches:
@@ -450,36 +504,22 @@ class EnhancedNLPProcessor:
         
         return negations
     
-    def _enhanced_context_analysis(self, text: str) -> Dict:
+    def _enhanced_context_analysis(self, hits: KeywordHits) -> Dict:
         """향상된 컨텍스트 분석"""
         context = {}
         
         # 시간적 맥락 개선
-        time_contexts = {
-            'immediate': ['지금', '당장', '오늘', '바로'],
-            'this_week': ['이번주', '주말', '곧'],
-            'gradual': ['천천히', '차근차근', '점진적으로', '서서히']
-        }
-        
-        for urgency, keywords in time_contexts.items():
-            if any(keyword in text for keyword in keywords):
-                context['time_preference'] = urgency
-                break
+        time_preference = hits.first_label('time_preference')
+        if time_preference:
+            context['time_preference'] = time_preference
         
         # 학습 스타일 추론
-        learning_styles = {
-            'visual': ['보면서', '영상으로', '시연'],
-            'kinesthetic': ['직접', '몸으로', '체험'],
-            'analytical': ['이론', '원리', '왜', '어떻게']
-        }
-        
-        for style, keywords in learning_styles.items():
-            if any(keyword in text for keyword in keywords):
-                context['learning_style'] = style
-                break
+        learning_style = hits.first_label('learning_style')
+        if learning_style:
+            context['learning_style'] = learning_style
         
         # 기존 컨텍스트 분석도 포함
-        original_context = self._analyze_context_clues(text)
+        original_context = self._analyze_context_clues(hits)
         context.update(original_context)
         
         return context
@@ -527,60 +567,40 @@ class EnhancedNLPProcessor:
         
         return sum(consistency_scores) / len(consistency_scores) if consistency_scores else 0
     
-    def _track_analysis_performance(self, text: str, analysis_time: float, confidence: float):
-        """분석 성능 추적"""
-        self.performance_stats['avg_time'].append(analysis_time)
-        self.performance_stats['avg_confidence'].append(confidence)
-        
-        # 최근 100개 데이터만 유지
-        for key in self.performance_stats:
-            if len(self.performance_stats[key]) > 100:
-                self.performance_stats[key] = self.performance_stats[key][-100:]
+    def _record_stage(self, stage: str, started_ns: int) -> int:
+        """단계 소요 시간 기록 - 다음 단계 시작 시각(현재 ns)을 반환"""
+        now = time.perf_counter_ns()
+        self.performance_stats.record(f'stage:{stage}', now - started_ns)
+        return now
+    
+    def _timed_stage(self, stage: str, compute: Callable[[], Any]) -> Callable[[], Any]:
+        """지연 필드용 - 실제로 계산될 때 단계 시간을 기록하는 래퍼"""
+        def run():
+            started = time.perf_counter_ns()
+            result = compute()
+            self._record_stage(stage, started)
+            return result
+        return run
+    
+    def _track_analysis_performance(self, text: str, analysis_time: float):
+        """분석 성능 추적 (신뢰도는 confidence_score 계산 시 기록)"""
+        self.performance_stats.record('analysis_time', analysis_time)
+        self.performance_stats.record_event()
+    
+    def record_accuracy(self, correct: bool):
+        """사용자 피드백 기반 정확도 기록 (accuracy_rate 지표)"""
+        self.performance_stats.record('accuracy', 1.0 if correct else 0.0)
     
     def _optimize_user_patterns_update(self, user_id: str, text: str, analysis: Dict):
-        try:
-            from bjj_advanced_system_v2 import ImprovedBJJDatabase
-            db = ImprovedBJJDatabase()
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # 사용자 존재 여부 확인 추가
-                cursor.execute("SELECT id FROM users WHERE id = ?", (user_id,))
-                if not cursor.fetchone():
-                    # 사용자가 없으면 패턴 업데이트 건너뛰기
-                    self.logger.warning(f"User {user_id} not found, skipping pattern update")
-                    return
-                
-                # 기존 패턴 로드
-                existing_patterns = self._get_user_context(user_id)
-                
-                # 새로운 패턴 정보만 업데이트
-                if analysis.get('intent'):
-                    self._safe_update_pattern(
-                        cursor, user_id, 'intent_preference',
-                        {'preferred_intent': analysis['intent']},
-                        analysis.get('intent_confidence', 0.5)
-                    )
-                
-                conn.commit()
-                
-        except Exception as e:
-            self.logger.error(f"Pattern update failed: {e}")
-            # 오류가 발생해도 전체 프로세스는 계속 진행
+        """사용자 패턴 업데이트 예약 - 기록은 UserPatternStore가 백그라운드에서 모아서 처리"""
+        # 새로운 패턴 정보만 업데이트
+        if analysis.get('intent'):
+            self.user_patterns.record(
+                user_id, 'intent_preference',
+                {'preferred_intent': analysis['intent']},
+                analysis.get('intent_confidence', 0.5)
+            )
 
-    def _safe_update_pattern(self, cursor, user_id: str, pattern_type: str, 
-                        pattern_data: Dict, confidence: float):
-    
-        try:
-            cursor.execute("""
-                INSERT OR REPLACE INTO user_nlp_patterns 
-                (user_id, pattern_type, pattern_data, confidence_score, usage_count)
-                VALUES (?, ?, ?, ?, 
-                    COALESCE((SELECT usage_count FROM user_nlp_patterns 
-                            WHERE user_id = ? AND pattern_type = ?), 0) + 1)
-            """, (user_id, pattern_type, json.dumps(pattern_data), confidence, user_id, pattern_type))
-        except Exception as e:
-            self.logger.error(f"Safe pattern update failed: {e}")
     def _compress_user_patterns(self, patterns: Dict) -> Dict:
         """사용자 패턴 압축"""
         compressed = {}
@@ -660,39 +680,48 @@ class EnhancedNLPProcessor:
 
     # 성능 모니터링 메서드 추가
     def get_performance_stats(self) -> Dict:
-        """성능 통계 조회"""
-        if not self.performance_stats['avg_time']:
+        """성능 통계 조회 (최근 창 기준)"""
+        stats = self.performance_stats
+        response_time = stats.summary('analysis_time', scale=1000.0)
+        if response_time is None:
             return {'status': 'no_data'}
         
-        import statistics
-        
         return {
-            'avg_response_time': statistics.mean(self.performance_stats['avg_time']),
-            'avg_confidence': statistics.mean(self.performance_stats['avg_confidence']),
-            'accuracy_rate': statistics.mean(self.performance_stats['accuracy_rate']) if self.performance_stats['accuracy_rate'] else None,
-            'total_analyses': len(self.performance_stats['avg_time'])
+            'avg_response_time': stats.mean('analysis_time'),
+            'avg_confidence': stats.mean('confidence'),
+            'accuracy_rate': stats.mean('accuracy'),
+            'total_analyses': stats.total(),
+            'window': stats.window,
+            'throughput_per_sec': stats.throughput(),
+            'response_time_ms': response_time,
+            'stage_latency_ms': {
+                name.split(':', 1)[1]: stats.summary(name, scale=1e-6)
+                for name in stats.metrics('stage:')
+            }
         }
     
-    def _original_analyze_user_request(self, text: str) -> Dict:
+    def _original_analyze_user_request(self, text: str, hits: Optional[KeywordHits] = None) -> Dict:
         """기존 분석 로직 (호환성 유지)"""
         text_lower = text.lower()
+        if hits is None:
+            hits = self.keyword_matcher.scan(text_lower)
         
         # 1. 기본 분석
         base_analysis = {
-            'level': self._detect_experience_level(text_lower),
-            'positions': self._detect_positions_advanced(text_lower),
-            'duration': self._extract_duration(text_lower),
-            'gi_preference': self._detect_gi_preference(text_lower)
+            'level': self._detect_experience_level(hits),
+            'positions': self._detect_positions_advanced(hits),
+            'duration': self._extract_duration(hits),
+            'gi_preference': self._detect_gi_preference(hits)
         }
         
         # 2. 의도 분석
-        intent_analysis = self._analyze_intent(text_lower)
+        intent_analysis = self._analyze_intent(hits)
         
         # 3. 감정/제약사항 분석
-        emotion_analysis = self._analyze_emotions_and_constraints(text_lower)
+        emotion_analysis = self._analyze_emotions_and_constraints(hits)
         
         # 4. 기술 특화 분석
-        technique_analysis = self._analyze_specific_techniques(text_lower)
+        technique_analysis = self._analyze_specific_techniques(hits)
         
         # 5. 종합 분석
         final_analysis = {
@@ -700,7 +729,7 @@ class EnhancedNLPProcessor:
             **intent_analysis,
             **emotion_analysis,
             **technique_analysis,
-            'confidence_score': self._calculate_confidence(text_lower, intent_analysis)
+            'confidence_score': self._calculate_confidence(text_lower, intent_analysis, hits)
         }
         
         return final_analysis
@@ -708,34 +737,22 @@ class EnhancedNLPProcessor:
     # V2 새 메서드들
     def _enhanced_preprocessing(self, text: str) -> str:
         """강화된 텍스트 전처리"""
-        processed = text.lower().strip()
-        
-        # 동의어 정규화
-        for standard_term, synonyms in self.enhanced_synonyms.items():
-            for synonym in synonyms:
-                processed = processed.replace(synonym, standard_term)
-        
-        # 일반적인 오타 수정
-        typo_fixes = {
-            '하프가듣': '하프가드',
-            '트라이앙글': '트라이앵글', 
-            '기욜틴': '기요틴',
-            '배으고': '배우고',
-            '어려와': '어려워'
-        }
-        
-        for typo, correct in typo_fixes.items():
-            processed = processed.replace(typo, correct)
-        
-        return processed
-    
-    def _find_synonym_matches(self, text: str) -> Dict:
+        return self._normalize_text(text).text
+    
+    def _normalize_text(self, text: str) -> NormalizedText:
+        """동의어/오타 정규화 (최장 일치 1회 순회, 원문 위치 매핑 포함)"""
+        lowered = text.lower()
+        stripped = lowered.lstrip()
+        normalized = self.text_normalizer.normalize(stripped.rstrip())
+        # 앞쪽 공백을 잘라낸 만큼 위치를 밀어 원문(text) 기준으로 맞춤
+        lead = len(lowered) - len(stripped)
+        if lead:
+            normalized.offsets = [offset + lead for offset in normalized.offsets]
+        return normalized
+    
+    def _find_synonym_matches(self, hits: KeywordHits) -> Dict:
         """동의어 매칭 결과"""
-        matches = {}
-        for standard, synonyms in self.enhanced_synonyms.items():
-            if standard in text or any(syn in text for syn in synonyms):
-                matches[standard] = True
-        return matches
+        return {standard: True for standard in hits.labels('synonym')}
     
     def _analyze_negations(self, text: str) -> Dict:
         """부정 표현 분석"""
@@ -763,87 +780,45 @@ class EnhancedNLPProcessor:
         
         return negations
     
-    def _analyze_intensity(self, text: str) -> Dict:
+    def _analyze_intensity(self, hits: KeywordHits) -> Dict:
     
         intensity = {'level': 'medium', 'score': 0.5, 'modifiers': []}
         
-        # 더 정교한 강도 분류
-        intensity_modifiers_refined = {
-            'very_high': ['완전', '완벽하게', '너무너무', '아주아주', '엄청'],
-            'high': ['정말', '매우', '아주', '완전히', '집중적으로', '공격적으로'],
-            'medium': ['좀', '조금', '약간', '제법', '꽤'],
-            'low': ['살짝', '다소', '조금은', '약간은', '가볍게']
-        }
-        
-        # 우선순위대로 체크
-        for level in ['very_high', 'high', 'medium', 'low']:
-            modifiers = intensity_modifiers_refined[level]
-            found_modifiers = [mod for mod in modifiers if mod in text]
-            if found_modifiers:
-                intensity['modifiers'].extend(found_modifiers)
-                intensity['level'] = level
-                intensity['score'] = {
-                    'very_high': 1.0, 
-                    'high': 0.8, 
-                    'medium': 0.5, 
-                    'low': 0.3
-                }[level]
-                break
+        # 우선순위대로 체크 (very_high > high > medium > low)
+        level = hits.first_label('intensity')
+        if level:
+            intensity['modifiers'].extend(hits.keywords('intensity', level))
+            intensity['level'] = level
+            intensity['score'] = {
+                'very_high': 1.0, 
+                'high': 0.8, 
+                'medium': 0.5, 
+                'low': 0.3
+            }[level]
         
         return intensity
         
-    def _analyze_context_clues(self, text: str) -> Dict:
+    def _analyze_context_clues(self, hits: KeywordHits) -> Dict:
         """컨텍스트 단서 분석"""
         context = {}
         
         # 긴급도 분석
-        for urgency_level, keywords in self.context_clues['urgency'].items():
-            if any(keyword in text for keyword in keywords):
-                context['urgency'] = urgency_level
-                break
+        urgency_level = hits.first_label('urgency')
+        if urgency_level:
+            context['urgency'] = urgency_level
         
         # 확신도 분석
-        for confidence_level, keywords in self.context_clues['confidence_level'].items():
-            if any(keyword in text for keyword in keywords):
-                context['user_confidence'] = confidence_level
-                break
+        confidence_level = hits.first_label('user_confidence')
+        if confidence_level:
+            context['user_confidence'] = confidence_level
         
         return context
     
     def _get_user_context(self, user_id: str) -> Dict:
-        """사용자 컨텍스트 조회 (데이터베이스에서)"""
-        try:
-            from bjj_advanced_system import ImprovedBJJDatabase
-            db = ImprovedBJJDatabase()
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # 사용자 NLP 패턴 조회
-                cursor.execute("""
-                    SELECT pattern_type, pattern_data, confidence_score, usage_count
-                    FROM user_nlp_patterns 
-                    WHERE user_id = ?
-                """, (user_id,))
-                
-                patterns = cursor.fetchall()
-                
-                context = {'has_patterns': len(patterns) > 0}
-                
-                for pattern in patterns:
-                    pattern_data = json.loads(pattern['pattern_data'])
-                    context[pattern['pattern_type']] = {
-                        'data': pattern_data,
-                        'confidence': pattern['confidence_score'],
-                        'usage_count': pattern['usage_count']
-                    }
-                
-                return context
-                
-        except Exception as e:
-            self.logger.error(f"Failed to get user context: {e}")
-            return {'has_patterns': False}
+        """사용자 컨텍스트 조회 (캐시 → 데이터베이스 순, 반환된 dict는 수정하지 않음)"""
+        return self.user_patterns.get_context(user_id)
     
-    def _match_user_patterns(self, text: str, user_context: Dict) -> Dict:
+    def _match_user_patterns(self, text: str, user_context: Dict, hits: KeywordHits) -> Dict:
         """사용자 패턴 매칭"""
         pattern_match = {'score': 0.0, 'matched_patterns': []}
         
@@ -854,7 +829,7 @@ class EnhancedNLPProcessor:
         intent_prefs = user_context.get('intent_preference', {})
         if intent_prefs and 'data' in intent_prefs:
             preferred_intent = intent_prefs['data'].get('preferred_intent')
-            if preferred_intent and self._text_matches_intent(text, preferred_intent):
+            if preferred_intent and self._text_matches_intent(hits, preferred_intent):
                 pattern_match['score'] += 0.2
                 pattern_match['matched_patterns'].append(f'intent:{preferred_intent}')
         
@@ -869,25 +844,14 @@ class EnhancedNLPProcessor:
         
         return pattern_match
     
-    def _text_matches_intent(self, text: str, intent: str) -> bool:
+    def _text_matches_intent(self, hits: KeywordHits, intent: str) -> bool:
         """텍스트가 특정 의도와 매칭되는지 확인"""
-        intent_keywords = {
-            'learn': ['배우', '학습', '익히', '처음'],
-            'improve_weakness': ['약해', '못하', '어려워', '당하'],
-            'compete': ['경기', '시합', '대회', '준비'],
-            'review': ['복습', '다시', '재연습', '점검'],
-            'strengthen': ['강화', '향상', '발전', '마스터']
-        }
-        
-        keywords = intent_keywords.get(intent, [])
-        return any(keyword in text for keyword in keywords)
+        return hits.has('intent_hint', intent)
     
     def _update_user_patterns(self, user_id: str, text: str, analysis: Dict):
         """사용자 패턴 데이터베이스에 업데이트"""
         try:
-            from bjj_advanced_system import ImprovedBJJDatabase
-            db = ImprovedBJJDatabase()
-            with db.get_connection() as conn:
+            with self.user_patterns.database().get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # 의도 패턴 업데이트
@@ -917,9 +881,12 @@ class EnhancedNLPProcessor:
                         analysis.get('confidence_score', 0.5)
                     )
                 
+                context = self.user_patterns.load_context(cursor, user_id)
                 conn.commit()
+            self.user_patterns.context_cache.put(user_id, context)
                 
         except Exception as e:
+            self.user_patterns.context_cache.discard(user_id)
             self.logger.error(f"Failed to update user patterns: {e}")
     
     def _upsert_user_pattern(self, cursor, user_id: str, pattern_type: str, 
@@ -992,93 +959,70 @@ class EnhancedNLPProcessor:
         return round(final_confidence, 3)
 
     # 기존 분석 메서드들 (호환성 유지)
-    def _detect_experience_level(self, text: str) -> str:
+    def _detect_experience_level(self, hits: KeywordHits) -> str:
 
     # 1순위: 명확한 초보 신호
-        clear_beginner = [
-            '자꾸 당하는', '너무 어려워서', '못하겠어', '답답해서',
-            '힘들어서', '취약해서', '가볍게', '부상이 있어서', '살짝'
-        ]
-        if any(indicator in text for indicator in clear_beginner):
+        if hits.has('experience', 'clear_beginner'):
             return 'beginner'
         
         # 2순위: 명확한 고급 신호
-        clear_advanced = [
-            '마스터', '완벽하게', '딥하프', '고도화', '세밀하게',
-            '브라운', '블랙', '경기', '시합', '대회'
-        ]
-        if any(indicator in text for indicator in clear_advanced):
+        if hits.has('experience', 'clear_advanced'):
             return 'advanced'
         
         # 3순위: 명시적 레벨 키워드
-        if any(word in text for word in ['초보', '처음', '시작', '기초', '화이트']):
+        if hits.has('experience', 'beginner'):
             return 'beginner'
-        elif any(word in text for word in ['고급', '상급']):
+        elif hits.has('experience', 'advanced'):
             return 'advanced'
-        elif any(word in text for word in ['중급', '블루', '퍼플']):
+        elif hits.has('experience', 'intermediate'):
             return 'intermediate'
         
         # 4순위: 학습 표현 분석 수정
-        if '배워보고' in text or '집중적으로' in text or '차근차근' in text:
+        if hits.has('experience', 'gradual_learner'):
             return 'intermediate'
-        elif '배우고' in text and not any(word in text for word in ['경험', '익숙', '어느정도']):
+        elif hits.has('experience', 'learning') and not hits.has('experience', 'experienced'):
             return 'beginner'
         
         return 'intermediate'
-    def _detect_positions_advanced(self, text: str) -> List[str]:
+    def _detect_positions_advanced(self, hits: KeywordHits) -> List[str]:
         """향상된 포지션 감지"""
-        detected = []
-        
-        # 고도화된 기술 매핑 확인
-        for technique, info in self.bjj_technique_map.items():
-            # 메인 기술명 확인
-            if technique in text:
-                detected.append(info['category'])
-                continue
-            
-            # 별칭 확인
-            for alias in info['aliases']:
-                if alias in text:
-                    detected.append(info['category'])
-                    break
+        # 고도화된 기술 매핑 확인 (기술명 + 별칭)
+        detected = [self.bjj_technique_map[technique]['category'] for technique in hits.labels('technique')]
         
         # 기존 키워드 시스템과 병합
-        for position, keywords in self.position_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                detected.append(position)
+        detected.extend(hits.labels('position'))
         
         # 중복 제거
         unique_positions = list(set(detected))
         
         return unique_positions
     
-    def _extract_duration(self, text: str) -> str:
+    def _extract_duration(self, hits: KeywordHits) -> str:
         """시간 추출 (더 정교하게)"""
-        for time_expr, minutes in self.time_extractors.items():
-            if time_expr in text:
-                if minutes <= 40:
-                    return 'short'
-                elif minutes <= 80:
-                    return 'medium'
-                else:
-                    return 'long'
+        time_expr = hits.first_label('duration')
+        if time_expr:
+            minutes = self.time_extractors[time_expr]
+            if minutes <= 40:
+                return 'short'
+            elif minutes <= 80:
+                return 'medium'
+            else:
+                return 'long'
         
         # 맥락 기반 추론
-        if any(word in text for word in ['가볍게', '짧게', '빠르게', '간단히']):
+        if hits.has('duration_hint', 'short'):
             return 'short'
-        elif any(word in text for word in ['오래', '길게', '집중적', '완벽하게', '마스터']):
+        elif hits.has('duration_hint', 'long'):
             return 'long'
         
         return 'medium'
     
-    def _analyze_intent(self, text: str) -> Dict:
-        detected_intents = []
-        
-        for pattern in self.intent_patterns:
-            for keyword in pattern.patterns:
-                if keyword in text:
-                    detected_intents.append((pattern.intent, pattern.confidence_boost))
-                    break
+    def _analyze_intent(self, hits: KeywordHits) -> Dict:
+        detected_intents = [
+            (pattern.intent, pattern.confidence_boost)
+            for pattern in self.intent_patterns
+            if hits.has('intent', pattern.intent)
+        ]
         
         if not detected_intents:
             return {
@@ -1101,7 +1045,7 @@ class EnhancedNLPProcessor:
             primary_intent = max(detected_intents, key=lambda x: x[1])[0]
             confidence = max(detected_intents, key=lambda x: x[1])[1]
         
-        difficulty_pref = self._calculate_difficulty_preference(text, primary_intent)
+        difficulty_pref = self._calculate_difficulty_preference(hits, primary_intent)
         
         return {
             'intent': primary_intent,
@@ -1109,27 +1053,18 @@ class EnhancedNLPProcessor:
             'difficulty_preference': difficulty_pref,
             'detected_intents': [intent for intent, _ in detected_intents]
         }
-    def _calculate_difficulty_preference(self, text: str, intent: str) -> str:
+    def _calculate_difficulty_preference(self, hits: KeywordHits, intent: str) -> str:
     
-    # 1순위: 명시적 어려움 표현
-        easy_indicators = [
-            '너무 어려워', '못하겠어', '가볍게', '부상이 있어서', 
-            '안전한', '조심스럽게'  # '천천히', '차근차근' 제거
-        ]
-        if any(indicator in text for indicator in easy_indicators):
+    # 1순위: 명시적 어려움 표현 ('천천히', '차근차근'은 easy에서 제외)
+        if hits.has('difficulty', 'easy'):
             return 'easy'
         
         # 2순위: 도전적 표현
-        challenging_indicators = [
-            '집중적으로', '공격적', '완전히', '마스터', '완벽하게',
-            '경기', '시합', '고도화', '세밀하게'
-        ]
-        if any(indicator in text for indicator in challenging_indicators):
+        if hits.has('difficulty', 'challenging'):
             return 'challenging'
         
         # 3순위: '차근차근', '천천히'는 normal로 처리
-        gradual_indicators = ['차근차근', '천천히', '단계별로']
-        if any(indicator in text for indicator in gradual_indicators):
+        if hits.has('difficulty', 'gradual'):
             return 'normal'
         
         # 4순위: 의도와 연계
@@ -1140,28 +1075,23 @@ class EnhancedNLPProcessor:
         
         return 'normal'
     
-    def _analyze_emotions_and_constraints(self, text: str) -> Dict:
+    def _analyze_emotions_and_constraints(self, hits: KeywordHits) -> Dict:
         """감정 및 제약사항 분석"""
         constraints = []
         emotions = []
         
         # 부상/건강 제약사항
-        injury_patterns = ['부상', '아파', '무릎', '어깨', '허리', '목', '손목', '발목']
-        for pattern in injury_patterns:
-            if pattern in text:
-                constraints.append(f'{pattern} 관련 제약')
+        for pattern in hits.labels('injury'):
+            constraints.append(f'{pattern} 관련 제약')
         
         # 시간 제약
-        if any(word in text for word in ['바쁜', '급하게', '시간이 없어']):
+        if hits.has('time_constraint'):
             constraints.append('시간 제약')
         
-        # 감정 상태
-        if any(word in text for word in ['좌절', '답답', '어려워', '힘들어', '자꾸 당해']):
-            emotions.append('frustration')
-        elif any(word in text for word in ['자신감', '잘하고', '만족']):
-            emotions.append('confidence')
-        elif any(word in text for word in ['불안', '걱정', '무서워']):
-            emotions.append('anxiety')
+        # 감정 상태 (frustration > confidence > anxiety 중 하나)
+        emotion = hits.first_label('emotion')
+        if emotion:
+            emotions.append(emotion)
         
         return {
             'concerns_or_limitations': ', '.join(constraints) if constraints else '',
@@ -1169,21 +1099,10 @@ class EnhancedNLPProcessor:
             'safety_priority': 'high' if constraints else 'normal'
         }
     
-    def _analyze_specific_techniques(self, text: str) -> Dict:
+    def _analyze_specific_techniques(self, hits: KeywordHits) -> Dict:
         """특정 기술 분석"""
-        mentioned_techniques = []
-        technique_categories = []
-        
-        for technique, info in self.bjj_technique_map.items():
-            if technique in text:
-                mentioned_techniques.append(technique)
-                technique_categories.append(info['category'])
-            else:
-                for alias in info['aliases']:
-                    if alias in text:
-                        mentioned_techniques.append(technique)
-                        technique_categories.append(info['category'])
-                        break
+        mentioned_techniques = hits.labels('technique')
+        technique_categories = [self.bjj_technique_map[technique]['category'] for technique in mentioned_techniques]
         
         return {
             'specific_techniques': mentioned_techniques,
@@ -1191,15 +1110,11 @@ class EnhancedNLPProcessor:
             'training_focus': 'technique' if mentioned_techniques else 'general'
         }
     
-    def _detect_gi_preference(self, text: str) -> str:
+    def _detect_gi_preference(self, hits: KeywordHits) -> str:
         """도복 선호도 감지"""
-        if any(word in text for word in ['도복', 'gi', '기']):
-            return 'gi'
-        elif any(word in text for word in ['노기', 'nogi', 'no-gi', '래쉬가드']):
-            return 'no-gi'
-        return 'both'
+        return hits.first_label('gi') or 'both'
     
-    def _calculate_confidence(self, text: str, intent_analysis: Dict) -> float:
+    def _calculate_confidence(self, text: str, intent_analysis: Dict, hits: KeywordHits) -> float:
         """분석 신뢰도 계산"""
         base_confidence = 0.7
         
@@ -1210,7 +1125,7 @@ class EnhancedNLPProcessor:
         intent_confidence = intent_analysis.get('intent_confidence', 0.5)
         
         # 구체적 기술 언급 보너스
-        specific_bonus = 0.1 if any(tech in text for tech in self.bjj_technique_map.keys()) else 0
+        specific_bonus = 0.1 if hits.has('technique_name') else 0
         
         final_confidence = min(base_confidence + length_bonus + (intent_confidence * 0.3) + specific_bonus, 1.0)
         return round(final_confidence, 2)
@@ -1233,23 +1148,47 @@ class DataIntegrityError(DatabaseError):
     pass
 
 class ImprovedBJJDatabase:
-    """개선된 BJJ 훈련 시스템 데이터베이스 관리 클래스 V2"""
-    
-    def __init__(self, db_path: str = "bjj_training.db"):
+    """개선된 BJJ 훈련 시스템 데이터베이스 관리 클래스 V2
+    
+    스키마 버전은 DB 파일의 PRAGMA user_version에 기록한다. 테이블/인덱스 DDL은 버전이
+    SCHEMA_VERSION보다 낮을 때만 실행하고, 남은 V2_MIGRATIONS를 적용한 뒤에야 버전을 기록한다.
+    확인은 프로세스 내 DB 파일별로 한 번만 (파일별 락 아래에서) 하므로 UI 곳곳에서 인스턴스를
+    새로 만들어도 DDL이 다시 실행되지 않는다.
+    """
+    
+    # 테이블/인덱스 정의를 바꾸면 올린다 - 이전 버전 DB는 다음 실행 시 DDL을 다시 적용.
+    # CREATE ... IF NOT EXISTS는 기존 테이블을 바꾸지 못하므로 컬럼 추가 등은
+    # V2_MIGRATIONS에 다음 번호의 Migration(ALTER TABLE ...)으로 함께 추가한다.
+    SCHEMA_VERSION = 2
+    
+    def __init__(self, db_path: str = "bjj_training.db", pool_size: int = 5,
+                 pool: Optional[ConnectionPool] = None,
+                 migration_options: Optional[Dict[str, Any]] = None):
         self.db_path = db_path
+        # 스키마 확인 때 남은 마이그레이션을 적용할 MigrationRunner 옵션 (chunk_size, pause, progress 등)
+        self.migration_options = migration_options or {}
         self.logger = self._setup_logger()
+        # 같은 DB 파일을 쓰는 인스턴스끼리 연결 풀 공유 (PRAGMA는 연결 생성 시 한 번만)
+        self.pool = pool or shared_pool(
+            db_path,
+            size=pool_size,
+            timeout=10.0,
+            pragmas=("journal_mode=WAL", "foreign_keys=ON"),
+            row_factory=sqlite3.Row,
+            name=f"BJJDatabasePool({os.path.basename(db_path)})"
+        )
         
-        # 데이터베이스 초기화
+        # 데이터베이스 초기화 (프로세스 내 DB 파일별 한 번)
         try:
-            self.init_database()
-            self.logger.info(f"Database initialized successfully: {db_path}")
+            self.schema_version = self.ensure_schema()
         except Exception as e:
             self.logger.error(f"Failed to initialize database: {e}")
             raise ConnectionError(f"데이터베이스 초기화 실패: {e}")
     
     def _setup_logger(self) -> logging.Logger:
         """로거 설정"""
-        logger = logging.getLogger(f"BJJDatabase_{id(self)}")
+        # 인스턴스가 자주 만들어지므로 로거는 공유 (인스턴스별 로거는 해제되지 않고 쌓임)
+        logger = logging.getLogger("BJJDatabase")
         if not logger.handlers:
             handler = logging.StreamHandler()
             formatter = logging.Formatter(
@@ -1264,47 +1203,76 @@ class ImprovedBJJDatabase:
     def get_connection(self):
         """안전한 데이터베이스 연결 컨텍스트 매니저"""
         conn = None
+        failed = False
         try:
-            conn = sqlite3.connect(
-                self.db_path,
-                timeout=10.0,
-                check_same_thread=False
-            )
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA foreign_keys=ON")
-            
-            self.logger.debug("Database connection established")
+            conn = self.pool.acquire()
+            self.logger.debug("Database connection checked out")
             yield conn
             
         except sqlite3.OperationalError as e:
             self.logger.error(f"Database operational error: {e}")
+            failed = True
             if conn:
                 conn.rollback()
             raise ConnectionError(f"데이터베이스 연결 오류: {e}")
             
         except sqlite3.IntegrityError as e:
             self.logger.error(f"Database integrity error: {e}")
+            failed = True
             if conn:
                 conn.rollback()
             raise DataIntegrityError(f"데이터 무결성 오류: {e}")
             
         except Exception as e:
             self.logger.error(f"Unexpected database error: {e}")
+            failed = True
             if conn:
                 conn.rollback()
             raise DatabaseError(f"예상치 못한 데이터베이스 오류: {e}")
             
         finally:
             if conn:
-                try:
-                    conn.close()
-                    self.logger.debug("Database connection closed")
-                except Exception as e:
-                    self.logger.error(f"Error closing connection: {e}")
+                # 오류로 연결이 망가졌으면 풀에 돌려놓지 않음
+                self.pool.release(conn, discard=failed and not self.pool.is_healthy(conn))
+                self.logger.debug("Database connection returned to pool")
+    
+    def ensure_schema(self) -> int:
+        """스키마 버전 확인 후 필요하면 DDL과 남은 마이그레이션 적용 - 결과 버전은 프로세스 내에서 재사용"""
+        if self.db_path == ':memory:':
+            return self._verify_schema()  # 인스턴스(풀)마다 별개의 DB
+        # 공용 객체 락은 파일별 상태를 만들 때만 잡고, DDL/마이그레이션은 파일별 락 아래에서 실행
+        state = get_shared_resource(
+            f"db_schema:{os.path.abspath(self.db_path)}",
+            lambda: {'lock': threading.Lock(), 'version': None}
+        )
+        if state['version'] is None:
+            with state['lock']:
+                if state['version'] is None:
+                    state['version'] = self._verify_schema()
+        return state['version']
+    
+    def _verify_schema(self) -> int:
+        with self.get_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > self.SCHEMA_VERSION:
+            self.logger.warning(
+                f"Database schema v{version} is newer than this code (v{self.SCHEMA_VERSION}): {self.db_path}"
+            )
+            return version
+        if version < self.SCHEMA_VERSION:
+            self.init_database()
+        # 이전 실행에서 중단된 마이그레이션도 이어서 적용
+        MigrationRunner(self.pool, V2_MIGRATIONS, **self.migration_options).run()
+        if version < self.SCHEMA_VERSION:
+            # DDL과 마이그레이션이 모두 끝난 뒤 기록 - 중간에 실패하면 버전이 그대로라 다음 실행 때 다시 적용
+            with self.get_connection() as conn:
+                conn.execute(f"PRAGMA user_version = {int(self.SCHEMA_VERSION)}")
+                conn.commit()
+            self.logger.info(f"Database schema upgraded v{version} -> v{self.SCHEMA_VERSION}: {self.db_path}")
+        return self.SCHEMA_VERSION
     
     def init_database(self):
-        """데이터베이스 초기화 및 테이블 생성 (V2 테이블 포함)"""
+        """데이터베이스 초기화 및 테이블 생성 (V2 테이블 포함) - 스키마 버전은 ensure_schema()가 기록"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
@@ -1489,7 +1457,7 @@ class ImprovedBJJDatabase:
                     feedback_id,
                     user_id,
                     original_text,
-                    json.dumps(analysis_result),
+                    json.dumps(analysis_result, default=LazyAnalysis.json_default),
                     json.dumps(user_feedback),
                     session_id
                 ))
@@ -1724,9 +1692,9 @@ class ImprovedBJJDatabase:
                     session_data.get('difficulty_rating'),
                     session_data.get('enjoyment_rating'),
                     json.dumps(session_data.get('techniques_practiced', [])),
-                    json.dumps(session_data.get('program_data', {})),
+                    json.dumps(session_data.get('program_data', {}), default=LazyAnalysis.json_default),
                     session_data.get('notes', ''),
-                    json.dumps(session_data.get('nlp_analysis', {}))
+                    json.dumps(session_data.get('nlp_analysis', {}), default=LazyAnalysis.json_default)
                 ))
                 
                 cursor.execute('''
@@ -1896,6 +1864,8 @@ class ImprovedBJJDatabase:
                 page_size = cursor.fetchone()[0]
                 
                 health_info['size_mb'] = (page_count * page_size) / (1024 * 1024)
+                health_info['schema_version'] = cursor.execute("PRAGMA user_version").fetchone()[0]
+                health_info['pool'] = self.pool.stats()
                 health_info['last_check'] = datetime.now().isoformat()
                 
                 return health_info
@@ -1907,6 +1877,147 @@ class ImprovedBJJDatabase:
 # 기존 클래스들과의 호환성 유지
 BJJDatabase = ImprovedBJJDatabase
 
+
+class UserPatternStore:
+    """사용자 NLP 패턴 저장소 - 컨텍스트 캐시(읽기) + write-behind 큐(쓰기)
+    
+    패턴 업데이트는 큐에 넣고 바로 반환한다. 기록 스레드가 같은 (user_id, pattern_type)의
+    변경을 병합해 한 트랜잭션으로 쓰고, 커밋 후 해당 사용자 컨텍스트를 캐시에 반영한다.
+    큐가 submit_timeout초 안에 비지 않거나 이미 닫혔으면 업데이트를 버린다 (분석 요청을 막지 않도록).
+    """
+    
+    def __init__(self, db_path: str = "bjj_training.db", context_cache: Optional[LRUCache] = None,
+                 context_size: int = 1024, context_ttl: float = 300.0,
+                 max_pending: int = 1024, batch_size: int = 256, submit_timeout: float = 0.05):
+        self.db_path = db_path
+        self.submit_timeout = submit_timeout
+        self.dropped = 0
+        # TTL은 다른 프로세스가 쓴 변경이 이 캐시에 반영되기까지의 상한
+        self.context_cache = context_cache or LRUCache(max_size=context_size, ttl_seconds=context_ttl)
+        self.writes = WriteBehindQueue(
+            self._write_batch, merge=self._merge_updates,
+            max_pending=max_pending, batch_size=batch_size, name="UserPatternWriter"
+        )
+        self.logger = logging.getLogger("UserPatternStore")
+        self._db: Optional[ImprovedBJJDatabase] = None
+        self._db_lock = threading.Lock()
+    
+    def database(self) -> ImprovedBJJDatabase:
+        """DB 핸들 (처음 필요할 때 한 번만 생성 - 생성 시 스키마 초기화가 실행됨)"""
+        with self._db_lock:
+            if self._db is None:
+                self._db = ImprovedBJJDatabase(self.db_path)
+            return self._db
+    
+    def get_context(self, user_id: str) -> Dict:
+        """사용자 컨텍스트 (캐시 → DB) - 반환된 dict는 캐시와 공유되므로 수정하지 않는다"""
+        context = self.context_cache.get(user_id)
+        if context is not None:
+            return context
+        
+        try:
+            with self.database().get_connection() as conn:
+                context = self.load_context(conn.cursor(), user_id)
+        except Exception as e:
+            self.logger.error(f"Failed to get user context: {e}")
+            return {'has_patterns': False}
+        
+        # 읽는 동안 기록 스레드가 더 새 컨텍스트를 넣었으면 그쪽을 유지
+        return self.context_cache.put_if_absent(user_id, context)
+    
+    @staticmethod
+    def load_context(cursor, user_id: str) -> Dict:
+        """user_nlp_patterns에서 사용자 컨텍스트 구성"""
+        # 사용자 NLP 패턴 조회
+        cursor.execute("""
+            SELECT pattern_type, pattern_data, confidence_score, usage_count
+            FROM user_nlp_patterns 
+            WHERE user_id = ?
+        """, (user_id,))
+        
+        patterns = cursor.fetchall()
+        
+        context = {'has_patterns': len(patterns) > 0}
+        
+        for pattern in patterns:
+            pattern_data = json.loads(pattern['pattern_data'])
+            context[pattern['pattern_type']] = {
+                'data': pattern_data,
+                'confidence': pattern['confidence_score'],
+                'usage_count': pattern['usage_count']
+            }
+        
+        return context
+    
+    def record(self, user_id: str, pattern_type: str, pattern_data: Dict, confidence: float) -> bool:
+        """패턴 업데이트 예약 (사용 횟수 +1, 데이터/신뢰도는 마지막 값으로 교체) - 버렸으면 False"""
+        try:
+            queued = self.writes.submit((user_id, pattern_type), (pattern_data, confidence, 1),
+                                        timeout=self.submit_timeout)
+        except RuntimeError as e:  # 종료 중 - 큐가 이미 닫힘
+            self.dropped += 1
+            self.logger.warning(f"Pattern update dropped for user {user_id}: {e}")
+            return False
+        if not queued:
+            self.dropped += 1
+            self.logger.warning(
+                f"Pattern update dropped for user {user_id}: write queue full for {self.submit_timeout}s"
+            )
+        return queued
+    
+    @staticmethod
+    def _merge_updates(old: Tuple, new: Tuple) -> Tuple:
+        """기록 전 같은 패턴이 다시 들어오면 마지막 값 + 누적 사용 횟수"""
+        return new[0], new[1], old[2] + new[2]
+    
+    def _write_batch(self, batch: List[Tuple[Tuple[str, str], Tuple]]):
+        """병합된 업데이트를 한 트랜잭션으로 기록하고 영향받은 사용자 컨텍스트를 캐시에 반영"""
+        user_ids = list(dict.fromkeys(user_id for (user_id, _), _ in batch))
+        try:
+            with self.database().get_connection() as conn:
+                cursor = conn.cursor()
+                
+                # 사용자 존재 여부 확인 - 없는 사용자의 패턴은 건너뛰기
+                placeholders = ','.join('?' * len(user_ids))
+                cursor.execute(f"SELECT id FROM users WHERE id IN ({placeholders})", user_ids)
+                known = {row['id'] for row in cursor.fetchall()}
+                for user_id in user_ids:
+                    if user_id not in known:
+                        self.logger.warning(f"User {user_id} not found, skipping pattern update")
+                
+                cursor.executemany("""
+                    INSERT INTO user_nlp_patterns 
+                    (user_id, pattern_type, pattern_data, confidence_score, usage_count)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(user_id, pattern_type) DO UPDATE SET
+                        pattern_data = excluded.pattern_data,
+                        confidence_score = excluded.confidence_score,
+                        usage_count = user_nlp_patterns.usage_count + excluded.usage_count,
+                        last_updated = CURRENT_TIMESTAMP
+                """, [
+                    (user_id, pattern_type, json.dumps(pattern_data), confidence, count)
+                    for (user_id, pattern_type), (pattern_data, confidence, count) in batch
+                    if user_id in known
+                ])
+                
+                # 같은 트랜잭션에서 갱신된 컨텍스트를 읽어 커밋 후 캐시에 반영 (write-through)
+                contexts = {user_id: self.load_context(cursor, user_id) for user_id in user_ids if user_id in known}
+                conn.commit()
+        except Exception:
+            for user_id in user_ids:
+                self.context_cache.discard(user_id)  # 기록 결과를 모르면 다음 조회 때 다시 읽음
+            raise
+        
+        for user_id, context in contexts.items():
+            self.context_cache.put(user_id, context)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """예약된 패턴 업데이트를 모두 기록할 때까지 대기 (종료/테스트용)"""
+        return self.writes.flush(timeout)
+    
+    def close(self, timeout: Optional[float] = None):
+        self.writes.close(timeout)
+
 # =============================================================================
 # 주짓수 벨트 시스템 정의
 # =============================================================================
@@ -2249,10 +2360,9 @@ class SmartTrainingGenerator:
         avoided_techniques = []
         if negation_analysis.get('has_negation'):
             for concept in negation_analysis.get('negated_concepts', []):
-            
-            context_after = concept.get('context_after', '')
-            if context_after:
-                avoided_techniques.append(context_after.strip())
+                context_after = concept.get('context_after', '')
+                if context_after:
+                    avoided_techniques.append(context_after.strip())
                         
         # 기술 필터링
         available_techniques = self.db.filter_techniques(
@@ -2946,6 +3056,17 @@ def validate_signup_input(username: str, email: str, password: str, confirm_pass
 # V2 피드백 수집 컴포넌트
 # =============================================================================
 
+def submit_nlp_feedback(db: ImprovedBJJDatabase, nlp: EnhancedNLPProcessor, user_id: str,
+                        original_text: str, analysis_result: Dict, feedback_data: Dict) -> str:
+    """NLP 피드백 저장 + 의도 분석 정확도 기록 (accuracy_rate 지표)
+    
+    '부분적으로 맞음'은 정확/부정확 어느 쪽에도 넣지 않는다.
+    """
+    feedback_id = db.save_nlp_feedback(user_id, original_text, analysis_result, feedback_data)
+    if not feedback_data.get('intent_partially_correct'):
+        nlp.record_accuracy(bool(feedback_data.get('intent_correct')))
+    return feedback_id
+
 def create_nlp_feedback_component(analysis_result: Dict, user_data: Dict):
     """NLP 분석 결과에 대한 피드백 수집 컴포넌트"""
     
@@ -3043,10 +3164,12 @@ def create_nlp_feedback_component(analysis_result: Dict, user_data: Dict):
                 'feedback_timestamp': datetime.now().isoformat()
             }
             
-            # 데이터베이스에 피드백 저장
+            # 데이터베이스에 피드백 저장 + 정확도 지표 반영
             db = ImprovedBJJDatabase()
             try:
-                feedback_id = db.save_nlp_feedback(
+                feedback_id = submit_nlp_feedback(
+                    db,
+                    get_shared_enhanced_nlp(db.db_path),
                     user_data['user_id'],
                     st.session_state.get('last_user_input', ''),
                     analysis_result,
@@ -3064,6 +3187,25 @@ def create_nlp_feedback_component(analysis_result: Dict, user_data: Dict):
 # 메인 Streamlit 앱 함수들 (V2)
 # =============================================================================
 
+def _create_enhanced_nlp_watcher(db_path: str = "bjj_training.db") -> LexiconWatcher:
+    """사전 파일이 바뀌면 백그라운드에서 새 처리기를 만들어 교체 (성능 지표/사용자 패턴 저장소는 유지)"""
+    performance_stats = MetricsRecorder()
+    user_patterns = UserPatternStore(db_path)
+    return LexiconWatcher(
+        [LEXICON_SOURCE_PATH],
+        lambda: EnhancedNLPProcessor(performance_stats=performance_stats, user_patterns=user_patterns)
+    ).start()
+
+def get_shared_enhanced_nlp(db_path: str = "bjj_training.db") -> EnhancedNLPProcessor:
+    """공용 NLP 처리기 (현재 사전 버전) - 버튼을 누를 때마다 새로 만들지 않음
+    
+    사용자 패턴을 읽고 쓰는 DB 파일별로 하나씩 만든다.
+    """
+    return get_shared_resource(
+        f'enhanced_nlp_watcher:{os.path.abspath(db_path)}',
+        lambda: _create_enhanced_nlp_watcher(db_path)
+    ).current
+
 def create_training_program_tab(user_data):
     """훈련 프로그램 생성 탭 (V2 고도화)"""
     st.header("🎯 AI 맞춤형 훈련 프로그램 생성 V2")
@@ -3114,7 +3256,7 @@ def create_training_program_tab(user_data):
                 
                 with st.spinner("🔍 V2 AI가 요청을 분석하고 맞춤 프로그램을 생성하는 중..."):
                     # 고도화된 NLP 분석
-                    nlp = EnhancedNLPProcessor()
+                    nlp = get_shared_enhanced_nlp()
                     analysis = nlp.analyze_user_request(user_request, user_data['user_id'])
                     
                     # V2 분석 결과 표시
@@ -3640,52 +3782,68 @@ def create_enhanced_streamlit_app():
 # 데이터베이스 마이그레이션 도구
 # =============================================================================
 
-def migrate_database_to_v2():
-    """V1에서 V2로 데이터베이스 마이그레이션"""
+def _v2_default_pattern_rows(users: List[sqlite3.Row]) -> List[Tuple]:
+    """기존 사용자별 벨트 기반 기본 V2 패턴 (user_nlp_patterns INSERT 파라미터)"""
+    return [
+        (
+            user['id'],
+            'v2_migration_defaults',
+            json.dumps({
+                'preferred_difficulty': 'medium',
+                'belt_level': user['current_belt'],
+                'v2_migrated': True
+            }),
+            0.5
+        )
+        for user in users
+    ]
+
+
+# 번호는 한 번 배포되면 바꾸지 않는다 - 새 마이그레이션은 다음 번호로 추가
+V2_MIGRATIONS = [
+    ChunkedMigration(
+        version=1,
+        name='v2_migration_defaults',
+        table='users',
+        columns='id, current_belt',
+        write_sql='''
+            INSERT OR IGNORE INTO user_nlp_patterns 
+            (user_id, pattern_type, pattern_data, confidence_score)
+            VALUES (?, ?, ?, ?)
+        ''',
+        transform=_v2_default_pattern_rows
+    ),
+]
+
+
+def _print_migration_progress(progress: MigrationProgress):
+    percent = f" ({progress.percent:.1f}%)" if progress.percent is not None else ""
+    mark = "✅" if progress.finished else "⏳"
+    print(f"{mark} [{progress.version:03d}] {progress.name}: {progress.rows_done}/{progress.total or 0}{percent} "
+          f"- {progress.rate:,.0f}행/초")
+
+
+def migrate_database_to_v2(db_path: str = "bjj_training.db", chunk_size: int = 1000, pause: float = 0.0):
+    """V1에서 V2로 데이터베이스 마이그레이션 (중단되면 다시 실행해 이어서 진행)"""
     print("🔄 BJJ 훈련 시스템을 V1에서 V2로 업그레이드 중...")
     
     try:
-        # 백업 생성
-        import shutil
-        import os
-        
-        if os.path.exists("bjj_training.db"):
-            backup_name = f"bjj_training_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-            shutil.copy("bjj_training.db", backup_name)
-            print(f"✅ 백업 생성됨: {backup_name}")
+        # 백업 생성 (온라인 백업 API - 앱이 실행 중이어도 안전, 검증 후 DB 옆 backups/에 보관)
+        if os.path.exists(db_path):
+            backup = BackupManager(db_path).create_backup()
+            print(f"✅ 백업 생성됨: {backup.path} (무결성 검사 통과)")
+        
+        # V2 테이블 생성 + 남은 마이그레이션 적용 (진행 상황 출력)
+        db = ImprovedBJJDatabase(db_path, migration_options={
+            'chunk_size': chunk_size, 'pause': pause, 'progress': _print_migration_progress
+        })
+        print(f"✅ V2 스키마 준비 완료 (v{db.schema_version})")
         
-        # V2 데이터베이스 초기화
-        db = ImprovedBJJDatabase()
-        print("✅ V2 테이블 생성 완료")
-        
-        # 기존 사용자들에 대한 기본 V2 패턴 생성
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT id, current_belt, username FROM users")
-            users = cursor.fetchall()
-            
-            for user in users:
-                # 벨트 기반 기본 패턴 생성
-                default_pattern = {
-                    'preferred_difficulty': 'medium',
-                    'belt_level': user['current_belt'],
-                    'v2_migrated': True
-                }
-                
-                cursor.execute('''
-                    INSERT OR IGNORE INTO user_nlp_patterns 
-                    (user_id, pattern_type, pattern_data, confidence_score)
-                    VALUES (?, ?, ?, ?)
-                ''', (
-                    user['id'], 
-                    'v2_migration_defaults', 
-                    json.dumps(default_pattern), 
-                    0.5
-                ))
-            
-            conn.commit()
-            print(f"✅ {len(users)}명의 사용자에 대한 V2 기본 패턴 생성 완료")
+        # 이 프로세스에서 이미 스키마를 확인한 DB라면 생성자가 다시 적용하지 않으므로 한 번 더 확인
+        runner = MigrationRunner(db.pool, V2_MIGRATIONS, chunk_size=chunk_size, pause=pause,
+                                 progress=_print_migration_progress)
+        runner.run()
+        print(f"✅ 마이그레이션 {len(runner.status())}/{len(V2_MIGRATIONS)}개 적용됨")
         
         print("🎉 V2 업그레이드 완료!")
         print("새로운 기능:")
@@ -3697,7 +3855,7 @@ def migrate_database_to_v2():
         
     except Exception as e:
         print(f"❌ 마이그레이션 실패: {e}")
-        print("백업 파일로 복구하거나 기술 지원에 문의하세요.")
+        print("다시 실행하면 마지막 체크포인트부터 이어서 진행합니다. 계속 실패하면 백업 파일로 복구하거나 기술 지원에 문의하세요.")
 
 # =============================================================================
 # 메인 실행 함수
@@ -3709,6 +3867,16 @@ def main():
         if sys.argv[1] == 'migrate':
             migrate_database_to_v2()
             return
+        elif sys.argv[1] == 'build-lexicons':
+            # data/nlp_lexicons.json 수정 후 배포 전에 실행
+            start_time = time.time()
+            checksum = source_checksum(LEXICON_SOURCE_PATH)
+            compiled = EnhancedNLPProcessor.compile_lexicons(load_lexicon_source(LEXICON_SOURCE_PATH))
+            write_artifact(LEXICON_ARTIFACT_PATH, checksum, compiled)
+            print(f"✅ 사전 아티팩트 생성: {LEXICON_ARTIFACT_PATH}")
+            print(f"   원본 체크섬: {checksum}")
+            print(f"   소요 시간: {time.time() - start_time:.3f}초")
+            return
         elif sys.argv[1] == 'test':
             print("🥋 BJJ AI 훈련 시스템 V2 - 고도화된 NLP 통합 테스트")
             print("=" * 70)
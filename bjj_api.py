@@ -0,0 +1,217 @@
+# bjj_api.py
+"""
+BJJ 훈련 시스템 HTTP JSON API (표준 라이브러리 asyncio 기반, 외부 의존성 없음)
+
+    python bjj_api.py --port 8765
+
+POST /analyze          {"text": ..., "user_id": 선택}
+POST /program          {"text": ..., "belt": ..., "user_id": 선택}  또는  {"analysis": {...}, "belt": ...}
+POST /recommendations  {"program": {...}}  또는  {"text": ..., "belt": ...}
+GET  /health           서비스 통계
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Tuple
+
+from bjj_service import BJJTrainingService
+
+MAX_BODY_BYTES = 64 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class APIError(Exception):
+    """클라이언트에 그대로 전달할 오류 (HTTP 상태 코드 포함)"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class BJJAPIServer:
+    """keep-alive를 지원하는 최소 HTTP/1.1 서버 - 요청 처리는 BJJTrainingService에 위임"""
+
+    def __init__(self, service: BJJTrainingService, host: str = "127.0.0.1", port: int = 8765):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.logger = logging.getLogger("BJJAPIServer")
+        self.routes = {
+            '/analyze': self._handle_analyze,
+            '/program': self._handle_program,
+            '/recommendations': self._handle_recommendations
+        }
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # port=0이면 실제 할당된 포트
+        self.logger.info(f"Listening on http://{self.host}:{self.port}")
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    # ------------------------------------------------------------------
+    # HTTP 처리
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self._dispatch(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except APIError as e:
+            # 요청 자체를 해석할 수 없는 경우 - 응답 후 연결 종료
+            self._write_response(writer, e.status, {'error': str(e)}, keep_alive=False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict, bytes]]:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise APIError(400, "잘못된 요청 라인")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise APIError(400, "잘못된 Content-Length")
+        if length < 0:
+            raise APIError(400, "잘못된 Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise APIError(413, "요청 본문이 너무 큽니다")
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target.split('?', 1)[0], headers, body
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, object]:
+        try:
+            if path == '/health':
+                return 200, {'status': 'ok', 'stats': self.service.stats}
+            handler = self.routes.get(path)
+            if handler is None:
+                raise APIError(404, f"알 수 없는 경로: {path}")
+            if method != 'POST':
+                raise APIError(405, "POST만 지원합니다")
+            try:
+                data = json.loads(body or b'{}')
+            except ValueError:
+                raise APIError(400, "JSON 본문을 해석할 수 없습니다")
+            if not isinstance(data, dict):
+                raise APIError(400, "JSON 객체가 필요합니다")
+            return 200, await handler(data)
+        except APIError as e:
+            return e.status, {'error': str(e)}
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            self.logger.exception(f"Unhandled error on {path}")
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+
+    # ------------------------------------------------------------------
+    # 엔드포인트
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _require(data: Dict, field: str, kind: type = str):
+        value = data.get(field)
+        if not value:
+            raise APIError(400, f"'{field}' 필드가 필요합니다")
+        if not isinstance(value, kind):
+            raise APIError(400, f"'{field}' 필드 형식이 잘못되었습니다")
+        return value
+
+    @staticmethod
+    def _optional(data: Dict, field: str, kind: type = str):
+        value = data.get(field)
+        if value is not None and not isinstance(value, kind):
+            raise APIError(400, f"'{field}' 필드 형식이 잘못되었습니다")
+        return value
+
+    async def _handle_analyze(self, data: Dict) -> Dict:
+        return await self.service.analyze(self._require(data, 'text'), self._optional(data, 'user_id'))
+
+    async def _handle_program(self, data: Dict) -> Dict:
+        belt = self._require(data, 'belt')
+        user_id = self._optional(data, 'user_id')
+        analysis = self._optional(data, 'analysis', dict)
+        if analysis is None:
+            analysis = await self.service.analyze(self._require(data, 'text'), user_id)
+        # 클라이언트가 보낸 분석 결과의 필수 키/형식은 generate_program이 확인 (ValueError -> 400)
+        program = await self.service.generate_program(analysis, belt, user_id)
+        return {'analysis': analysis, 'program': program}
+
+    async def _handle_recommendations(self, data: Dict) -> Dict:
+        program = self._optional(data, 'program', dict)
+        if program is None:
+            program = (await self._handle_program(data))['program']
+        return {'recommendations': await self.service.recommend(program)}
+
+
+async def _serve(args):
+    async with BJJTrainingService(db_path=args.db, max_workers=args.workers) as service:
+        server = BJJAPIServer(service, args.host, args.port)
+        await server.start()
+        print(f"🥋 BJJ API 서버 실행 중: http://{server.host}:{server.port}")
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BJJ 훈련 시스템 HTTP JSON API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--db', default='bjj_training.db', help='SQLite DB 경로')
+    parser.add_argument('--workers', type=int, default=4, help='CPU 작업 스레드 수')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# bjj_backup.py
+"""
+BJJ SQLite 온라인 백업
+sqlite3 백업 API로 페이지를 조금씩 복사하고 단계 사이에 쉬어, 앱이 계속 읽고 쓰는 동안에도 백업한다.
+완성된 사본은 PRAGMA integrity_check로 검증한 뒤 (선택) gzip 압축하고, 보관 정책에 따라 오래된 백업을 정리한다.
+
+    python bjj_backup.py --db bjj_training.db --keep 7 --compress
+"""
+
+import argparse
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger("BJJBackup")
+
+
+class BackupError(Exception):
+    """백업 생성/검증 실패"""
+    pass
+
+
+class _BackupRestarted(Exception):
+    """다른 연결의 쓰기로 백업이 너무 자주 처음부터 다시 시작됨"""
+    pass
+
+
+@dataclass
+class BackupResult:
+    path: str
+    size_bytes: int
+    pages: int
+    elapsed: float
+    restarts: int
+    verified: bool
+    compressed: bool
+
+
+class BackupManager:
+    """DB 파일 하나의 백업 생성/보관 관리
+
+    pages_per_step 페이지씩 복사하고 단계마다 step_sleep초 쉰다. 복사 중 다른 연결이 원본에 쓰면
+    SQLite가 백업을 처음부터 다시 시작하는데, 그런 재시작이 max_restarts번을 넘으면
+    한 번에 복사한다 (WAL 모드에서는 읽기 스냅샷만 잡으므로 쓰기를 막지 않는다).
+    백업은 backup_dir(기본: DB 옆 backups/)에 '<DB 이름>_backup_<시각>.db[.gz]'로 저장되며,
+    최신 keep개만 남기고 max_age_days보다 오래된 것도 지운다 (가장 최신 백업은 항상 유지).
+    """
+
+    def __init__(self, db_path: str, backup_dir: Optional[str] = None,
+                 pages_per_step: int = 256, step_sleep: float = 0.005,
+                 keep: int = 7, max_age_days: Optional[float] = None,
+                 compress: bool = False, verify: bool = True,
+                 max_restarts: int = 3, timeout: float = 10.0):
+        if pages_per_step <= 0:
+            raise ValueError("pages_per_step는 1 이상이어야 합니다")
+        if keep <= 0:
+            raise ValueError("keep은 1 이상이어야 합니다")
+        self.db_path = db_path
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(os.path.abspath(db_path)), 'backups')
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.keep = keep
+        self.max_age_days = max_age_days
+        self.compress = compress
+        self.verify = verify
+        self.max_restarts = max_restarts
+        self.timeout = timeout
+        self.prefix = f"{os.path.splitext(os.path.basename(db_path))[0]}_backup_"
+
+    def list_backups(self) -> List[str]:
+        """완성된 백업 파일 경로 (최신순)"""
+        try:
+            names = os.listdir(self.backup_dir)
+        except FileNotFoundError:
+            return []
+        backups = [
+            name for name in names
+            if name.startswith(self.prefix) and (name.endswith('.db') or name.endswith('.db.gz'))
+        ]
+        # 파일 이름의 시각이 정렬 가능한 형식이라 이름 역순 = 최신순
+        return [os.path.join(self.backup_dir, name) for name in sorted(backups, reverse=True)]
+
+    def create_backup(self) -> BackupResult:
+        """백업 생성 → 검증 → (압축) → 보관 정책 적용"""
+        if not os.path.exists(self.db_path):
+            raise BackupError(f"원본 DB가 없습니다: {self.db_path}")
+        os.makedirs(self.backup_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        final_path = os.path.join(self.backup_dir, f"{self.prefix}{stamp}.db")
+        # 완성 전에는 .partial 이름으로 두어 목록/정리 대상에서 빠지도록
+        partial_path = final_path + '.partial'
+        started = time.perf_counter()
+        try:
+            pages, restarts = self._copy(partial_path)
+            if self.verify:
+                self._verify(partial_path)
+            if self.compress:
+                self._compress(partial_path, partial_path + '.gz')
+                os.replace(partial_path + '.gz', final_path + '.gz')
+                final_path += '.gz'
+            else:
+                os.replace(partial_path, final_path)
+        except BaseException as e:
+            for suffix in ('', '-journal', '-wal', '-shm', '.gz'):
+                if os.path.exists(partial_path + suffix):
+                    os.remove(partial_path + suffix)
+            if isinstance(e, sqlite3.Error):
+                raise BackupError(f"백업 실패 ({self.db_path}): {e}") from e
+            raise
+
+        result = BackupResult(
+            path=final_path,
+            size_bytes=os.path.getsize(final_path),
+            pages=pages,
+            elapsed=time.perf_counter() - started,
+            restarts=restarts,
+            verified=self.verify,
+            compressed=self.compress
+        )
+        logger.info(f"Backup created: {final_path} ({result.size_bytes / (1024 * 1024):.1f}MB, "
+                    f"{result.elapsed:.2f}s, restarts={restarts})")
+        self.rotate()
+        return result
+
+    def _copy(self, dest_path: str) -> Tuple[int, int]:
+        """원본 → dest_path 온라인 복사 - (페이지 수, 재시작 횟수)"""
+        source = sqlite3.connect(self.db_path, timeout=self.timeout)
+        dest = sqlite3.connect(dest_path)
+        state = {'remaining': None, 'total': 0, 'restarts': 0}
+
+        def on_step(status: int, remaining: int, total: int):
+            if state['remaining'] is not None and remaining > state['remaining']:
+                state['restarts'] += 1
+                if state['restarts'] > self.max_restarts:
+                    raise _BackupRestarted()
+            state['remaining'] = remaining
+            state['total'] = total
+            if remaining and self.step_sleep:
+                time.sleep(self.step_sleep)  # 단계 사이에 원본 잠금을 풀어 앱 요청이 진행되도록
+
+        try:
+            try:
+                source.backup(dest, pages=self.pages_per_step, progress=on_step)
+            except _BackupRestarted:
+                logger.warning(f"Backup restarted {state['restarts']} times under concurrent writes, "
+                               f"copying {self.db_path} in a single step")
+                source.backup(dest, pages=-1)
+                state['total'] = dest.execute("PRAGMA page_count").fetchone()[0]
+            # 원본이 WAL 모드여도 사본은 -wal 파일 없이 단독으로 열 수 있게
+            dest.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            dest.close()
+            source.close()
+        return state['total'], state['restarts']
+
+    @staticmethod
+    def _verify(path: str):
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute("PRAGMA integrity_check").fetchall()
+        finally:
+            conn.close()
+        if [row[0] for row in rows] != ['ok']:
+            problems = '; '.join(str(row[0]) for row in rows[:5])
+            raise BackupError(f"백업 무결성 검사 실패 ({path}): {problems}")
+
+    @staticmethod
+    def _compress(src_path: str, dest_path: str):
+        with open(src_path, 'rb') as src, gzip.open(dest_path, 'wb', compresslevel=6) as dest:
+            shutil.copyfileobj(src, dest, 1024 * 1024)
+        os.remove(src_path)
+
+    def rotate(self) -> List[str]:
+        """보관 정책에 맞지 않는 백업 삭제 - 삭제한 경로"""
+        cutoff = time.time() - self.max_age_days * 86400 if self.max_age_days is not None else None
+        removed = []
+        for index, path in enumerate(self.list_backups()):
+            if index == 0:
+                continue  # 가장 최신 백업은 항상 유지
+            if index >= self.keep or (cutoff is not None and os.path.getmtime(path) < cutoff):
+                try:
+                    os.remove(path)
+                    removed.append(path)
+                except OSError as e:
+                    logger.error(f"Could not remove old backup {path}: {e}")
+        if removed:
+            logger.info(f"Removed {len(removed)} old backup(s)")
+        return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BJJ SQLite 온라인 백업")
+    parser.add_argument('--db', default='bjj_training.db', help='원본 SQLite DB 경로')
+    parser.add_argument('--dir', help='백업 디렉터리 (기본: DB 옆 backups/)')
+    parser.add_argument('--keep', type=int, default=7, help='보관할 백업 개수')
+    parser.add_argument('--max-age-days', type=float, help='이보다 오래된 백업 삭제 (최신 1개는 유지)')
+    parser.add_argument('--pages', type=int, default=256, help='한 단계에 복사할 페이지 수')
+    parser.add_argument('--sleep', type=float, default=0.005, help='단계 사이 대기 시간 (초)')
+    parser.add_argument('--compress', action='store_true', help='gzip 압축')
+    parser.add_argument('--no-verify', action='store_true', help='integrity_check 생략')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    manager = BackupManager(args.db, args.dir, args.pages, args.sleep, args.keep, args.max_age_days,
+                            args.compress, not args.no_verify)
+    result = manager.create_backup()
+    print(f"✅ 백업 생성됨: {result.path} ({result.size_bytes / (1024 * 1024):.1f}MB, {result.elapsed:.2f}초)")
+
+
+if __name__ == "__main__":
+    main()
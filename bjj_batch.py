@@ -0,0 +1,74 @@
+# bjj_batch.py
+"""
+BJJ NLP 일괄 분석 유틸리티
+중복 입력은 한 번만 분석하고, 필요하면 프로세스 풀로 나눠 처리한 뒤
+결과를 입력 순서대로 스트리밍한다.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+
+# 워커 프로세스마다 한 번 생성되는 분석기 (초기화 비용이 크므로 청크 간 재사용)
+_worker_instance = None
+
+
+def _init_worker(factory: Callable, factory_kwargs: Dict):
+    global _worker_instance
+    _worker_instance = factory(**factory_kwargs)
+
+
+def _call_worker(method_name: str, item: Any) -> Any:
+    return getattr(_worker_instance, method_name)(item)
+
+
+def iter_unique_results(items: Iterable, key: Callable[[Any], Hashable],
+                        compute: Callable[[Any], Any],
+                        payload: Optional[Callable[[Any], Any]] = None,
+                        max_workers: Optional[int] = None, chunk_size: int = 32,
+                        worker_factory: Optional[Callable] = None,
+                        worker_kwargs: Optional[Dict] = None,
+                        worker_method: Optional[str] = None) -> Iterator[Tuple[Any, Any]]:
+    """(입력, 결과)를 입력 순서대로 생성 - 같은 키는 한 번만 계산
+
+    payload가 주어지면 입력 전체 대신 payload(입력)만 계산 함수/워커에 넘긴다.
+    max_workers > 1이면 worker_factory(**worker_kwargs)로 워커마다 분석기를 만들고
+    worker_method를 chunk_size 단위로 호출한다. 아니면 현재 프로세스에서 compute를 쓴다.
+    """
+    items = list(items)
+    keys = [key(item) for item in items]
+
+    representatives: Dict[Hashable, Any] = {}
+    last_index: Dict[Hashable, int] = {}
+    for index, (item, item_key) in enumerate(zip(items, keys)):
+        if item_key not in representatives:
+            representatives[item_key] = payload(item) if payload else item
+        last_index[item_key] = index
+
+    executor = None
+    if max_workers and max_workers > 1 and len(representatives) > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(worker_factory, worker_kwargs or {})
+        )
+        computed = executor.map(partial(_call_worker, worker_method),
+                                representatives.values(), chunksize=chunk_size)
+    else:
+        computed = map(compute, representatives.values())
+    pending = zip(representatives.keys(), computed)
+
+    # 고유 키는 첫 등장 순서로 계산되므로 앞에서부터 필요한 만큼만 당겨 온다
+    ready: Dict[Hashable, Any] = {}
+    try:
+        for index, (item, item_key) in enumerate(zip(items, keys)):
+            while item_key not in ready:
+                done_key, result = next(pending)
+                ready[done_key] = result
+            result = ready[item_key]
+            if last_index[item_key] == index:
+                del ready[item_key]  # 마지막 사용 후 해제 (대량 처리 시 메모리 제한)
+            yield item, result
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,249 @@
+# bjj_cache.py
+"""
+BJJ NLP 분석 결과 캐시 모듈
+크기 제한 LRU + TTL 캐시, 디스크 영속 SQLite 캐시와 쿼리 정규화 키를 제공한다.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fold_query(text: str) -> str:
+    """normalize_query와 같되 끝의 공백 하나는 남김 (입력 중 텍스트에서 어절이 끝났는지 판단용)"""
+    folded = _PUNCTUATION.sub(' ', text.lower())
+    return _WHITESPACE.sub(' ', folded).lstrip()
+
+
+def normalize_query(text: str) -> str:
+    """캐시 키용 쿼리 정규화 (대소문자, 구두점, 공백 차이 무시) - 분석도 이 텍스트로 해야 키와 결과가 일치"""
+    return fold_query(text).rstrip()
+
+
+def lexicon_fingerprint(*lexicons) -> str:
+    """키워드 사전 내용 해시 - 사전이 바뀌면 캐시 키도 바뀐다"""
+    payload = json.dumps(lexicons, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class LRUCache:
+    """크기 제한 LRU + TTL 캐시 (스레드 안전)"""
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: Optional[float] = 3600.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """조회 - 만료된 항목은 제거 후 미스로 처리"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, stored_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """저장 - 가득 차면 가장 오래 사용되지 않은 항목부터 제거"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (value, time.monotonic())
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def put_if_absent(self, key: Hashable, value: Any) -> Any:
+        """없을 때(또는 만료됐을 때)만 저장 - 캐시에 남은 값을 반환
+
+        DB에서 읽은 값을 채울 때 사용한다. 읽는 사이에 기록 쪽이 더 새 값을 넣었으면 덮어쓰지 않는다.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl_seconds is None
+                                      or time.monotonic() - entry[1] <= self.ttl_seconds):
+                return entry[0]
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return value
+
+    def discard(self, key: Hashable):
+        """항목 제거 (없으면 무시)"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """캐시 통계 (적중률 포함)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteAnalysisCache:
+    """디스크 영속 분석 캐시 - 여러 앱 워커가 같은 SQLite 파일을 공유
+
+    키는 (namespace, lexicon_version, 정규화 쿼리)이며, 다른 사전 버전으로 열면
+    이전 버전 항목을 정리하므로 사전 변경 시 자동으로 무효화된다.
+    """
+
+    def __init__(self, db_path: str, namespace: str, lexicon_version: str):
+        self.db_path = db_path
+        self.namespace = namespace
+        self.lexicon_version = lexicon_version
+        self.logger = logging.getLogger(f"AnalysisCache_{namespace}")
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self._init_table()
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드별 연결 (WAL 모드로 여러 프로세스 동시 읽기/쓰기)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_table(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    namespace TEXT NOT NULL,
+                    lexicon_version TEXT NOT NULL,
+                    query_key TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, lexicon_version, query_key)
+                )
+            """)
+            # 사전이 바뀐 뒤 처음 열렸다면 이전 버전 결과는 더 이상 쓸 수 없다
+            purged = conn.execute(
+                "DELETE FROM analysis_cache WHERE namespace = ? AND lexicon_version != ?",
+                (self.namespace, self.lexicon_version)
+            ).rowcount
+        if purged:
+            self.logger.info(f"Purged {purged} stale cache entries for {self.namespace}")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            row = self._connection().execute(
+                "SELECT result FROM analysis_cache WHERE namespace = ? AND lexicon_version = ? AND query_key = ?",
+                (self.namespace, self.lexicon_version, key)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.error(f"Cache read failed: {e}")
+            return default
+
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any):
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO analysis_cache VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, self.lexicon_version, key,
+                     json.dumps(value, ensure_ascii=False), time.time())
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            # 캐시 쓰기 실패는 분석 결과에 영향을 주지 않는다
+            self.logger.error(f"Cache write failed: {e}")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        try:
+            size = self._connection().execute(
+                "SELECT COUNT(*) FROM analysis_cache WHERE namespace = ? AND lexicon_version = ?",
+                (self.namespace, self.lexicon_version)
+            ).fetchone()[0]
+        except sqlite3.Error:
+            size = None
+        return {
+            'size': size,
+            'lexicon_version': self.lexicon_version,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+# =============================================================================
+# 프로세스 공용 리소스 레지스트리
+# =============================================================================
+# Streamlit은 매 실행마다 메인 스크립트를 다시 실행하므로, 세션 간 공유 객체는
+# 한 번만 import 되는 이 모듈에 보관해야 프로세스 전체에서 유지된다.
+
+_shared_lock = threading.RLock()  # factory 안에서 다른 공용 객체를 조회할 수 있도록 재진입 허용
+_shared_resources: Dict[str, Any] = {}
+
+
+def get_shared_resource(name: str, factory):
+    """이름별 공용 객체 조회 - 없으면 factory()로 한 번만 생성 (double-checked locking)"""
+    resource = _shared_resources.get(name)
+    if resource is None:
+        with _shared_lock:
+            resource = _shared_resources.get(name)
+            if resource is None:
+                resource = factory()
+                _shared_resources[name] = resource
+    return resource
+
+
+def reset_shared_resources():
+    """공용 객체 초기화 (테스트/재배포용)"""
+    with _shared_lock:
+        _shared_resources.clear()
@@ -0,0 +1,208 @@
+# bjj_db_pool.py
+"""
+BJJ SQLite 연결 풀
+요청마다 sqlite3.connect + PRAGMA를 반복하지 않도록 연결을 만들어 두고 빌려준다.
+PRAGMA는 연결을 만들 때 한 번만 적용하고, 오래 놀던 연결은 빌려주기 전에 상태를 확인한다.
+"""
+
+import contextlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bjj_cache import get_shared_resource
+from bjj_metrics import MetricsRecorder
+
+logger = logging.getLogger("BJJConnectionPool")
+
+
+class ConnectionPool:
+    """크기 제한 SQLite 연결 풀 (여러 스레드에서 사용 가능)
+
+    acquire()는 쉬고 있는 연결을 먼저 주고, 없으면 size개까지 새로 만들고,
+    모두 사용 중이면 timeout초 동안 반납을 기다린다 (넘으면 sqlite3.OperationalError).
+    대기 시간은 metrics의 'checkout_wait'(초)에 기록되어 stats()로 확인할 수 있다.
+    """
+
+    def __init__(self, db_path: str, size: int = 5, timeout: float = 10.0,
+                 pragmas: Iterable[str] = (), row_factory=None,
+                 health_check_interval: float = 30.0,
+                 metrics: Optional[MetricsRecorder] = None, name: str = "ConnectionPool"):
+        if size <= 0:
+            raise ValueError("size는 1 이상이어야 합니다")
+        self.db_path = db_path
+        # :memory:는 연결마다 별개의 DB가 되므로 연결 하나만 공유
+        self.size = 1 if db_path == ':memory:' else size
+        self.timeout = timeout
+        self.pragmas = tuple(pragmas)
+        self.row_factory = row_factory
+        self.health_check_interval = health_check_interval
+        self.metrics = metrics or MetricsRecorder()
+        self.name = name
+        self._idle: List[Tuple[sqlite3.Connection, float]] = []  # (연결, 반납 시각) - 최근 반납한 것부터 사용
+        self._open = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.created = 0
+        self.replaced = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        if self.row_factory is not None:
+            conn.row_factory = self.row_factory
+        for pragma in self.pragmas:
+            conn.execute(f"PRAGMA {pragma}")
+        return conn
+
+    @staticmethod
+    def is_healthy(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Error closing pooled connection: {e}")
+
+    def acquire(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """연결 대여 - 반드시 release()로 반납 (가능하면 connection() 사용)"""
+        wait = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        with self._cond:
+            if self._closed:
+                raise sqlite3.ProgrammingError(f"{self.name} 풀이 이미 닫혔습니다")
+            if not self._idle and self._open >= self.size:
+                self.waits += 1
+                available = self._cond.wait_for(
+                    lambda: self._idle or self._open < self.size or self._closed, wait
+                )
+                if self._closed:
+                    raise sqlite3.ProgrammingError(f"{self.name} 풀이 이미 닫혔습니다")
+                if not available:
+                    self.timeouts += 1
+                    raise sqlite3.OperationalError(
+                        f"{self.name}: 연결 {self.size}개가 모두 사용 중입니다 ({wait:.1f}초 대기)"
+                    )
+            if self._idle:
+                conn, released_at = self._idle.pop()
+            else:
+                conn, released_at = None, 0.0
+                self._open += 1  # 연결은 락 밖에서 만들되 자리는 미리 확보
+            self.checkouts += 1
+        self.metrics.record('checkout_wait', time.perf_counter() - started)
+
+        if conn is not None and time.monotonic() - released_at > self.health_check_interval:
+            if not self.is_healthy(conn):
+                logger.warning(f"{self.name}: replacing unhealthy connection")
+                self._close_quietly(conn)
+                conn = None
+                with self._cond:
+                    self.replaced += 1
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self.created += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection, discard: bool = False):
+        """연결 반납 - 끝나지 않은 트랜잭션은 롤백 (다음 사용자에게 넘어가지 않도록)"""
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                discard = True
+        with self._cond:
+            if discard or self._closed:
+                self._open -= 1
+                self._close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextlib.contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """연결 대여 컨텍스트 - 예외로 연결이 망가졌으면 풀에 돌려놓지 않음"""
+        conn = self.acquire(timeout)
+        broken = False
+        try:
+            yield conn
+        except sqlite3.Error:
+            broken = not self.is_healthy(conn)
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    @contextlib.contextmanager
+    def transaction(self, timeout: Optional[float] = None):
+        """연결 대여 + 정상 종료 시 커밋, 예외 시 롤백 (with sqlite3.connect(...)와 같은 동작)"""
+        with self.connection(timeout) as conn:
+            with conn:
+                yield conn
+
+    def health_check(self) -> Dict:
+        """쉬고 있는 연결을 모두 확인해 망가진 연결을 정리"""
+        with self._cond:
+            healthy = []
+            for conn, released_at in self._idle:
+                if self.is_healthy(conn):
+                    healthy.append((conn, released_at))
+                else:
+                    self._open -= 1
+                    self.replaced += 1
+                    self._close_quietly(conn)
+            removed = len(self._idle) - len(healthy)
+            self._idle = healthy
+            if removed:
+                self._cond.notify_all()
+        return {'checked': len(healthy) + removed, 'removed': removed}
+
+    def close(self):
+        """쉬고 있는 연결을 닫고 이후 대여를 막음 (사용 중인 연결은 반납될 때 닫힘)"""
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._close_quietly(conn)
+            self._open -= len(self._idle)
+            self._idle = []
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            stats = {
+                'size': self.size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._open - len(self._idle),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'created': self.created,
+                'replaced': self.replaced
+            }
+        stats['checkout_wait_ms'] = self.metrics.summary('checkout_wait', scale=1000.0)
+        return stats
+
+
+def shared_pool(db_path: str, **kwargs) -> ConnectionPool:
+    """DB 파일별 공용 연결 풀 - 같은 파일을 여는 객체들이 연결을 나눠 쓴다 (설정은 처음 만든 쪽 기준)"""
+    if db_path == ':memory:':
+        return ConnectionPool(db_path, **kwargs)
+    return get_shared_resource(f"db_pool:{os.path.abspath(db_path)}", lambda: ConnectionPool(db_path, **kwargs))
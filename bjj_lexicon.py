@@ -0,0 +1,171 @@
+# bjj_lexicon.py
+"""
+BJJ NLP 키워드 사전 로더
+data/nlp_lexicons.json 원본을 오토마톤/별칭 맵/정규식까지 컴파일한 바이너리 아티팩트로 저장하고,
+원본 체크섬으로 아티팩트가 최신인지 확인한다. 실행 중 사전 파일 변경은 LexiconWatcher가 반영한다.
+"""
+
+import gc
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LEXICON_SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'nlp_lexicons.json')
+LEXICON_ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'nlp_lexicons.pkl')
+# HighPerformanceNLP(app.py)용 신체 부위/동작/난이도 사전
+SEARCH_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'search_lexicons.json')
+
+# 아티팩트 구조, 컴파일 로직(EnhancedNLPProcessor._compile_lexicons/_build_*) 또는 bjj_text_index
+# 클래스 구조가 바뀌면 올린다 - 이전 아티팩트는 자동 재빌드
+ARTIFACT_FORMAT = 3
+
+logger = logging.getLogger("BJJLexicon")
+
+
+def source_checksum(source_path: str = LEXICON_SOURCE_PATH) -> str:
+    """사전 원본 파일 SHA-256"""
+    with open(source_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_lexicon_source(source_path: str = LEXICON_SOURCE_PATH) -> Dict:
+    with open(source_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_artifact(artifact_path: str, expected_checksum: str) -> Optional[Dict]:
+    """아티팩트 로드 - 없거나 형식/체크섬이 다르면 None"""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # 작은 객체 수천 개를 만드는 동안 GC가 반복 실행되지 않도록
+    try:
+        with open(artifact_path, 'rb') as f:
+            artifact = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Lexicon artifact unreadable, rebuilding: {e}")
+        return None
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    if artifact.get('format') != ARTIFACT_FORMAT:
+        logger.info("Lexicon artifact format changed, rebuilding")
+        return None
+    if artifact.get('source_checksum') != expected_checksum:
+        logger.info("Lexicon artifact is stale (source checksum mismatch), rebuilding")
+        return None
+    return artifact['compiled']
+
+
+def write_artifact(artifact_path: str, checksum: str, compiled: Dict):
+    """아티팩트 저장 - 임시 파일에 쓴 뒤 교체 (다른 워커가 반쯤 쓴 파일을 읽지 않도록)"""
+    artifact = {
+        'format': ARTIFACT_FORMAT,
+        'source_checksum': checksum,
+        'built_at': time.time(),
+        'compiled': compiled
+    }
+    directory = os.path.dirname(artifact_path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(tmp_path, 0o644)  # mkstemp 기본 권한(0600)이면 다른 계정의 워커가 읽지 못함
+        os.replace(tmp_path, artifact_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_compiled_lexicons(compile_fn: Callable[[Dict], Dict],
+                           source_path: str = LEXICON_SOURCE_PATH,
+                           artifact_path: str = LEXICON_ARTIFACT_PATH,
+                           rebuild: bool = False) -> Tuple[Dict, str]:
+    """컴파일된 사전 로드 - (compiled, 원본 체크섬)
+
+    아티팩트가 최신이면 그대로 읽고, 아니면 compile_fn(원본)으로 다시 만들어 저장한다.
+    """
+    checksum = source_checksum(source_path)
+    compiled = None if rebuild else read_artifact(artifact_path, checksum)
+    if compiled is None:
+        compiled = compile_fn(load_lexicon_source(source_path))
+        try:
+            write_artifact(artifact_path, checksum, compiled)
+        except OSError as e:
+            # 읽기 전용 배포 환경이면 메모리에서 컴파일한 결과만 사용
+            logger.warning(f"Could not write lexicon artifact {artifact_path}: {e}")
+    return compiled, checksum
+
+
+class LexiconWatcher:
+    """사전 파일 mtime 감시 - 바뀌면 백그라운드 스레드에서 새 객체를 만들어 참조를 교체
+
+    current는 항상 완성된 객체만 가리킨다. 요청은 시작할 때 current를 한 번 읽어 끝까지
+    쓰므로, 교체가 일어나도 진행 중인 요청은 이전 버전으로 마무리된다.
+    """
+
+    def __init__(self, paths: List[str], build: Callable[[], Any], interval: float = 2.0):
+        self.paths = list(paths)
+        self.build = build
+        self.interval = interval
+        self._mtimes = self._read_mtimes()
+        self.current = build()
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _read_mtimes(self) -> Dict[str, Optional[int]]:
+        mtimes = {}
+        for path in self.paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    def check(self) -> bool:
+        """파일이 바뀌었으면 재빌드 후 교체 - 교체했으면 True"""
+        with self._reload_lock:
+            mtimes = self._read_mtimes()
+            if mtimes == self._mtimes:
+                return False
+            # 실패해도 같은 내용으로 계속 재시도하지 않도록 mtime은 먼저 갱신 (다음 저장 때 재시도)
+            self._mtimes = mtimes
+            try:
+                replacement = self.build()
+            except Exception as e:
+                # 편집 중인 잘못된 파일 등 - 기존 버전을 계속 사용
+                self.last_error = str(e)
+                logger.error(f"Lexicon reload failed, keeping previous version: {e}")
+                return False
+            self.current = replacement
+            self.reloads += 1
+            self.last_error = None
+            logger.info(f"Lexicons reloaded ({self.reloads})")
+            return True
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> 'LexiconWatcher':
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="LexiconWatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
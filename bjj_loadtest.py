@@ -0,0 +1,203 @@
+# bjj_loadtest.py
+"""
+BJJ API 부하 생성기 - 한국어 쿼리 코퍼스를 목표 RPS로 재생하고 지연 백분위수/오류율을 보고
+
+    python bjj_api.py --port 8765 &
+    python bjj_loadtest.py --url http://127.0.0.1:8765 --endpoint analyze --rps 200 --duration 30
+
+요청은 예정 시각에 맞춰 보내고(open-loop) 지연은 예정 시각부터 측정하므로,
+서버가 밀려 대기열이 생기면 그 대기 시간도 지연에 포함된다.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+DEFAULT_QUERIES = [
+    "하프가드에서 스윕하는 방법을 배우고 싶어요",
+    "하프가듣에서 완전 답답해요. 너무 어려워서 못하겠어요.",
+    "트라이앵글은 말고 다른 서브미션들을 차근차근 배우고 싶어요",
+    "경기 준비 중인데 공격적인 가드 패스를 집중적으로 연습하고 싶습니다",
+    "무릎 부상이 있어서 안전한 기술 위주로 30분만 가볍게 하고 싶어요",
+    "딥하프가드에서 다양한 스윕 옵션들을 완벽하게 마스터하고 싶습니다",
+    "초보인데 마운트 이스케이프 기초부터 알려주세요",
+    "암바랑 기요틴 초크 복습하고 싶어요",
+    "백컨트롤 유지하는 게 자꾸 당해서 약해요",
+    "노기로 1시간 동안 레그락 위주로 훈련하고 싶어요",
+    "클로즈드가드에서 서브미션 연결을 익히고 싶어요",
+    "사이드컨트롤 탈출이 너무 힘들어서 좌절하고 있어요",
+]
+
+BODY_BUILDERS = {
+    'analyze': lambda text, belt: {'text': text},
+    'program': lambda text, belt: {'text': text, 'belt': belt},
+    'recommendations': lambda text, belt: {'text': text, 'belt': belt},
+}
+
+
+def load_corpus(path: Optional[str]) -> List[str]:
+    """JSON 배열 또는 한 줄에 하나씩 쓴 텍스트 파일"""
+    if not path:
+        return list(DEFAULT_QUERIES)
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            return [str(item) for item in json.load(f)]
+        return [line.strip() for line in f if line.strip()]
+
+
+class LoadGenerator:
+    """keep-alive 연결 풀로 목표 RPS만큼 요청을 보내는 부하 생성기"""
+
+    def __init__(self, url: str, endpoint: str, corpus: List[str], rps: float, duration: float,
+                 connections: int = 32, belt: str = "🔵 블루 벨트", timeout: float = 10.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 80
+        self.endpoint = endpoint
+        self.corpus = corpus
+        self.rps = rps
+        self.duration = duration
+        self.connections = connections
+        self.belt = belt
+        self.timeout = timeout
+        self.latencies: List[float] = []
+        self.errors: Counter = Counter()
+        self.sent = 0
+        self.lost_connections = 0  # 끊긴 뒤 다시 열지 못해 풀에서 뺀 연결 수
+
+    async def _open(self):
+        return await asyncio.open_connection(self.host, self.port)
+
+    async def _request(self, conn, body: bytes) -> int:
+        reader, writer = conn
+        writer.write(
+            (f"POST /{self.endpoint} HTTP/1.1\r\nHost: {self.host}\r\n"
+             f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode('latin-1') + body
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("서버가 연결을 닫았습니다")
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value.strip())
+        await reader.readexactly(length)
+        return status
+
+    async def _fire(self, pool: asyncio.Queue, scheduled_at: float, body: bytes):
+        conn = await pool.get()
+        if conn is None:
+            # 연결이 모두 끊김 - 대기 중인 나머지 요청도 바로 실패하도록 표시를 다시 넣음
+            self.errors['no_connection'] += 1
+            pool.put_nowait(None)
+            return
+        try:
+            status = await asyncio.wait_for(self._request(conn, body), self.timeout)
+            if status == 200:
+                self.latencies.append(time.perf_counter() - scheduled_at)
+            else:
+                self.errors[f"http_{status}"] += 1
+        except Exception as e:
+            self.errors[type(e).__name__] += 1
+            conn[1].close()
+            try:
+                conn = await self._open()  # 실패한 연결은 교체
+            except OSError:
+                # 닫힌 연결을 돌려놓으면 이후 요청이 모두 실패하므로 풀에서 뺀다
+                conn = None
+                self.lost_connections += 1
+        finally:
+            if conn is not None:
+                pool.put_nowait(conn)
+            elif self.lost_connections >= self.connections:
+                pool.put_nowait(None)
+
+    async def run(self) -> Dict:
+        pool: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.connections):
+            pool.put_nowait(await self._open())
+
+        build_body = BODY_BUILDERS[self.endpoint]
+        interval = 1.0 / self.rps
+        tasks = []
+        started = time.perf_counter()
+        # 예정 시각 기준으로 발사 - 생성기 자체가 밀려도 목표 RPS를 따라잡는다
+        while True:
+            scheduled_at = started + self.sent * interval
+            if scheduled_at - started >= self.duration:
+                break
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            body = json.dumps(build_body(random.choice(self.corpus), self.belt), ensure_ascii=False).encode('utf-8')
+            tasks.append(asyncio.ensure_future(self._fire(pool, scheduled_at, body)))
+            self.sent += 1
+
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        while not pool.empty():
+            conn = pool.get_nowait()
+            if conn is not None:
+                conn[1].close()
+        return self.report(elapsed)
+
+    def report(self, elapsed: float) -> Dict:
+        failed = sum(self.errors.values())
+        report = {
+            'endpoint': self.endpoint,
+            'target_rps': self.rps,
+            'achieved_rps': len(self.latencies) / elapsed if elapsed > 0 else 0.0,
+            'sent': self.sent,
+            'succeeded': len(self.latencies),
+            'failed': failed,
+            'error_rate': failed / self.sent if self.sent else 0.0,
+            'errors': dict(self.errors),
+            'lost_connections': self.lost_connections,
+        }
+        if self.latencies:
+            latencies_ms = np.array(self.latencies) * 1000.0
+            p50, p90, p95, p99 = np.percentile(latencies_ms, [50, 90, 95, 99])
+            report['latency_ms'] = {
+                'mean': float(latencies_ms.mean()),
+                'p50': float(p50),
+                'p90': float(p90),
+                'p95': float(p95),
+                'p99': float(p99),
+                'max': float(latencies_ms.max())
+            }
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BJJ API 부하 테스트")
+    parser.add_argument('--url', default='http://127.0.0.1:8765')
+    parser.add_argument('--endpoint', choices=sorted(BODY_BUILDERS), default='analyze')
+    parser.add_argument('--rps', type=float, default=50.0, help='목표 초당 요청 수')
+    parser.add_argument('--duration', type=float, default=10.0, help='실행 시간 (초)')
+    parser.add_argument('--connections', type=int, default=32, help='keep-alive 연결 수')
+    parser.add_argument('--corpus', help='쿼리 코퍼스 (.json 배열 또는 줄 단위 텍스트)')
+    parser.add_argument('--belt', default='🔵 블루 벨트')
+    args = parser.parse_args()
+
+    generator = LoadGenerator(args.url, args.endpoint, load_corpus(args.corpus), args.rps,
+                              args.duration, args.connections, args.belt)
+    report = asyncio.run(generator.run())
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# bjj_metrics.py
+"""
+BJJ NLP 성능 지표 수집 모듈
+지표별 고정 크기 NumPy 링 버퍼 (O(1) 삽입, 벡터화 평균/백분위수)와 처리량 계산을 제공한다.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class RingBuffer:
+    """고정 크기 링 버퍼 - 가득 차면 가장 오래된 값부터 덮어씀 (스레드 안전하지 않음)"""
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("capacity는 1 이상이어야 합니다")
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._next = 0
+        self._size = 0
+        self.total = 0  # 지금까지 기록된 전체 개수 (덮어쓴 값 포함)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def append(self, value: float):
+        self._data[self._next] = value
+        self._next = (self._next + 1) % len(self._data)
+        if self._size < len(self._data):
+            self._size += 1
+        self.total += 1
+
+    def values(self) -> np.ndarray:
+        """현재 창의 값 (오래된 순, 복사본)"""
+        if self._size < len(self._data):
+            return self._data[:self._size].copy()
+        return np.concatenate((self._data[self._next:], self._data[:self._next]))
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class MetricsRecorder:
+    """지표 이름별 링 버퍼 묶음 (여러 스레드에서 기록/조회 가능)"""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._buffers: Dict[str, RingBuffer] = {}
+        self._events = RingBuffer(window)  # 완료 시각 (처리량 계산용)
+        self._lock = threading.Lock()
+
+    def record(self, metric: str, value: float):
+        with self._lock:
+            buffer = self._buffers.get(metric)
+            if buffer is None:
+                buffer = self._buffers[metric] = RingBuffer(self.window)
+            buffer.append(value)
+
+    def record_event(self):
+        """작업 1건 완료 기록"""
+        with self._lock:
+            self._events.append(time.monotonic())
+
+    def _snapshot(self, metric: str) -> Optional[np.ndarray]:
+        with self._lock:
+            buffer = self._buffers.get(metric)
+            return buffer.values() if buffer is not None and len(buffer) else None
+
+    def mean(self, metric: str) -> Optional[float]:
+        values = self._snapshot(metric)
+        return float(values.mean()) if values is not None else None
+
+    def summary(self, metric: str, scale: float = 1.0) -> Optional[Dict]:
+        """창 내 통계 - count/mean/p50/p95/p99/max (값 * scale)"""
+        values = self._snapshot(metric)
+        if values is None:
+            return None
+        values = values * scale
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {
+            'count': len(values),
+            'mean': float(values.mean()),
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'max': float(values.max())
+        }
+
+    def metrics(self, prefix: str = '') -> List[str]:
+        """기록된 지표 이름 (접두어 필터)"""
+        with self._lock:
+            return [name for name in self._buffers if name.startswith(prefix)]
+
+    def total(self, metric: Optional[str] = None) -> int:
+        """전체 기록 개수 (metric 생략 시 완료 이벤트 수)"""
+        with self._lock:
+            if metric is None:
+                return self._events.total
+            buffer = self._buffers.get(metric)
+            return buffer.total if buffer is not None else 0
+
+    def throughput(self) -> float:
+        """창 내 처리량 (건/초) - 첫 완료부터 마지막 완료까지 기준"""
+        with self._lock:
+            stamps = self._events.values()
+        if len(stamps) < 2:
+            return 0.0
+        elapsed = stamps[-1] - stamps[0]
+        return float((len(stamps) - 1) / elapsed) if elapsed > 0 else 0.0
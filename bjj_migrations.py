@@ -0,0 +1,229 @@
+# bjj_migrations.py
+"""
+BJJ DB 마이그레이션 실행기
+번호가 매겨진 마이그레이션을 순서대로 적용하고 결과를 schema_migrations 테이블에 기록한다.
+대량 데이터 마이그레이션은 rowid 순으로 chunk씩 처리하며 chunk마다 커밋과 체크포인트를 남기므로,
+쓰기 잠금을 오래 잡지 않고 중단되더라도 다시 실행하면 마지막 체크포인트부터 이어서 진행한다.
+"""
+
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from bjj_db_pool import ConnectionPool
+
+logger = logging.getLogger("BJJMigrations")
+
+MIGRATIONS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'running',
+        checkpoint INTEGER DEFAULT 0,
+        rows_done INTEGER DEFAULT 0,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+'''
+
+
+@dataclass
+class Migration:
+    """한 번에 끝나는 마이그레이션 (스키마 변경 등) - apply(conn) 후 기록과 함께 커밋"""
+    version: int
+    name: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+@dataclass
+class ChunkedMigration:
+    """대량 데이터 마이그레이션
+
+    table에서 rowid 순으로 chunk_size개씩 읽어(columns, where 조건) transform(rows)로 만든
+    파라미터를 write_sql로 executemany한다. 같은 행을 다시 처리해도 결과가 같도록
+    write_sql은 멱등(INSERT OR IGNORE, UPSERT 등)이어야 한다.
+    """
+    version: int
+    name: str
+    table: str
+    columns: str
+    write_sql: str
+    transform: Callable[[List[sqlite3.Row]], List[Tuple]]
+    where: str = "1"
+
+
+@dataclass
+class MigrationProgress:
+    version: int
+    name: str
+    rows_done: int
+    total: Optional[int]
+    elapsed: float          # 이번 실행에서 걸린 시간 (초)
+    rows_this_run: int = 0
+    finished: bool = False
+
+    @property
+    def rate(self) -> float:
+        """이번 실행의 처리량 (행/초)"""
+        return self.rows_this_run / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def percent(self) -> Optional[float]:
+        if not self.total:
+            return None
+        return min(100.0, self.rows_done * 100.0 / self.total)
+
+
+def log_progress(progress: MigrationProgress):
+    percent = f" ({progress.percent:.1f}%)" if progress.percent is not None else ""
+    state = "done" if progress.finished else "running"
+    logger.info(
+        f"Migration {progress.version:03d} {progress.name} {state}: "
+        f"{progress.rows_done}/{progress.total if progress.total is not None else '?'} rows{percent}, "
+        f"{progress.rate:.0f} rows/s"
+    )
+
+
+class MigrationRunner:
+    """schema_migrations에 없거나 끝나지 않은 마이그레이션을 번호 순으로 적용
+
+    progress 콜백은 chunk 진행 중에는 최대 report_interval초마다, 마이그레이션이 끝나면 한 번 호출된다.
+    pause는 chunk 사이 대기 시간(초) - 앱의 쓰기 요청이 그 사이에 잠금을 얻을 수 있도록.
+    같은 DB에 실행기를 동시에 두 개 돌리지 않는다는 전제.
+    """
+
+    def __init__(self, pool: ConnectionPool,
+                 migrations: Sequence[Union[Migration, ChunkedMigration]],
+                 chunk_size: int = 1000, pause: float = 0.0,
+                 progress: Optional[Callable[[MigrationProgress], None]] = log_progress,
+                 report_interval: float = 2.0):
+        versions = [m.version for m in migrations]
+        if len(set(versions)) != len(versions):
+            raise ValueError(f"마이그레이션 번호가 중복되었습니다: {sorted(versions)}")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size는 1 이상이어야 합니다")
+        self.pool = pool
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.progress = progress
+        self.report_interval = report_interval
+
+    def _ensure_table(self, conn: sqlite3.Connection):
+        conn.execute(MIGRATIONS_TABLE_SQL)
+        conn.commit()
+
+    def status(self) -> Dict[int, Dict]:
+        """적용 기록 - {번호: {name, status, checkpoint, rows_done, started_at, finished_at}}"""
+        with self.pool.connection() as conn:
+            self._ensure_table(conn)
+            rows = conn.execute(
+                "SELECT version, name, status, checkpoint, rows_done, started_at, finished_at "
+                "FROM schema_migrations ORDER BY version"
+            ).fetchall()
+        return {
+            row[0]: {'name': row[1], 'status': row[2], 'checkpoint': row[3], 'rows_done': row[4],
+                     'started_at': row[5], 'finished_at': row[6]}
+            for row in rows
+        }
+
+    def pending(self) -> List[Union[Migration, ChunkedMigration]]:
+        status = self.status()
+        return [m for m in self.migrations
+                if status.get(m.version, {}).get('status') != 'done']
+
+    def run(self, target: Optional[int] = None) -> List[MigrationProgress]:
+        """target 번호까지(생략 시 전부) 남은 마이그레이션 적용 - 적용한 것들의 최종 진행 상황"""
+        results = []
+        for migration in self.pending():
+            if target is not None and migration.version > target:
+                break
+            if isinstance(migration, ChunkedMigration):
+                result = self._run_chunked(migration)
+            else:
+                result = self._run_single(migration)
+            results.append(result)
+        return results
+
+    def _report(self, progress: MigrationProgress):
+        if self.progress is not None:
+            self.progress(progress)
+
+    def _run_single(self, migration: Migration) -> MigrationProgress:
+        started = time.perf_counter()
+        with self.pool.connection() as conn:
+            migration.apply(conn)
+            conn.execute(
+                "INSERT OR REPLACE INTO schema_migrations (version, name, status, finished_at) "
+                "VALUES (?, ?, 'done', CURRENT_TIMESTAMP)",
+                (migration.version, migration.name)
+            )
+            conn.commit()
+        result = MigrationProgress(migration.version, migration.name, 0, None,
+                                   time.perf_counter() - started, finished=True)
+        self._report(result)
+        return result
+
+    def _run_chunked(self, migration: ChunkedMigration) -> MigrationProgress:
+        select_sql = (
+            f"SELECT rowid, {migration.columns} FROM {migration.table} "
+            f"WHERE rowid > ? AND ({migration.where}) ORDER BY rowid LIMIT ?"
+        )
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT checkpoint, rows_done FROM schema_migrations WHERE version = ?",
+                (migration.version,)
+            ).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (?, ?)",
+                    (migration.version, migration.name)
+                )
+                conn.commit()
+                checkpoint, rows_done = 0, 0
+            else:
+                checkpoint, rows_done = row[0], row[1]
+                logger.info(f"Resuming migration {migration.version:03d} {migration.name} "
+                            f"after rowid {checkpoint} ({rows_done} rows done)")
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM {migration.table} WHERE {migration.where}"
+            ).fetchone()[0]
+
+            progress = MigrationProgress(migration.version, migration.name, rows_done, total, 0.0)
+            started = last_report = time.perf_counter()
+            while True:
+                rows = conn.execute(select_sql, (checkpoint, self.chunk_size)).fetchall()
+                if not rows:
+                    break
+                params = migration.transform(rows)
+                if params:
+                    conn.executemany(migration.write_sql, params)
+                checkpoint = rows[-1][0]
+                progress.rows_done += len(rows)
+                progress.rows_this_run += len(rows)
+                # 데이터와 체크포인트를 같은 트랜잭션에서 커밋 - 중단되면 이 chunk부터 다시
+                conn.execute(
+                    "UPDATE schema_migrations SET checkpoint = ?, rows_done = ? WHERE version = ?",
+                    (checkpoint, progress.rows_done, migration.version)
+                )
+                conn.commit()
+
+                now = time.perf_counter()
+                progress.elapsed = now - started
+                if now - last_report >= self.report_interval:
+                    last_report = now
+                    self._report(progress)
+                if self.pause:
+                    time.sleep(self.pause)
+
+            conn.execute(
+                "UPDATE schema_migrations SET status = 'done', finished_at = CURRENT_TIMESTAMP WHERE version = ?",
+                (migration.version,)
+            )
+            conn.commit()
+        progress.elapsed = time.perf_counter() - started
+        progress.finished = True
+        self._report(progress)
+        return progress
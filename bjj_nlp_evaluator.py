@@ -135,7 +135,7 @@ class BJJNLPEvaluator:
         
         # 성능 측정
         start_time = time.time()
-        result = self.nlp.analyze_user_request(text, f"eval_user_{test_id}")
+        result = dict(self.nlp.analyze_user_request(text, f"eval_user_{test_id}"))  # 지연 필드까지 계산
         analysis_time = time.time() - start_time
         
         # 평가 결과 계산
@@ -0,0 +1,160 @@
+# bjj_service.py
+"""
+BJJ 훈련 시스템 asyncio 서비스 계층
+분석 → 프로그램 생성 → 영상 추천 흐름을 이벤트 루프를 막지 않고 제공한다 (모바일/챗봇 공용).
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bjj_advanced_system_v2 import (
+    BJJ_BELTS,
+    BJJTechniqueDatabase,
+    EnhancedNLPProcessor,
+    ImprovedBJJDatabase,
+    SmartTrainingGenerator,
+    YouTubeRecommendationSystem,
+    get_shared_enhanced_nlp
+)
+
+
+# generate_program이 반드시 읽는 분석 결과 키와 형식 (클라이언트가 분석 결과를 직접 보낼 때 확인)
+PROGRAM_ANALYSIS_FIELDS = {'duration': str, 'gi_preference': str, 'positions': list}
+
+
+class BJJTrainingService:
+    """비동기 서비스 - CPU 작업은 크기 제한 스레드 풀, DB 작업은 전용 스레드 하나에서 실행
+
+    동시에 들어온 같은 텍스트 분석(analysis_key 기준)은 한 번만 계산하고 결과를 공유한다 (요청 병합).
+    사용자 컨텍스트 조회만 DB 스레드에서 하고, 결과 통합은 CPU 풀에서 처리한다
+    (패턴 학습 기록은 UserPatternStore의 기록 스레드 담당).
+    """
+
+    def __init__(self, nlp_provider: Optional[Callable[[], EnhancedNLPProcessor]] = None,
+                 db_path: str = "bjj_training.db", max_workers: int = 4, max_pending: int = 64):
+        # 기본 처리기는 사용자 컨텍스트/패턴도 db_path에 읽고 쓰도록 같은 파일에 묶음
+        self.nlp_provider = nlp_provider or partial(get_shared_enhanced_nlp, db_path)
+        self.generator = SmartTrainingGenerator(BJJTechniqueDatabase())
+        self.youtube = YouTubeRecommendationSystem()
+        self.database = ImprovedBJJDatabase(db_path)
+        self.logger = logging.getLogger("BJJTrainingService")
+
+        self._cpu_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bjj-cpu")
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bjj-db")
+        # 실행 대기 작업 수 제한 - 넘치면 호출 측이 기다린다 (백프레셔)
+        self._cpu_slots = asyncio.Semaphore(max_pending)
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.stats = {'analyses': 0, 'coalesced': 0, 'programs': 0, 'recommendations': 0}
+
+    async def _run_cpu(self, func, *args):
+        async with self._cpu_slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._cpu_executor, partial(func, *args))
+
+    async def _run_db(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._db_executor, partial(func, *args))
+
+    @staticmethod
+    def _text_analysis_job(nlp: EnhancedNLPProcessor, text: str) -> Tuple[str, Dict]:
+        """텍스트 분석 + 지연 필드 계산까지 워커 스레드에서 끝냄 (이벤트 루프에서 계산되지 않도록)"""
+        processed_text, text_analysis = nlp._analyze_text(text)
+        return processed_text, dict(text_analysis)
+
+    @staticmethod
+    def _user_context_job(nlp: EnhancedNLPProcessor, user_id: Optional[str]) -> Dict:
+        return nlp._get_user_context(user_id) if user_id else {}
+
+    @staticmethod
+    def _finalize_job(nlp: EnhancedNLPProcessor, text: str, processed_text: str, text_analysis: Dict,
+                      user_id: Optional[str], start_time: float, user_context: Dict) -> Dict:
+        return nlp._finalize_analysis(
+            text, processed_text, text_analysis, user_id, start_time, user_context
+        ).to_dict()
+
+    async def _analyze_text(self, nlp: EnhancedNLPProcessor, text: str) -> Tuple[str, Dict]:
+        """사용자와 무관한 텍스트 분석 - 진행 중인 같은 요청이 있으면 그 결과를 기다림"""
+        # 실제로 분석하는 문자열 기준 - 구두점만 다른 요청은 결과가 다를 수 있어 병합하지 않음
+        key = (nlp.lexicon_version(), nlp.analysis_key(text))
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+        else:
+            future = asyncio.ensure_future(self._run_cpu(self._text_analysis_job, nlp, text))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # 한 호출자가 취소되어도 다른 대기자의 계산은 계속되도록 shield
+        return await asyncio.shield(future)
+
+    async def analyze(self, text: str, user_id: Optional[str] = None) -> Dict:
+        """사용자 요청 분석 (JSON 직렬화 가능한 dict)"""
+        start_time = time.time()
+        nlp = self.nlp_provider()  # 요청 동안 같은 사전 버전 사용
+        processed_text, text_analysis = await self._analyze_text(nlp, text)
+        self.stats['analyses'] += 1
+        user_context = await self._run_db(self._user_context_job, nlp, user_id)
+        return await self._run_cpu(
+            self._finalize_job, nlp, text, processed_text, text_analysis, user_id, start_time, user_context
+        )
+
+    async def generate_program(self, analysis: Dict, belt: str, user_id: Optional[str] = None) -> Dict:
+        """분석 결과 + 벨트로 훈련 프로그램 생성"""
+        if belt not in BJJ_BELTS:
+            raise ValueError(f"알 수 없는 벨트: {belt}")
+        self._validate_analysis(analysis)
+        program = await self._run_cpu(self.generator.generate_program, analysis, BJJ_BELTS[belt])
+        program['metadata']['user_id'] = user_id
+        program['metadata']['belt'] = belt
+        self.stats['programs'] += 1
+        return program
+
+    def _validate_analysis(self, analysis: Dict):
+        for field, kind in PROGRAM_ANALYSIS_FIELDS.items():
+            if not isinstance(analysis.get(field), kind):
+                raise ValueError(f"분석 결과에 '{field}' 필드가 없거나 형식이 잘못되었습니다")
+        if analysis['duration'] not in self.generator.duration_map:
+            raise ValueError(f"알 수 없는 훈련 시간: {analysis['duration']}")
+
+    @staticmethod
+    def _validate_program(program: Dict):
+        sessions = program.get('main_session')
+        if not isinstance(program.get('metadata'), dict) or not isinstance(sessions, list) or not all(
+            isinstance(item, dict) and 'technique' in item and 'category' in item for item in sessions
+        ):
+            raise ValueError("프로그램 형식이 잘못되었습니다 (metadata, main_session 필요)")
+
+    async def recommend(self, program: Dict) -> List[Dict]:
+        """프로그램 기술별 영상 추천"""
+        self._validate_program(program)
+        recommendations = await self._run_cpu(self.youtube.get_recommendations, program)
+        self.stats['recommendations'] += 1
+        return recommendations
+
+    async def plan(self, text: str, belt: str, user_id: Optional[str] = None) -> Dict:
+        """분석 → 프로그램 → 추천 전체 흐름"""
+        analysis = await self.analyze(text, user_id)
+        program = await self.generate_program(analysis, belt, user_id)
+        recommendations = await self.recommend(program)
+        return {'analysis': analysis, 'program': program, 'recommendations': recommendations}
+
+    async def save_training_session(self, session_data: Dict) -> str:
+        return await self._run_db(self.database.save_training_session, session_data)
+
+    async def get_user_stats(self, user_id: str) -> Dict:
+        return await self._run_db(self.database.get_user_stats, user_id)
+
+    def close(self):
+        self._cpu_executor.shutdown(wait=True)
+        self._db_executor.shutdown(wait=True)
+        # 백그라운드에 남은 사용자 패턴 업데이트 기록
+        self.nlp_provider().user_patterns.flush()
+
+    async def __aenter__(self) -> 'BJJTrainingService':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
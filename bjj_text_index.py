@@ -0,0 +1,521 @@
+# bjj_text_index.py
+"""
+BJJ NLP 텍스트 인덱스 모듈
+키워드 사전을 한 번만 컴파일해 두고, 요청 텍스트는 한 번의 순회로 분석한다.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def levenshtein_distance(s1: str, s2: str) -> int:
+    """편집 거리 (삽입/삭제/치환 비용 1)"""
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    if not s2:
+        return len(s1)
+
+    previous_row = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            insertions = previous_row[j + 1] + 1
+            deletions = current_row[j] + 1
+            substitutions = previous_row[j] + (c1 != c2)
+            current_row.append(min(insertions, deletions, substitutions))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+@dataclass(frozen=True)
+class KeywordHit:
+    """오토마톤 스캔 결과 한 건 (카테고리, 라벨, 원문 위치)"""
+    category: str
+    label: str
+    keyword: str
+    start: int
+    end: int
+
+
+class KeywordAutomaton:
+    """Aho-Corasick 다중 패턴 매처 - 모든 키워드 사전을 하나의 오토마톤으로 컴파일"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._terminals: List[List[Tuple[str, str, str]]] = [[]]
+        self._output: List[List[Tuple[str, str, str]]] = [[]]
+        self._entries: Dict[Tuple[str, str, str], int] = {}
+        self._label_ranks: Dict[Tuple[str, str], int] = {}
+        self._compiled = False
+
+    def add(self, keyword: str, category: str, label: str):
+        """키워드 등록 (같은 키워드를 여러 카테고리에 등록 가능)"""
+        if not keyword:
+            return
+        entry = (category, label, keyword)
+        if entry in self._entries:
+            return
+        # 등록 순서를 기억해 두었다가 조회 시 사전의 우선순위로 사용
+        self._entries[entry] = len(self._entries)
+        self._label_ranks.setdefault((category, label), len(self._label_ranks))
+
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._terminals.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._terminals[state].append(entry)
+        self._compiled = False
+
+    def add_lexicon(self, category: str, lexicon: Dict[str, Iterable[str]]):
+        """{라벨: [키워드, ...]} 형태의 사전을 통째로 등록"""
+        for label, keywords in lexicon.items():
+            for keyword in keywords:
+                self.add(keyword, category, label)
+
+    def compile(self) -> 'KeywordAutomaton':
+        """실패 링크 계산 (BFS)"""
+        self._fail = [0] * len(self._goto)
+        self._output = [list(entries) for entries in self._terminals]
+        queue = deque()
+        for next_state in self._goto[0].values():
+            self._fail[next_state] = 0
+            queue.append(next_state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # 접미사 상태의 출력도 함께 내보내도록 병합
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._compiled = True
+        return self
+
+    def scan(self, text: str) -> 'KeywordHits':
+        """텍스트를 한 번 순회하며 모든 (카테고리, 라벨, 위치) 히트 수집"""
+        hits, _ = self.feed(text)
+        return self.wrap_hits(hits)
+
+    def feed(self, text: str, state: int = 0, offset: int = 0) -> Tuple[List[KeywordHit], int]:
+        """이전 스캔이 끝난 상태에서 이어서 스캔 - (새 히트, 마지막 상태)
+
+        offset은 text가 원문에서 시작하는 위치 (히트 위치 계산용).
+        """
+        if not self._compiled:
+            self.compile()
+
+        goto, fail, output = self._goto, self._fail, self._output
+        hits = []
+        for index, char in enumerate(text, offset):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for category, label, keyword in output[state]:
+                hits.append(KeywordHit(category, label, keyword, index + 1 - len(keyword), index + 1))
+        return hits, state
+
+    def wrap_hits(self, hits: List[KeywordHit]) -> 'KeywordHits':
+        return KeywordHits(hits, self._label_ranks, self._entries)
+
+    @property
+    def keyword_count(self) -> int:
+        return len(self._entries)
+
+
+class KeywordHits:
+    """스캔 결과 조회용 래퍼 - 각 분석기는 원문 대신 이 히트 목록을 읽는다
+
+    labels()/keywords()는 텍스트 등장 순서가 아니라 사전 등록 순서로 정렬되므로
+    기존 `for label, keywords in lexicon.items()` 루프의 우선순위가 그대로 유지된다.
+    """
+
+    def __init__(self, hits: List[KeywordHit], label_ranks: Dict[Tuple[str, str], int] = None,
+                 keyword_ranks: Dict[Tuple[str, str, str], int] = None):
+        self.hits = hits
+        self._label_ranks = label_ranks or {}
+        self._keyword_ranks = keyword_ranks or {}
+        self._by_category: Dict[str, Dict[str, List[KeywordHit]]] = {}
+        for hit in hits:
+            self._by_category.setdefault(hit.category, {}).setdefault(hit.label, []).append(hit)
+
+    def has(self, category: str, label: Optional[str] = None) -> bool:
+        """카테고리(또는 특정 라벨)에 해당하는 키워드가 텍스트에 있는지"""
+        labels = self._by_category.get(category)
+        if not labels:
+            return False
+        return label is None or label in labels
+
+    def labels(self, category: str) -> List[str]:
+        """감지된 라벨 목록 (사전 등록 순)"""
+        found = self._by_category.get(category, {})
+        return sorted(found, key=lambda label: self._label_ranks.get((category, label), 0))
+
+    def first_label(self, category: str) -> Optional[str]:
+        """우선순위가 가장 높은 감지 라벨"""
+        found = self.labels(category)
+        return found[0] if found else None
+
+    def keywords(self, category: str, label: str) -> List[str]:
+        """라벨별로 실제 매칭된 키워드 목록 (중복 제거, 사전 등록 순)"""
+        found = {hit.keyword for hit in self._by_category.get(category, {}).get(label, [])}
+        return sorted(found, key=lambda keyword: self._keyword_ranks.get((category, label, keyword), 0))
+
+    def first(self, category: str, label: str) -> Optional[KeywordHit]:
+        """라벨의 첫 번째 히트"""
+        matches = self._by_category.get(category, {}).get(label)
+        return matches[0] if matches else None
+
+    def __iter__(self):
+        return iter(self.hits)
+
+    def __len__(self) -> int:
+        return len(self.hits)
+
+
+class IncrementalScanner:
+    """입력 중인 텍스트용 스캐너 - 오토마톤 상태와 히트를 유지하고 덧붙은 부분만 스캔
+
+    새 텍스트가 이전 텍스트로 시작하지 않으면 (중간 수정/삭제) 처음부터 다시 스캔한다.
+    """
+
+    def __init__(self, automaton: KeywordAutomaton):
+        self.automaton = automaton
+        self.reset()
+
+    def reset(self):
+        self.text = ''
+        self.state = 0
+        self.hits: List[KeywordHit] = []
+
+    def update(self, text: str) -> str:
+        """현재 텍스트로 갱신 - 새로 스캔한 부분(덧붙은 부분 또는 전체)을 반환"""
+        if not text.startswith(self.text):
+            self.reset()
+        suffix = text[len(self.text):]
+        if suffix:
+            hits, self.state = self.automaton.feed(suffix, self.state, len(self.text))
+            self.hits.extend(hits)
+            self.text = text
+        return suffix
+
+    def result(self) -> 'KeywordHits':
+        return self.automaton.wrap_hits(self.hits)
+
+
+class SuffixStemmer:
+    """조사/어미 제거 토크나이저 - 어휘 단어에 붙을 수 있는 형태를 미리 펼친 표로 O(1) 정규화
+
+    어휘에 그대로 있는 어절은 그대로 두고, '다리를'/'목을'처럼 조사가 붙은 형태는 '다리'/'목'으로,
+    '꺾는'/'조르고'처럼 '-기' 명사형 동사의 활용형은 '꺾기'/'조르기'로 바꾼다.
+    표에 없는 어절은 그대로 반환한다 (표 자체가 어절별 결과 캐시 역할).
+    """
+
+    def __init__(self, vocabulary: Iterable[str], particles: Iterable[str], verb_endings: Iterable[str]):
+        words = list(dict.fromkeys(vocabulary))
+        known = set(words)
+        particles = list(particles)
+        verb_endings = list(verb_endings)
+        self._forms: Dict[str, str] = {}
+        # 긴 단어부터 등록 - 두 단어에서 같은 형태가 나오면 더 긴 어간을 선택
+        for word in sorted(words, key=len, reverse=True):
+            for particle in particles:
+                self._add(word + particle, word, known)
+            if len(word) > 1 and word.endswith('기'):
+                for ending in verb_endings:
+                    self._add(word[:-1] + ending, word, known)
+
+    def _add(self, form: str, word: str, known: set):
+        if form not in known:  # 어휘에 있는 형태는 그 자체로 검색
+            self._forms.setdefault(form, word)
+
+    def stem(self, token: str) -> str:
+        return self._forms.get(token, token)
+
+    def tokenize(self, text: str) -> List[str]:
+        """공백 단위 어절 → 정규화된 어간 목록"""
+        return [self._forms.get(token, token) for token in text.split()]
+
+    def __len__(self) -> int:
+        return len(self._forms)
+
+
+@dataclass
+class NormalizedText:
+    """정규화 결과 + 원문 위치 매핑"""
+    text: str
+    offsets: List[int]  # 정규화 텍스트 위치 j -> 원문 위치 (길이 len(text) + 1)
+
+    def original_span(self, start: int, end: int) -> Tuple[int, int]:
+        """정규화 텍스트의 [start, end) 구간을 원문 구간으로 변환"""
+        return self.offsets[start], self.offsets[end]
+
+
+class PhraseNormalizer:
+    """트라이 기반 최장 일치 치환기 - 동의어/오타 정규화를 좌->우 한 번의 순회로 처리"""
+
+    def __init__(self, typo_index: 'JamoTypoIndex' = None):
+        self._children: List[Dict[str, int]] = [{}]
+        self._replacements: List[Optional[str]] = [None]
+        # 어절 시작 위치에서 규칙보다 긴 구간을 덮는 오타 교정이 있으면 그쪽을 적용
+        self.typo_index = typo_index
+
+    def add(self, phrase: str, replacement: str, overwrite: bool = False):
+        """치환 규칙 등록 (먼저 등록된 규칙이 우선, overwrite=True면 덮어씀)"""
+        if not phrase:
+            return
+        state = 0
+        for char in phrase:
+            next_state = self._children[state].get(char)
+            if next_state is None:
+                next_state = len(self._children)
+                self._children.append({})
+                self._replacements.append(None)
+                self._children[state][char] = next_state
+            state = next_state
+        if overwrite or self._replacements[state] is None:
+            self._replacements[state] = replacement
+
+    def normalize(self, text: str) -> NormalizedText:
+        """각 위치에서 가장 긴 규칙을 적용하고, 치환된 구간은 다시 검사하지 않는다"""
+        children, replacements = self._children, self._replacements
+        pieces = []
+        offsets = []
+        index = 0
+        length = len(text)
+
+        while index < length:
+            state = 0
+            match_end = -1
+            match_replacement = None
+            cursor = index
+            while cursor < length:
+                state = children[state].get(text[cursor])
+                if state is None:
+                    break
+                cursor += 1
+                if replacements[state] is not None:
+                    match_end = cursor
+                    match_replacement = replacements[state]
+
+            if self.typo_index is not None and (index == 0 or text[index - 1].isspace()):
+                typo_match = self.typo_index.match_prefix(text, index)
+                if typo_match and typo_match[0] > match_end:
+                    match_end, match_replacement = typo_match[0], typo_match[1]
+
+            if match_end < 0:
+                pieces.append(text[index])
+                offsets.append(index)
+                index += 1
+            else:
+                pieces.append(match_replacement)
+                offsets.extend([index] * len(match_replacement))
+                index = match_end
+
+        offsets.append(length)
+        return NormalizedText(''.join(pieces), offsets)
+
+
+class BKTree:
+    """BK-트리 퍼지 인덱스 - 삼각 부등식으로 후보를 가지치기해 전체 비교를 피한다"""
+
+    def __init__(self, distance=levenshtein_distance):
+        self._distance = distance
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        self._payloads: Dict[str, List[str]] = {}
+
+    def add(self, term: str, payload: str):
+        """용어 등록 (같은 용어에 여러 payload 가능)"""
+        if not term:
+            return
+        if term in self._payloads:
+            if payload not in self._payloads[term]:
+                self._payloads[term].append(payload)
+            return
+        self._payloads[term] = [payload]
+
+        if self._root is None:
+            self._root = (term, {})
+            return
+
+        node = self._root
+        while True:
+            node_term, children = node
+            distance = self._distance(term, node_term)
+            if distance == 0:
+                return
+            child = children.get(distance)
+            if child is None:
+                children[distance] = (term, {})
+                return
+            node = child
+
+    def search(self, query: str, max_distance: int) -> List[Tuple[str, int]]:
+        """편집 거리 max_distance 이내의 (용어, 거리) 목록"""
+        if self._root is None:
+            return []
+
+        results = []
+        stack = [self._root]
+        while stack:
+            node_term, children = stack.pop()
+            distance = self._distance(query, node_term)
+            if distance <= max_distance:
+                results.append((node_term, distance))
+            low, high = distance - max_distance, distance + max_distance
+            for edge, child in children.items():
+                if low <= edge <= high:
+                    stack.append(child)
+        return results
+
+    def payloads(self, term: str) -> List[str]:
+        return self._payloads.get(term, [])
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+
+# 한글 음절 -> 자모 분해 (초성 19 x 중성 21 x 종성 28)
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+_JONGSEONG = ' ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ'
+# 어미/명사형 어미로 흔히 쓰이는 음절 - 용어의 마지막 음절이 이렇게 바뀐 것은 오타가 아니라 활용형
+_ENDING_SYLLABLES = frozenset('고기게지는다요서면며자')
+
+
+def decompose_hangul(text: str) -> str:
+    """한글 음절을 자모 시퀀스로 분해 ('듣' -> 'ㄷㅡㄷ', 그 외 문자는 그대로)"""
+    jamo = []
+    for char in text:
+        code = ord(char)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            offset = code - _HANGUL_BASE
+            jamo.append(_CHOSEONG[offset // 588])
+            jamo.append(_JUNGSEONG[(offset % 588) // 28])
+            if offset % 28:
+                jamo.append(_JONGSEONG[offset % 28])
+        else:
+            jamo.append(char)
+    return ''.join(jamo)
+
+
+def bounded_levenshtein(s1: str, s2: str, max_distance: int) -> int:
+    """max_distance를 넘으면 즉시 max_distance + 1을 반환하는 편집 거리 (대각 밴드만 계산)"""
+    if abs(len(s1) - len(s2)) > max_distance:
+        return max_distance + 1
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+
+    over = max_distance + 1
+    previous_row = [j if j <= max_distance else over for j in range(len(s2) + 1)]
+    for i, c1 in enumerate(s1, 1):
+        low = max(1, i - max_distance)
+        high = min(len(s2), i + max_distance)
+        current_row = [over] * (len(s2) + 1)
+        if i <= max_distance:
+            current_row[0] = i
+        for j in range(low, high + 1):
+            current_row[j] = min(
+                previous_row[j] + 1,
+                current_row[j - 1] + 1,
+                previous_row[j - 1] + (c1 != s2[j - 1])
+            )
+        if min(current_row) > max_distance:
+            return over
+        previous_row = current_row
+    return min(previous_row[-1], over)
+
+
+class JamoTypoIndex:
+    """자모 바이그램 인덱스 - 한글 오타를 후보 조회 + 제한 편집거리 검사로 교정
+
+    교정은 초성이 모두 같고 중성/종성만 다른 경우로 제한한다 ('하프가듣', '기욜틴').
+    초성이 바뀌면 다른 단어가 되는 경우가 많기 때문이다 ('관절이' -> '관절기' 방지).
+    마지막 음절이 어미 음절로 바뀐 경우도 교정하지 않는다 ('뒤집고' -> '뒤집기' 방지).
+    """
+
+    def __init__(self):
+        # (용어, 교정 결과, 자모, 초성열, 허용 거리, 바이그램 수)
+        self._terms: List[Tuple[str, str, str, str, int, int]] = []
+        self._grams: Dict[str, List[int]] = {}
+        self._known: Dict[str, int] = {}
+
+    @staticmethod
+    def _bigrams(jamo: str) -> set:
+        return {jamo[i:i + 2] for i in range(len(jamo) - 1)}
+
+    @staticmethod
+    def _initials(text: str) -> str:
+        return ''.join(_CHOSEONG[(ord(char) - _HANGUL_BASE) // 588] for char in text)
+
+    @staticmethod
+    def _is_hangul(text: str) -> bool:
+        return all(_HANGUL_BASE <= ord(char) <= _HANGUL_LAST for char in text)
+
+    def add(self, term: str, replacement: str):
+        """교정 대상 용어 등록 (3음절 미만이거나 한글이 아닌 용어는 오탐이 많아 제외)"""
+        if len(term) < 3 or not self._is_hangul(term) or term in self._known:
+            return
+        jamo = decompose_hangul(term)
+        max_distance = 1 if len(term) < 5 else 2
+        grams = self._bigrams(jamo)
+        term_id = len(self._terms)
+        self._terms.append((term, replacement, jamo, self._initials(term), max_distance, len(grams)))
+        self._known[term] = term_id
+        for gram in grams:
+            self._grams.setdefault(gram, []).append(term_id)
+
+    def match_prefix(self, text: str, start: int) -> Optional[Tuple[int, str, int]]:
+        """text[start:]의 첫 어절 앞부분과 가장 가까운 용어 -> (끝 위치, 교정 결과, 거리)"""
+        end = start
+        while end < len(text) and self._is_hangul(text[end]):
+            end += 1
+        token = text[start:end]
+        if len(token) < 3:
+            return None
+
+        # 후보 조회: 편집 1회는 서로 다른 바이그램을 최대 2개까지만 없앤다
+        shared: Dict[int, int] = {}
+        for gram in self._bigrams(decompose_hangul(token)):
+            for term_id in self._grams.get(gram, ()):
+                shared[term_id] = shared.get(term_id, 0) + 1
+
+        best = None
+        for term_id, count in shared.items():
+            term, replacement, jamo, initials, max_distance, gram_count = self._terms[term_id]
+            # 어절 뒤쪽은 조사/어미일 수 있으므로 용어와 같은 음절 수만큼만 비교
+            prefix = token[:len(term)]
+            if count < gram_count - 2 * max_distance or len(prefix) < len(term):
+                continue
+            if self._initials(prefix) != initials:
+                continue
+            if prefix[-1] != term[-1] and prefix[-1] in _ENDING_SYLLABLES:
+                continue
+            distance = bounded_levenshtein(decompose_hangul(prefix), jamo, max_distance)
+            if distance > max_distance:
+                continue
+            # 더 긴 구간을 덮는 용어 우선, 같으면 거리가 가까운 용어
+            candidate = (-len(term), distance, term_id)
+            if best is None or candidate < best:
+                best = candidate
+
+        if best is None:
+            return None
+        negative_length, distance, term_id = best
+        return start - negative_length, self._terms[term_id][1], distance
+
+    def __len__(self) -> int:
+        return len(self._terms)
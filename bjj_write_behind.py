@@ -0,0 +1,135 @@
+# bjj_write_behind.py
+"""
+BJJ write-behind 큐
+요청 경로에서는 기록할 내용을 큐에 넣기만 하고, 백그라운드 스레드가 같은 키의 변경을 병합해
+한 트랜잭션으로 일괄 기록한다. 종료/테스트 시에는 flush()로 남은 기록을 모두 내보낸다.
+"""
+
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger("BJJWriteBehind")
+
+
+def _keep_latest(old: Any, new: Any) -> Any:
+    return new
+
+
+class WriteBehindQueue:
+    """키별로 병합하는 크기 제한 write-behind 큐
+
+    같은 키가 기록 전에 다시 들어오면 merge(이전 값, 새 값)으로 합쳐 한 번만 기록한다.
+    대기 중인 키가 max_pending개면 submit()은 자리가 날 때까지 기다린다 (백프레셔).
+    기록 스레드는 쌓여 있는 항목을 최대 batch_size개씩 write_batch([(키, 값), ...])에 넘긴다.
+    """
+
+    def __init__(self, write_batch: Callable[[List[Tuple[Hashable, Any]]], None],
+                 merge: Callable[[Any, Any], Any] = _keep_latest,
+                 max_pending: int = 1024, batch_size: int = 256, name: str = "WriteBehind"):
+        if max_pending <= 0 or batch_size <= 0:
+            raise ValueError("max_pending/batch_size는 1 이상이어야 합니다")
+        self.write_batch = write_batch
+        self.merge = merge
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.name = name
+        self._pending: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.submitted = 0
+        self.coalesced = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+
+    def submit(self, key: Hashable, value: Any, timeout: Optional[float] = None) -> bool:
+        """기록 예약 - 큐가 가득 찬 채로 timeout이 지나면 False"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} 큐가 이미 닫혔습니다")
+            if key not in self._pending:
+                has_room = self._cond.wait_for(
+                    lambda: len(self._pending) < self.max_pending or key in self._pending or self._closed,
+                    timeout
+                )
+                if not has_room or self._closed:
+                    return False
+            if key in self._pending:
+                self._pending[key] = self.merge(self._pending[key], value)
+                self.coalesced += 1
+            else:
+                self._pending[key] = value
+            self.submitted += 1
+            self._ensure_writer()
+            self._cond.notify_all()
+            return True
+
+    def _ensure_writer(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            # 데몬 스레드라 종료 시 남은 기록을 잃지 않도록
+            atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return  # 닫혔고 남은 항목 없음
+                batch = []
+                while self._pending and len(batch) < self.batch_size:
+                    batch.append(self._pending.popitem(last=False))
+                self._in_flight = len(batch)
+                self._cond.notify_all()  # 자리가 났음을 대기 중인 submit에 알림
+
+            try:
+                self.write_batch(batch)
+                written, failed = len(batch), 0
+            except Exception as e:
+                # 재시도하지 않음 - 기록 함수가 자체 정리(캐시 무효화 등)를 책임진다
+                logger.error(f"{self.name} batch of {len(batch)} failed: {e}")
+                written, failed = 0, len(batch)
+
+            with self._cond:
+                self._in_flight = 0
+                self.written += written
+                self.failed += failed
+                self.batches += 1
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """지금까지 예약된 기록이 모두 끝날 때까지 대기 - timeout 안에 끝나면 True"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """남은 기록을 내보내고 기록 스레드 종료 (이후 submit은 오류)"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            atexit.unregister(self.close)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                'pending': len(self._pending),
+                'in_flight': self._in_flight,
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'written': self.written,
+                'failed': self.failed,
+                'batches': self.batches
+            }
+
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,19 @@
+# tests/conftest.py
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+logging.disable(logging.CRITICAL)
+
+
+@pytest.fixture(scope="session")
+def enhanced_nlp(tmp_path_factory):
+    """사용자 패턴 DB를 임시 디렉터리에 둔 V2 NLP 처리기"""
+    from bjj_advanced_system_v2 import EnhancedNLPProcessor
+
+    nlp = EnhancedNLPProcessor(user_db_path=str(tmp_path_factory.mktemp("nlp") / "users.db"))
+    yield nlp
+    nlp.user_patterns.close()
@@ -0,0 +1,35 @@
+# tests/test_analysis_cache.py
+from bjj_cache import normalize_query
+
+NEGATED = "노기 말고 기 훈련"
+PUNCTUATED = "노기, 말고 기 훈련"
+
+
+def _has_negation(result) -> bool:
+    return result['negation_analysis']['has_negation']
+
+
+def test_persistent_cache_does_not_merge_texts_that_analyze_differently(tmp_path):
+    from bjj_advanced_system_v2 import EnhancedNLPProcessor
+
+    assert normalize_query(NEGATED) == normalize_query(PUNCTUATED)
+    users_db = str(tmp_path / "users.db")
+    uncached = EnhancedNLPProcessor(user_db_path=users_db)
+    cached = EnhancedNLPProcessor(persistent_cache_path=str(tmp_path / "cache.db"), user_db_path=users_db)
+    try:
+        expected = [_has_negation(uncached.analyze_user_request(text)) for text in (NEGATED, PUNCTUATED)]
+        assert expected[0] != expected[1]
+
+        assert [_has_negation(cached.analyze_user_request(text)) for text in (NEGATED, PUNCTUATED)] == expected
+        # 두 번째 조회는 캐시에서 - 결과는 같아야 함
+        assert [_has_negation(cached.analyze_user_request(text)) for text in (NEGATED, PUNCTUATED)] == expected
+    finally:
+        uncached.user_patterns.close()
+        cached.user_patterns.close()
+
+
+def test_analyze_many_does_not_merge_texts_that_analyze_differently(enhanced_nlp):
+    texts = [NEGATED, PUNCTUATED, NEGATED.upper() + "  "]
+    batch = [_has_negation(result) for result in enhanced_nlp.analyze_many(texts)]
+    assert batch == [_has_negation(enhanced_nlp.analyze_user_request(text)) for text in texts]
+    assert batch[0] != batch[1]
@@ -0,0 +1,69 @@
+# tests/test_api.py
+import asyncio
+import json
+
+import pytest
+
+
+class _StubService:
+    stats = {}
+
+
+async def _raw_request(raw: bytes, service=None) -> bytes:
+    from bjj_api import BJJAPIServer
+
+    server = BJJAPIServer(service or _StubService(), port=0)
+    await server.start()
+    try:
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(raw)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return response
+    finally:
+        await server.stop()
+
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_invalid_content_length_returns_400(length):
+    raw = (f"POST /analyze HTTP/1.1\r\nHost: localhost\r\nContent-Length: {length}\r\n\r\n").encode('latin-1')
+    response = asyncio.run(_raw_request(raw))
+    assert response.startswith(b"HTTP/1.1 400 ")
+    assert "Content-Length".encode() in response
+
+
+def _post(service, path: str, payload) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    raw = (f"POST {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n"
+           f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body
+    return asyncio.run(_raw_request(raw, service))
+
+
+@pytest.fixture
+def service(tmp_path):
+    from bjj_service import BJJTrainingService
+
+    service = BJJTrainingService(db_path=str(tmp_path / "api.db"))
+    yield service
+    service.close()
+
+
+@pytest.mark.parametrize("path, payload", [
+    ("/analyze", {"text": 5}),
+    ("/analyze", {"text": "암바 배우고 싶어요", "user_id": ["kim"]}),
+    ("/program", {"analysis": {}, "belt": "🔵 블루 벨트"}),
+    ("/program", {"analysis": {"duration": "forever", "gi_preference": "both", "positions": []},
+                  "belt": "🔵 블루 벨트"}),
+    ("/program", {"analysis": "short", "belt": "🔵 블루 벨트"}),
+    ("/program", {"text": "암바 배우고 싶어요", "belt": ["🔵 블루 벨트"]}),
+    ("/recommendations", {"program": {"metadata": {}}}),
+])
+def test_invalid_client_input_returns_400(service, path, payload):
+    assert _post(service, path, payload).startswith(b"HTTP/1.1 400 ")
+
+
+def test_program_accepts_complete_client_analysis(service):
+    analysis = {"duration": "short", "gi_preference": "both", "positions": []}
+    response = _post(service, "/program", {"analysis": analysis, "belt": "🔵 블루 벨트"})
+    assert response.startswith(b"HTTP/1.1 200 ")
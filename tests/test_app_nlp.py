@@ -0,0 +1,62 @@
+# tests/test_app_nlp.py
+import pytest
+
+
+@pytest.fixture
+def nlp():
+    from app import HighPerformanceNLP
+    return HighPerformanceNLP(cache_size=100)
+
+
+def _without_timing(result):
+    return {key: value for key, value in result.items() if key != 'processing_time'}
+
+
+def test_punctuation_variants_share_cache_key_and_result(nlp):
+    from app import HighPerformanceNLP
+
+    punctuated = nlp.analyze_query("다리를, 꺾는 기술!")
+    fresh = HighPerformanceNLP(cache_size=100).analyze_query("다리를 꺾는 기술")
+    assert _without_timing(punctuated) == _without_timing(fresh)
+    assert punctuated['main_techniques'][0]['name'] == '힐훅'
+
+
+def test_incremental_session_matches_full_analysis(nlp):
+    text = "하프가드에서, 스윕하는 방법!"
+    session = nlp.start_session()
+    for end in range(1, len(text) + 1):
+        assert _without_timing(session.update(text[:end])) == _without_timing(nlp.analyze_query(text[:end]))
+
+
+def test_punctuated_technique_name_is_matched(nlp):
+    result = nlp.analyze_query("50/50 가드 배우고 싶어요")
+    assert result['main_techniques'][0]['name'] == '50/50 가드'
+
+
+def test_uppercase_keywords_match_folded_query(nlp):
+    names = [tech['name'] for tech in nlp.analyze_query("X자로 잡는 가드")['main_techniques']]
+    assert 'X 가드' in names
+
+
+def _main_names(nlp, text):
+    return [tech['name'] for tech in nlp.analyze_query(text)['main_techniques']]
+
+
+def test_arm_lock_query_does_not_promote_leg_locks(nlp):
+    names = _main_names(nlp, "팔 꺾는 관절기")
+    assert names[:3] == ['암바', '아메리카나', '킴우라']
+    assert '힐훅' not in names and '앵클락' not in names
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("다리를 꺾는 기술", ['힐훅']),
+    ("팔을 꺾는 기술", ['암바', '아메리카나']),
+])
+def test_inflected_body_part_and_action_keep_precise_matches(nlp, text, expected):
+    # 신체 부위/동작의 활용형이 '다리'/'꺾기' 키워드로 바뀌어 가드 전체가 올라오지 않도록
+    assert _main_names(nlp, text) == expected
+
+
+def test_particles_are_stripped_from_technique_keywords(nlp):
+    assert nlp.tokenizer.tokenize("가드에서 도복을") == ['가드', '도복']
+    assert nlp.tokenizer.stem("다리를") == "다리를"
@@ -0,0 +1,77 @@
+# tests/test_backup.py
+import gzip
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from bjj_backup import BackupError, BackupManager
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "source.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, pair INTEGER, payload TEXT)")
+    with conn:
+        conn.executemany("INSERT INTO events (pair, payload) VALUES (?, ?)",
+                         [(i // 2, 'x' * 500) for i in range(2000)])
+    conn.close()
+    return path
+
+
+def test_backup_is_consistent_while_a_writer_is_active(db_path, tmp_path):
+    stop = threading.Event()
+    written = []
+
+    def writer():
+        conn = sqlite3.connect(db_path, timeout=10)
+        pair = 10_000
+        while not stop.is_set():
+            with conn:  # 두 행을 한 트랜잭션으로 - 백업에는 항상 짝이 맞게 들어가야 함
+                conn.executemany("INSERT INTO events (pair, payload) VALUES (?, ?)",
+                                 [(pair, 'y' * 500), (pair, 'y' * 500)])
+            written.append(pair)
+            pair += 1
+        conn.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        manager = BackupManager(db_path, str(tmp_path / "backups"), pages_per_step=8,
+                                step_sleep=0.001, max_restarts=2)
+        result = manager.create_backup()
+    finally:
+        stop.set()
+        thread.join()
+
+    assert written, "writer should have committed during the backup"
+    assert result.verified and os.path.exists(result.path)
+    backup = sqlite3.connect(result.path)
+    try:
+        assert backup.execute("PRAGMA journal_mode").fetchone()[0] == 'delete'
+        count, = backup.execute("SELECT COUNT(*) FROM events").fetchone()
+        unpaired = backup.execute(
+            "SELECT COUNT(*) FROM (SELECT pair FROM events GROUP BY pair HAVING COUNT(*) != 2)"
+        ).fetchone()[0]
+    finally:
+        backup.close()
+    assert count >= 2000 and unpaired == 0
+    assert not [name for name in os.listdir(manager.backup_dir) if name.endswith('.partial')]
+
+
+def test_rotation_keeps_newest_backups_and_compresses(db_path, tmp_path):
+    manager = BackupManager(db_path, str(tmp_path / "backups"), keep=2, compress=True)
+    results = [manager.create_backup() for _ in range(3)]
+
+    assert manager.list_backups() == [results[2].path, results[1].path]
+    assert not os.path.exists(results[0].path)
+    with gzip.open(results[2].path, 'rb') as f:
+        assert f.read(16) == b'SQLite format 3\x00'
+
+
+def test_missing_source_raises_backup_error(tmp_path):
+    with pytest.raises(BackupError):
+        BackupManager(str(tmp_path / "missing.db")).create_backup()
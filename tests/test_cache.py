@@ -0,0 +1,65 @@
+# tests/test_cache.py
+import pytest
+
+import bjj_cache
+from bjj_cache import LRUCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(bjj_cache, 'time', clock)
+    return clock
+
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = LRUCache(max_size=2, ttl_seconds=None)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'a'를 최근 사용으로
+    cache.put('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache(max_size=10, ttl_seconds=60)
+    cache.put('a', 1)
+    clock.now += 60
+    assert cache.get('a') == 1  # 경계값은 아직 유효
+    clock.now += 0.001
+    assert cache.get('a', 'missing') == 'missing'
+    assert 'a' not in cache
+
+    stats = cache.stats()
+    assert stats['expirations'] == 1
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_put_refreshes_ttl(clock):
+    cache = LRUCache(max_size=10, ttl_seconds=60)
+    cache.put('a', 1)
+    clock.now += 50
+    cache.put('a', 2)
+    clock.now += 50
+    assert cache.get('a') == 2
+
+
+def test_put_if_absent_keeps_fresh_value_and_replaces_expired(clock):
+    cache = LRUCache(max_size=10, ttl_seconds=60)
+    cache.put('user', 'newer')
+    assert cache.put_if_absent('user', 'from-db') == 'newer'
+
+    clock.now += 61
+    assert cache.put_if_absent('user', 'from-db') == 'from-db'
+    assert cache.get('user') == 'from-db'
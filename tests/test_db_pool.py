@@ -0,0 +1,76 @@
+# tests/test_db_pool.py
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from bjj_db_pool import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1, timeout=1.0, health_check_interval=0.0)
+    yield pool
+    pool.close()
+
+
+def test_acquire_times_out_when_all_connections_are_in_use(pool):
+    conn = pool.acquire()
+    started = time.perf_counter()
+    with pytest.raises(sqlite3.OperationalError):
+        pool.acquire(timeout=0.05)
+    assert time.perf_counter() - started >= 0.05
+    pool.release(conn)
+
+    stats = pool.stats()
+    assert stats['waits'] == 1 and stats['timeouts'] == 1
+    assert stats['in_use'] == 0 and stats['open'] == 1
+
+
+def test_waiting_acquire_gets_released_connection(pool):
+    conn = pool.acquire()
+    threading.Timer(0.05, pool.release, args=(conn,)).start()
+    assert pool.acquire(timeout=2.0) is conn
+    pool.release(conn)
+
+
+def test_unhealthy_idle_connection_is_replaced_on_acquire(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()  # 쉬는 동안 끊긴 연결
+
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert replacement.execute("SELECT 1").fetchone() == (1,)
+    pool.release(replacement)
+    assert pool.stats()['replaced'] == 1
+    assert pool.stats()['open'] == 1
+
+
+def test_health_check_drops_broken_idle_connections(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=2)
+    first, second = pool.acquire(), pool.acquire()
+    pool.release(first)
+    pool.release(second)
+    first.close()
+
+    assert pool.health_check() == {'checked': 2, 'removed': 1}
+    assert pool.stats()['open'] == 1
+    pool.close()
+
+
+def test_release_rolls_back_unfinished_transaction(pool):
+    with pool.transaction() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    conn = pool.acquire()
+    conn.execute("INSERT INTO t VALUES (1)")
+    pool.release(conn)
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (0,)
+
+
+def test_closed_pool_refuses_acquire(pool):
+    pool.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.acquire()
@@ -0,0 +1,25 @@
+# tests/test_feedback.py
+
+
+def test_feedback_updates_accuracy_rate(tmp_path):
+    from bjj_advanced_system_v2 import EnhancedNLPProcessor, ImprovedBJJDatabase, submit_nlp_feedback
+
+    db = ImprovedBJJDatabase(str(tmp_path / "feedback.db"))
+    nlp = EnhancedNLPProcessor(user_db_path=db.db_path)
+    try:
+        user_id = db.create_user('lee', 'lee@example.com', 'pw123456', '⚪ 화이트 벨트')
+        text = '하프가드 스윕 배우고 싶어요'
+        analysis = nlp.analyze_user_request(text, user_id)
+        assert nlp.get_performance_stats()['accuracy_rate'] is None
+
+        submit_nlp_feedback(db, nlp, user_id, text, dict(analysis),
+                            {'intent_correct': True, 'intent_partially_correct': False})
+        assert nlp.get_performance_stats()['accuracy_rate'] == 1.0
+
+        submit_nlp_feedback(db, nlp, user_id, text, dict(analysis),
+                            {'intent_correct': False, 'intent_partially_correct': False})
+        submit_nlp_feedback(db, nlp, user_id, text, dict(analysis),
+                            {'intent_correct': False, 'intent_partially_correct': True})
+        assert nlp.get_performance_stats()['accuracy_rate'] == 0.5
+    finally:
+        nlp.user_patterns.close()
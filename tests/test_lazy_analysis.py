@@ -0,0 +1,39 @@
+# tests/test_lazy_analysis.py
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_lazy_field_is_computed_once_under_concurrent_reads():
+    from bjj_advanced_system_v2 import LazyAnalysis
+
+    calls = []
+
+    def slow_factory():
+        calls.append(threading.get_ident())
+        time.sleep(0.05)  # 다른 스레드가 계산 도중에 같은 필드를 읽도록
+        return {'has_negation': True}
+
+    result = LazyAnalysis({'intent': 'learn'})
+    result.set_lazy('negation_analysis', slow_factory)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        values = list(pool.map(lambda _: result['negation_analysis'], range(8)))
+
+    assert len(calls) == 1
+    assert all(value is values[0] for value in values)
+
+
+def test_merged_lazy_fields_share_one_computation():
+    from bjj_advanced_system_v2 import LazyAnalysis
+
+    calls = []
+    source = LazyAnalysis()
+    source.set_lazy('fuzzy_techniques', lambda: calls.append(1) or ['암바'])
+    merged = LazyAnalysis()
+    merged.merge(source)
+
+    assert not merged.is_computed('fuzzy_techniques')
+    assert merged['fuzzy_techniques'] == ['암바'] == source['fuzzy_techniques']
+    assert calls == [1]
+    assert pickle.loads(pickle.dumps(merged)) == {'fuzzy_techniques': ['암바']}
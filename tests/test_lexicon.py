@@ -0,0 +1,23 @@
+# tests/test_lexicon.py
+from bjj_lexicon import LEXICON_SOURCE_PATH, load_lexicon_source, read_artifact, source_checksum, write_artifact
+
+
+def test_compiled_artifact_is_used_by_processor(tmp_path, monkeypatch):
+    from bjj_advanced_system_v2 import EnhancedNLPProcessor
+
+    artifact_path = str(tmp_path / "nlp_lexicons.pkl")
+    checksum = source_checksum(LEXICON_SOURCE_PATH)
+    write_artifact(artifact_path, checksum,
+                   EnhancedNLPProcessor.compile_lexicons(load_lexicon_source(LEXICON_SOURCE_PATH)))
+    assert read_artifact(artifact_path, checksum) is not None
+
+    # 최신 아티팩트가 있으면 처리기는 다시 컴파일하지 않는다
+    def fail(self, lexicons):
+        raise AssertionError("artifact was rebuilt")
+    monkeypatch.setattr(EnhancedNLPProcessor, '_compile_lexicons', fail)
+    nlp = EnhancedNLPProcessor(lexicon_artifact_path=artifact_path,
+                               user_db_path=str(tmp_path / "users.db"))
+    try:
+        assert nlp._normalize_text("하프가듣에서 스윕").text == "하프가드에서 스위프"
+    finally:
+        nlp.user_patterns.close()
@@ -0,0 +1,57 @@
+# tests/test_loadtest.py
+import asyncio
+
+
+class _FakeWriter:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _generator(connections: int):
+    from bjj_loadtest import LoadGenerator
+
+    generator = LoadGenerator("http://127.0.0.1:1", "analyze", ["암바"], rps=10, duration=1,
+                              connections=connections, timeout=1)
+
+    async def broken_request(conn, body):
+        raise ConnectionResetError("reset")
+
+    async def refuse():
+        raise ConnectionRefusedError("refused")
+
+    generator._request = broken_request
+    generator._open = refuse
+    return generator
+
+
+def test_connection_that_cannot_be_replaced_leaves_the_pool():
+    generator = _generator(connections=2)
+
+    async def run():
+        pool = asyncio.Queue()
+        conns = [(None, _FakeWriter()) for _ in range(2)]
+        for conn in conns:
+            pool.put_nowait(conn)
+        await generator._fire(pool, 0.0, b'{}')
+        return pool, conns
+
+    pool, conns = asyncio.run(run())
+    assert conns[0][1].closed
+    assert generator.lost_connections == 1
+    assert pool.qsize() == 1 and pool.get_nowait() is conns[1]
+
+
+def test_requests_fail_fast_once_every_connection_is_lost():
+    generator = _generator(connections=1)
+
+    async def run():
+        pool = asyncio.Queue()
+        pool.put_nowait((None, _FakeWriter()))
+        await asyncio.wait_for(asyncio.gather(*(generator._fire(pool, 0.0, b'{}') for _ in range(3))), 5)
+
+    asyncio.run(run())
+    assert generator.lost_connections == 1
+    assert generator.errors == {'ConnectionResetError': 1, 'no_connection': 2}
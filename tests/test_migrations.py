@@ -0,0 +1,82 @@
+# tests/test_migrations.py
+import pytest
+
+from bjj_db_pool import ConnectionPool
+from bjj_migrations import ChunkedMigration, Migration, MigrationRunner
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "migrate.db"), size=1)
+    with pool.transaction() as conn:
+        conn.execute("CREATE TABLE src (value INTEGER)")
+        conn.execute("CREATE TABLE dst (src_id INTEGER PRIMARY KEY, doubled INTEGER)")
+        conn.executemany("INSERT INTO src (value) VALUES (?)", [(i,) for i in range(10)])
+    yield pool
+    pool.close()
+
+
+def _copy_migration(transform):
+    return ChunkedMigration(
+        version=1, name='copy_doubled', table='src', columns='value',
+        write_sql='INSERT OR IGNORE INTO dst (src_id, doubled) VALUES (?, ?)',
+        transform=transform
+    )
+
+
+def _double(rows):
+    return [(row[0], row[1] * 2) for row in rows]
+
+
+def test_chunked_migration_resumes_from_checkpoint(pool):
+    calls = []
+
+    def interrupted(rows):
+        calls.append([row[0] for row in rows])
+        if len(calls) == 3:
+            raise RuntimeError("interrupted")
+        return _double(rows)
+
+    with pytest.raises(RuntimeError):
+        MigrationRunner(pool, [_copy_migration(interrupted)], chunk_size=3, progress=None).run()
+
+    resumed = []
+
+    def recording(rows):
+        resumed.append([row[0] for row in rows])
+        return _double(rows)
+
+    runner = MigrationRunner(pool, [_copy_migration(recording)], chunk_size=3, progress=None)
+    status = runner.status()[1]
+    assert status['status'] == 'running'
+    assert (status['checkpoint'], status['rows_done']) == (6, 6)  # 커밋된 두 chunk까지
+
+    [progress] = runner.run()
+    assert resumed == [[7, 8, 9], [10]]  # 체크포인트 다음 행부터
+    assert progress.rows_done == 10 and progress.rows_this_run == 4 and progress.finished
+    assert runner.status()[1]['status'] == 'done'
+    assert runner.pending() == []
+    with pool.connection() as conn:
+        rows = conn.execute("SELECT src_id, doubled FROM dst ORDER BY src_id").fetchall()
+    assert rows == [(i + 1, i * 2) for i in range(10)]
+
+
+def test_runner_applies_migrations_in_order_up_to_target(pool):
+    applied = []
+
+    def single(version):
+        return Migration(version, f'step_{version}', lambda conn: applied.append(version))
+
+    runner = MigrationRunner(pool, [single(3), single(1), single(2)], progress=None)
+    runner.run(target=2)
+    assert applied == [1, 2]
+    assert [m.version for m in runner.pending()] == [3]
+    runner.run()
+    assert applied == [1, 2, 3]
+    runner.run()
+    assert applied == [1, 2, 3]
+
+
+def test_duplicate_migration_versions_are_rejected(pool):
+    with pytest.raises(ValueError):
+        MigrationRunner(pool, [_copy_migration(_double), _copy_migration(_double)])
@@ -0,0 +1,29 @@
+# tests/test_schema.py
+
+import sqlite3
+
+
+def test_v1_database_is_migrated_before_version_is_recorded(tmp_path):
+    from bjj_advanced_system_v2 import ImprovedBJJDatabase
+
+    path = str(tmp_path / "v1.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT UNIQUE NOT NULL, "
+                 "current_belt TEXT DEFAULT 'White')")
+    conn.executemany("INSERT INTO users (username, current_belt) VALUES (?, ?)",
+                     [("kim", "Blue"), ("lee", "White")])
+    conn.commit()
+    conn.close()
+
+    db = ImprovedBJJDatabase(path)
+    assert db.schema_version == ImprovedBJJDatabase.SCHEMA_VERSION
+
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == ImprovedBJJDatabase.SCHEMA_VERSION
+        assert conn.execute("SELECT status FROM schema_migrations WHERE version = 1").fetchone()[0] == 'done'
+        rows = conn.execute("SELECT user_id FROM user_nlp_patterns "
+                            "WHERE pattern_type = 'v2_migration_defaults' ORDER BY user_id").fetchall()
+        assert [row[0] for row in rows] == ['1', '2']
+    finally:
+        conn.close()
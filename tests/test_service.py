@@ -0,0 +1,67 @@
+# tests/test_service.py
+import asyncio
+import sqlite3
+
+
+def test_service_keeps_user_patterns_in_its_db(tmp_path, monkeypatch):
+    from bjj_service import BJJTrainingService
+
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "service.db")
+
+    async def run():
+        async with BJJTrainingService(db_path=db_path) as service:
+            user_id = service.database.create_user('kim', 'kim@example.com', 'pw123456', '🔵 블루 벨트')
+            await service.analyze('하프가드 스윕 배우고 싶어요', user_id)
+            return user_id
+
+    user_id = asyncio.run(run())
+    assert not (tmp_path / "bjj_training.db").exists()
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT user_id FROM user_nlp_patterns").fetchall()
+    assert rows and all(row[0] == user_id for row in rows)
+
+
+def test_concurrent_requests_coalesce_only_identical_analysis_input(tmp_path):
+    from bjj_service import BJJTrainingService
+
+    texts = ['노기 말고 기', '노기, 말고 기', '노기 말고 기']
+
+    async def run():
+        async with BJJTrainingService(db_path=str(tmp_path / "service.db")) as service:
+            results = await asyncio.gather(*(service.analyze(text) for text in texts))
+            return results, service.stats['coalesced']
+
+    results, coalesced = asyncio.run(run())
+    negations = [result['negation_analysis']['has_negation'] for result in results]
+    assert negations[0] == negations[2] != negations[1]
+    assert coalesced == 1
+
+
+def test_finalization_does_not_run_on_db_thread(tmp_path, monkeypatch):
+    import threading
+    from bjj_service import BJJTrainingService
+
+    threads = {}
+    original_finalize = BJJTrainingService._finalize_job
+    original_context = BJJTrainingService._user_context_job
+
+    def finalize_job(*args):
+        threads['finalize'] = threading.current_thread().name
+        return original_finalize(*args)
+
+    def user_context_job(*args):
+        threads['user_context'] = threading.current_thread().name
+        return original_context(*args)
+
+    monkeypatch.setattr(BJJTrainingService, '_finalize_job', staticmethod(finalize_job))
+    monkeypatch.setattr(BJJTrainingService, '_user_context_job', staticmethod(user_context_job))
+
+    async def run():
+        async with BJJTrainingService(db_path=str(tmp_path / "service.db")) as service:
+            user_id = service.database.create_user('park', 'park@example.com', 'pw123456', '🔵 블루 벨트')
+            await service.analyze('하프가드 스윕 배우고 싶어요', user_id)
+
+    asyncio.run(run())
+    assert threads['user_context'].startswith('bjj-db')
+    assert threads['finalize'].startswith('bjj-cpu')
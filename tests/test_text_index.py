@@ -0,0 +1,103 @@
+# tests/test_text_index.py
+import random
+
+from bjj_text_index import BKTree, levenshtein_distance
+
+
+def _random_terms(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    alphabet = '가드스윕패암바초크'
+    return sorted({''.join(rng.choice(alphabet) for _ in range(rng.randint(2, 7))) for _ in range(count)})
+
+
+def test_bktree_search_matches_brute_force():
+    terms = _random_terms(400)
+    tree = BKTree()
+    for term in terms:
+        tree.add(term, term.upper())
+
+    for query in _random_terms(40, seed=11):
+        for max_distance in (0, 1, 2):
+            expected = sorted((term, levenshtein_distance(query, term)) for term in terms
+                              if levenshtein_distance(query, term) <= max_distance)
+            assert sorted(tree.search(query, max_distance)) == expected
+
+
+def test_bktree_prunes_candidates():
+    calls = []
+
+    def counting_distance(a, b):
+        calls.append(1)
+        return levenshtein_distance(a, b)
+
+    terms = _random_terms(400)
+    tree = BKTree(counting_distance)
+    for term in terms:
+        tree.add(term, term)
+    calls.clear()
+    tree.search('가드스윕', 1)
+    assert len(calls) < len(terms) // 2
+
+
+def test_bktree_payloads_are_merged_per_term():
+    tree = BKTree()
+    tree.add('암바', '암바')
+    tree.add('암바', '암바 (가드)')
+    tree.add('암바', '암바')
+    tree.add('', '무시')
+    assert len(tree) == 1
+    assert tree.payloads('암바') == ['암바', '암바 (가드)']
+    assert tree.search('암마', 1) == [('암바', 1)]
+    assert BKTree().search('암바', 2) == []
+
+
+def _automaton(lexicons):
+    from bjj_text_index import KeywordAutomaton
+
+    automaton = KeywordAutomaton()
+    for category, lexicon in lexicons:
+        automaton.add_lexicon(category, lexicon)
+    return automaton.compile()
+
+
+def test_automaton_finds_overlapping_keywords_like_substring_search():
+    lexicon = {'guard': ['가드', '하프가드', '딥하프가드'], 'half': ['하프'], 'sweep': ['스윕', '가드스윕']}
+    automaton = _automaton([('position', lexicon)])
+    text = '딥하프가드스윕 하프 가드'
+
+    found = sorted((hit.keyword, hit.start, hit.end) for hit in automaton.scan(text))
+    expected = sorted(
+        (keyword, start, start + len(keyword))
+        for keywords in lexicon.values() for keyword in keywords
+        for start in range(len(text)) if text.startswith(keyword, start)
+    )
+    assert found == expected
+
+
+def test_automaton_labels_follow_registration_order():
+    automaton = _automaton([
+        ('intent', {'learn': ['배우'], 'practice': ['연습'], 'review': ['복습']}),
+        ('action', {'learn': ['배우']}),
+    ])
+    hits = automaton.scan('복습하고 연습하고 배우고')
+    assert hits.labels('intent') == ['learn', 'practice', 'review']
+    assert hits.first_label('intent') == 'learn'
+    assert hits.has('action', 'learn') and not hits.has('emotion')
+    assert hits.first('intent', 'review').start == 0
+
+
+def test_automaton_feed_continues_previous_scan():
+    automaton = _automaton([('position', {'half': ['하프가드'], 'guard': ['가드']})])
+    text = '하프가드에서 하프가드'
+    whole = [(hit.label, hit.start) for hit in automaton.scan(text)]
+
+    hits, state = automaton.feed(text[:3])
+    rest, _ = automaton.feed(text[3:], state, 3)
+    assert [(hit.label, hit.start) for hit in hits + rest] == whole
+
+
+def test_automaton_recompiles_after_add():
+    automaton = _automaton([('position', {'guard': ['가드']})])
+    automaton.add('스윕', 'action', 'sweep')
+    assert automaton.scan('가드 스윕').labels('action') == ['sweep']
+    assert automaton.keyword_count == 2
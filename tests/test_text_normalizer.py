@@ -0,0 +1,60 @@
+# tests/test_text_normalizer.py
+import pytest
+
+
+@pytest.mark.parametrize("text", [
+    "마스터하기 어려운 기술",
+    "익히기 좋은 기술",
+    "배우기 싫어",
+    "뒤집고 싶어",
+])
+def test_conjugated_words_are_not_typo_corrected(enhanced_nlp, text):
+    assert enhanced_nlp._normalize_text(text).text == text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("하프가듣에서 스윕", "하프가드에서 스위프"),
+    ("기욜틴 초크", "기요틴 초크"),
+    ("트라이앵굴", "트라이앵글"),
+])
+def test_noun_typos_are_corrected(enhanced_nlp, text, expected):
+    assert enhanced_nlp._normalize_text(text).text == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("트라이앵글 초크 배으고 싶어요", "배우고"),
+    ("기욜틴 방어가 어려와요", "어려워요"),
+])
+def test_verb_typos_are_corrected(enhanced_nlp, text, expected):
+    assert expected in enhanced_nlp._normalize_text(text).text
+
+
+def test_verb_typo_keeps_learning_intent(enhanced_nlp):
+    result = enhanced_nlp.analyze_user_request("트라이앵글 초크 배으고 싶어요")
+    assert result['intent'] == 'learn'
+    assert result['level'] == 'beginner'
+
+
+def test_verb_typo_keeps_emotional_state(enhanced_nlp):
+    result = enhanced_nlp.analyze_user_request("기욜틴 방어가 어려와요")
+    assert result['emotional_state'] == ['frustration']
+
+
+def test_mastery_request_keeps_advanced_intent(enhanced_nlp):
+    result = enhanced_nlp.analyze_user_request("마스터하기 어려운 기술")
+    assert result['intent'] == 'strengthen'
+    assert result['level'] == 'advanced'
+    assert result['difficulty_preference'] == 'challenging'
+    assert result['duration'] == 'long'
+
+
+def test_offsets_point_into_original_text_with_leading_whitespace(enhanced_nlp):
+    text = "  하프가듣에서 스윕"
+    normalized = enhanced_nlp._normalize_text(text)
+    assert normalized.text == "하프가드에서 스위프"
+
+    start = normalized.text.index("스위프")
+    begin, end = normalized.original_span(start, start + len("스위프"))
+    assert text[begin:end] == "스윕"
+    begin, end = normalized.original_span(0, len("하프가드"))
+    assert text[begin:end] == "하프가듣"
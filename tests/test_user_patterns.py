@@ -0,0 +1,26 @@
+# tests/test_user_patterns.py
+
+
+def test_pattern_update_is_dropped_when_queue_is_closed(tmp_path):
+    from bjj_advanced_system_v2 import EnhancedNLPProcessor
+
+    nlp = EnhancedNLPProcessor(user_db_path=str(tmp_path / "users.db"))
+    nlp.user_patterns.close()
+
+    result = nlp.analyze_user_request("하프가드 스윕 배우고 싶어요", "user-1")
+    assert result['intent']
+    assert nlp.user_patterns.dropped == 1
+
+
+def test_pattern_update_is_dropped_when_queue_stays_full(tmp_path):
+    from bjj_advanced_system_v2 import UserPatternStore
+
+    store = UserPatternStore(str(tmp_path / "users.db"), max_pending=1, submit_timeout=0.01)
+    try:
+        # 기록 스레드는 첫 submit 성공 때 시작되므로 직접 채운 큐는 비워지지 않는다
+        store.writes._pending[("other", "intent_preference")] = ({}, 0.5, 1)
+        assert store.record("user-1", "intent_preference", {'preferred_intent': 'learn'}, 0.9) is False
+        assert store.dropped == 1
+        store.writes._pending.clear()
+    finally:
+        store.close()
@@ -0,0 +1,84 @@
+# tests/test_write_behind.py
+import threading
+
+import pytest
+
+from bjj_write_behind import WriteBehindQueue
+
+
+class _BlockingWriter:
+    """release될 때까지 첫 기록을 붙잡아 두는 기록 함수"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.batches = []
+
+    def __call__(self, batch):
+        self.started.set()
+        self.release.wait(5)
+        self.batches.append(batch)
+
+
+def test_full_queue_times_out_but_still_merges_pending_keys():
+    writer = _BlockingWriter()
+    queue = WriteBehindQueue(writer, merge=lambda old, new: old + new, max_pending=2, batch_size=10)
+    try:
+        assert queue.submit('a', 1)
+        assert writer.started.wait(5)  # 'a'는 기록 중 - 대기열은 비어 있음
+        assert queue.submit('b', 1) and queue.submit('c', 1)
+
+        assert queue.submit('d', 1, timeout=0.05) is False  # 가득 참
+        assert queue.submit('b', 10, timeout=0.05) is True  # 대기 중인 키는 자리 없이 병합
+
+        writer.release.set()
+        assert queue.flush(5)
+        assert writer.batches == [[('a', 1)], [('b', 11), ('c', 1)]]
+        stats = queue.stats()
+        assert (stats['submitted'], stats['coalesced'], stats['written']) == (4, 1, 3)
+    finally:
+        writer.release.set()
+        queue.close(5)
+
+
+def test_blocked_submit_proceeds_when_writer_makes_room():
+    writer = _BlockingWriter()
+    queue = WriteBehindQueue(writer, max_pending=1)
+    try:
+        queue.submit('a', 1)
+        writer.started.wait(5)
+        queue.submit('b', 1)
+        threading.Timer(0.05, writer.release.set).start()
+        assert queue.submit('c', 1, timeout=5)
+        assert queue.flush(5)
+        assert [key for batch in writer.batches for key, _ in batch] == ['a', 'b', 'c']
+    finally:
+        writer.release.set()
+        queue.close(5)
+
+
+def test_batches_are_split_and_failures_counted():
+    batches = []
+
+    def write_batch(batch):
+        batches.append(len(batch))
+        if len(batches) == 1:
+            raise RuntimeError("disk full")
+
+    queue = WriteBehindQueue(write_batch, max_pending=10, batch_size=2)
+    with queue._cond:  # 기록 스레드가 첫 항목만 가져가지 않도록 한 번에 채움
+        for key in 'abcde':
+            assert queue.submit(key, 1)
+    assert queue.flush(5)
+    queue.close(5)
+
+    assert batches == [2, 2, 1]
+    assert (queue.stats()['failed'], queue.stats()['written']) == (2, 3)
+
+
+def test_submit_after_close_raises():
+    queue = WriteBehindQueue(lambda batch: None)
+    queue.submit('a', 1)
+    queue.close(5)
+    with pytest.raises(RuntimeError):
+        queue.submit('b', 1)